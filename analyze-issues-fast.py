@@ -0,0 +1,27 @@
+#!/usr/bin/env python3
+"""
+S-Quote Issue Analysis Launcher
+Runs analyze-issues.py from cached bytecode for fast startup
+
+Python compiles a script run directly on every start, which for the analyzer
+costs more than a small diff-scoped run itself. Imported modules are cached
+in __pycache__ instead, so this launcher imports the analyzer and calls its
+main(). Options are the same as for analyze-issues.py.
+
+Usage:
+    python3 analyze-issues-fast.py --diff-base HEAD
+    python3 analyze-issues-fast.py --profile
+"""
+
+import sys
+import importlib.util
+from pathlib import Path
+
+# Loaded at import time so worker processes started with spawn can resolve analyze_issues
+spec = importlib.util.spec_from_file_location("analyze_issues", Path(__file__).with_name("analyze-issues.py"))
+analyze_issues = importlib.util.module_from_spec(spec)
+sys.modules[spec.name] = analyze_issues
+spec.loader.exec_module(analyze_issues)
+
+if __name__ == "__main__":
+    analyze_issues.main()
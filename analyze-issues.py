@@ -4,61 +4,2991 @@ S-Quote Issue Analysis Tool
 Automatically identifies potential issues, bugs, and improvements in the codebase
 """
 
+import time
+# Taken before the other imports so --profile can report what startup costs
+LOAD_STARTED = time.perf_counter()
+
+# Modules needed only by some runs (subprocess, hashlib, datetime, threading,
+# textwrap, heapq, struct) are imported where they are used, which keeps
+# startup short for small diff-scoped runs and pre-commit hooks.
 import os
+import sys
+import bisect
+import codecs
+import mmap
+import fnmatch
 import re
+import argparse
+import contextlib
 import json
-import subprocess
 from pathlib import Path
-from typing import List, Dict, Any
-from dataclasses import dataclass
-from datetime import datetime
+from typing import List, Dict, Any, Optional, Tuple, Callable, Iterable, Iterator, NamedTuple, Sequence, Set, Union
+from abc import ABC, abstractmethod
+from array import array
+from collections import OrderedDict
+from dataclasses import dataclass, asdict
+
+@dataclass
+class Issue:
+    __slots__ = ('type', 'severity', 'file', 'line', 'description', 'suggestion', 'category')
+    
+    type: str
+    severity: str  # 'critical', 'high', 'medium', 'low'
+    file: str
+    line: int
+    description: str
+    suggestion: str
+    category: str
+
+# Most severe first
+SEVERITIES = ('critical', 'high', 'medium', 'low')
+
+def severity_rank(severity: str) -> int:
+    """Position of a severity in SEVERITIES; unknown severities rank below low"""
+    return SEVERITIES.index(severity) if severity in SEVERITIES else len(SEVERITIES)
+
+class LazyPattern:
+    """A regular expression compiled on first use
+    
+    Module-level patterns are declared with this so a run only compiles the
+    ones it needs. Once compiled, each method is cached on the instance and
+    costs no more to call than on the pattern itself.
+    """
+    
+    def __init__(self, pattern: Union[str, bytes], flags: int = 0):
+        self.pattern = pattern
+        self.flags = flags
+    
+    def __getattr__(self, name: str):
+        value = getattr(re.compile(self.pattern, self.flags), name)
+        setattr(self, name, value)
+        return value
+
+NEWLINE_RE = LazyPattern(rb'\r\n|\r|\n')
+
+def decode_line(raw: bytes) -> str:
+    """Decode one line as UTF-8, falling back to Windows-1252 for legacy bytes"""
+    try:
+        return raw.decode('utf-8')
+    except UnicodeDecodeError:
+        return raw.decode('cp1252', errors='replace')
+
+def decode_source(raw: bytes) -> str:
+    """Decode a whole file with universal newlines, tolerating mixed encodings
+    
+    UTF-8 (with or without a BOM) and UTF-16 with a BOM decode as a whole.
+    Otherwise each line is decoded on its own, so a few legacy bytes no
+    longer make the file unreadable.
+    """
+    if raw.startswith((codecs.BOM_UTF16_LE, codecs.BOM_UTF16_BE)):
+        return SourceFile.normalize_newlines(raw.decode('utf-16'))
+    try:
+        return SourceFile.normalize_newlines(raw.decode('utf-8-sig'))
+    except UnicodeDecodeError:
+        if raw.startswith(codecs.BOM_UTF8):
+            raw = raw[len(codecs.BOM_UTF8):]
+        return '\n'.join(decode_line(line) for line in NEWLINE_RE.split(raw))
+
+class MappedLines:
+    """Lines of a large file, decoded on access from a read-only memory map
+    
+    Only line offsets are kept. Each line is decoded when it is indexed or
+    iterated and dropped afterwards, so memory follows the lines being
+    inspected rather than the size of the file.
+    """
+    
+    def __init__(self, data: mmap.mmap):
+        self.data = data
+        first = len(codecs.BOM_UTF8) if data[:len(codecs.BOM_UTF8)] == codecs.BOM_UTF8 else 0
+        self._starts = array('Q', [first])
+        self._ends = array('Q')
+        for match in NEWLINE_RE.finditer(data, first):
+            self._ends.append(match.start())
+            self._starts.append(match.end())
+        self._ends.append(len(data))
+    
+    def __len__(self) -> int:
+        return len(self._starts)
+    
+    def __getitem__(self, index):
+        if isinstance(index, slice):
+            return [self[i] for i in range(*index.indices(len(self)))]
+        if index < 0:
+            index += len(self)
+        if not 0 <= index < len(self):
+            raise IndexError("line index out of range")
+        return decode_line(self.data[self._starts[index]:self._ends[index]])
+    
+    def __iter__(self) -> Iterator[str]:
+        data = self.data
+        for start, end in zip(self._starts, self._ends):
+            yield decode_line(data[start:end])
+    
+    def lines_containing(self, literal: str) -> List[int]:
+        """Numbers of the lines containing `literal`, found by searching the mapping"""
+        needle = literal.encode('utf-8')
+        found = []
+        position = self.data.find(needle)
+        while position != -1:
+            number = bisect.bisect_right(self._starts, position)
+            found.append(number)
+            if number == len(self._starts):
+                break
+            position = self.data.find(needle, self._starts[number])
+        return found
+    
+    def close(self):
+        self.data.close()
+
+class SourceFile:
+    """A Swift source file that is read and split at most once per run
+    
+    Files of at least MAP_THRESHOLD bytes are memory-mapped and their lines
+    decoded lazily through `MappedLines`; smaller ones are decoded whole.
+    """
+    
+    MAP_THRESHOLD = 1 << 20
+    
+    def __init__(self, path: Path, relative_path: str):
+        self.path = path
+        self.relative_path = relative_path
+        self.error: Optional[Exception] = None
+        self._content: Optional[str] = None
+        self._lines: Optional[Sequence[str]] = None
+        self._raw: Optional[Union[bytes, mmap.mmap]] = None
+        self._loaded = False
+        self.findings: Optional[Dict[str, List[Issue]]] = None
+        self.facts: Optional[Dict[str, Any]] = None
+        # Content hash of a file that missed the analysis cache, so its results can be stored
+        self.cache_digest: Optional[str] = None
+    
+    def mark_loaded(self, error: Optional[Exception] = None):
+        """Record the outcome of a read performed elsewhere (e.g. a worker process)"""
+        self._loaded = True
+        self._raw = None
+        self.error = error
+    
+    def raw_bytes(self) -> Union[bytes, mmap.mmap]:
+        """Return the undecoded file contents, reading or mapping them at most once"""
+        if self._raw is None:
+            with open(self.path, 'rb') as f:
+                if os.fstat(f.fileno()).st_size >= self.MAP_THRESHOLD:
+                    self._raw = mmap.mmap(f.fileno(), 0, access=mmap.ACCESS_READ)
+                else:
+                    self._raw = f.read()
+        return self._raw
+    
+    def load(self) -> bool:
+        """Read the file on first use; returns False if it could not be read"""
+        if not self._loaded:
+            self._read()
+        return self.error is None
+    
+    @staticmethod
+    def normalize_newlines(content: str) -> str:
+        """Same result as reading in text mode with universal newlines"""
+        return content.replace('\r\n', '\n').replace('\r', '\n')
+    
+    def _read(self):
+        self._loaded = True
+        try:
+            raw = self.raw_bytes()
+            if isinstance(raw, mmap.mmap) and raw[:2] not in (codecs.BOM_UTF16_LE, codecs.BOM_UTF16_BE):
+                self._lines = MappedLines(raw)
+            else:
+                self._content = decode_source(raw[:] if isinstance(raw, mmap.mmap) else raw)
+                self._lines = self._content.split('\n')
+        except Exception as e:
+            self.error = e
+        self._raw = None
+    
+    def release(self):
+        """Drop the decoded text once it has been scanned; it is re-read if needed again"""
+        if isinstance(self._lines, MappedLines):
+            self._lines.close()
+        self._content = None
+        self._lines = None
+    
+    @property
+    def content(self) -> str:
+        """Whole text; for mapped files this materializes it, so scans use lines and facts"""
+        if self.load() and self._lines is None:
+            self._read()
+        if isinstance(self._lines, MappedLines):
+            return '\n'.join(self._lines)
+        return self._content or ""
+    
+    @property
+    def lines(self) -> Sequence[str]:
+        if self.load() and self._lines is None:
+            self._read()
+        return self._lines or []
+    
+    def compute_facts(self) -> Dict[str, Any]:
+        """Symbols for the project index, searched without decoding mapped files"""
+        lines = self.lines
+        if isinstance(lines, MappedLines):
+            return file_facts(lines.data)
+        return file_facts(self._content or "")
+
+class Token(NamedTuple):
+    kind: str  # 'identifier', 'number', 'string', 'comment', 'operator' or 'punctuation'
+    text: str
+    start: int
+    end: int
+
+# Lexer state at a line boundary: a stack of open block comments
+# ('comment', depth), string literals ('string', hashes, multiline) and
+# string interpolations ('interpolation', paren_depth). Empty means plain code.
+LexState = Tuple[Tuple[Any, ...], ...]
+
+# Lines searched around a match for related code, as (first, last) offsets
+# from the matching line. Adjustable with --context-window.
+CONTEXT_WINDOWS: Dict[str, Tuple[int, int]] = {
+    'timer_invalidation': (-4, 5),
+    'main_thread_dispatch': (-2, 3),
+    'accessibility_label': (1, 5),
+}
+
+class SwiftLexer:
+    """Incremental Swift lexer that tokenizes one line at a time
+    
+    Each call takes the state left by the previous line, so block comments,
+    multi-line strings and interpolations spanning lines are tracked
+    without lexing the whole file up front.
+    """
+    
+    CODE_TOKEN_RE = LazyPattern(r"""
+        (?P<space>\s+)
+      | (?P<line_comment>//.*)
+      | (?P<block_comment>/\*)
+      | (?P<string>\#*(?:\"\"\"|\"))
+      | (?P<identifier>[^\W\d]\w*|\$\w*|`[^`]+`)
+      | (?P<number>0[xob][\w]*|\d[\d_]*(?:\.\d[\d_]*)?(?:[eEpP][+-]?\d[\d_]*)?)
+      | (?P<operator>\.\.[.<]|(?:[=\-+!*%<>&|^~?]|/(?![/*]))+)
+      | (?P<punctuation>.)
+    """, re.VERBOSE)
+    BLOCK_COMMENT_DELIMITER_RE = LazyPattern(r'/\*|\*/')
+    
+    def __init__(self):
+        self._string_patterns: Dict[Tuple[int, bool], Any] = {}
+    
+    def _string_pattern(self, hashes: int, multiline: bool):
+        # Group 1 starts an interpolation, group 2 closes the literal;
+        # anything else matched is an escape sequence to skip
+        pattern = self._string_patterns.get((hashes, multiline))
+        if pattern is None:
+            delimiter = '"""' if multiline else '"'
+            pattern = re.compile(r'\\' + '#' * hashes + r'(?:(\()|.)|(' + delimiter + '#' * hashes + ')')
+            self._string_patterns[(hashes, multiline)] = pattern
+        return pattern
+    
+    def lex(self, line: str, state: LexState = ()) -> Tuple[List[Token], LexState]:
+        """Tokenize a line; returns its tokens and the state for the next line"""
+        tokens: List[Token] = []
+        stack = list(state)
+        pos = 0
+        length = len(line)
+        
+        while pos < length:
+            top = stack[-1] if stack else None
+            
+            if top is not None and top[0] == 'comment':
+                match = self.BLOCK_COMMENT_DELIMITER_RE.search(line, pos)
+                end = match.end() if match else length
+                tokens.append(Token('comment', line[pos:end], pos, end))
+                if match is not None:
+                    if match.group() == '/*':
+                        stack[-1] = ('comment', top[1] + 1)
+                    elif top[1] > 1:
+                        stack[-1] = ('comment', top[1] - 1)
+                    else:
+                        stack.pop()
+                pos = end
+                continue
+            
+            if top is not None and top[0] == 'string':
+                pattern = self._string_pattern(top[1], top[2])
+                start = pos
+                match = pattern.search(line, pos)
+                while match is not None and match.group(1) is None and match.group(2) is None:
+                    match = pattern.search(line, match.end())
+                end = match.end() if match else length
+                tokens.append(Token('string', line[start:end], start, end))
+                if match is not None:
+                    if match.group(1) is not None:
+                        stack.append(('interpolation', 0))
+                    else:
+                        stack.pop()
+                pos = end
+                continue
+            
+            match = self.CODE_TOKEN_RE.match(line, pos)
+            kind = match.lastgroup
+            end = match.end()
+            text = match.group()
+            pos = end
+            
+            if kind == 'space':
+                continue
+            if kind == 'line_comment':
+                tokens.append(Token('comment', text, match.start(), end))
+            elif kind == 'block_comment':
+                tokens.append(Token('comment', text, match.start(), end))
+                stack.append(('comment', 1))
+            elif kind == 'string':
+                tokens.append(Token('string', text, match.start(), end))
+                stack.append(('string', text.count('#'), text.endswith('"""')))
+            elif top is not None and top[0] == 'interpolation' and text in '()':
+                if text == '(':
+                    stack[-1] = ('interpolation', top[1] + 1)
+                    tokens.append(Token(kind, text, match.start(), end))
+                elif top[1] > 0:
+                    stack[-1] = ('interpolation', top[1] - 1)
+                    tokens.append(Token(kind, text, match.start(), end))
+                else:
+                    # Closing parenthesis of the interpolation resumes the literal
+                    tokens.append(Token('string', text, match.start(), end))
+                    stack.pop()
+            else:
+                tokens.append(Token(kind, text, match.start(), end))
+        
+        # Only block comments and multi-line strings survive the end of a line
+        while stack and not (stack[-1][0] == 'comment' or (stack[-1][0] == 'string' and stack[-1][2])):
+            stack.pop()
+        
+        return tokens, tuple(stack)
+
+SWIFT_LEXER = SwiftLexer()
+
+class ScanContext:
+    """Per-file state handed to line rules during a scan
+    
+    Rules that need to tell code from strings and comments ask for the
+    current line's tokens, which are lexed on first request.
+    """
+    
+    def __init__(self, file: str, lines: Sequence[str]):
+        self.file = file
+        self.lines = lines
+        self.state: Dict[str, Any] = {}
+        self.line = ""
+        # Lexer state at the start of the current line
+        self.lex_state: LexState = ()
+        # Set by tokens(); the engine reuses the end state instead of lexing again
+        self.line_tokens: Optional[List[Token]] = None
+        self.next_lex_state: LexState = ()
+        # Lexer state at the start of each line holding a suppression marker
+        self.marker_states: Dict[int, LexState] = {}
+        self._line_index: Dict[str, List[int]] = {}
+    
+    def tokens(self) -> List[Token]:
+        """Tokens of the current line"""
+        if self.line_tokens is None:
+            self.line_tokens, self.next_lex_state = SWIFT_LEXER.lex(self.line, self.lex_state)
+        return self.line_tokens
+    
+    def lines_containing(self, literal: str) -> List[int]:
+        """Sorted numbers of the lines containing `literal`, indexed once per file"""
+        index = self._line_index.get(literal)
+        if index is None:
+            if isinstance(self.lines, MappedLines):
+                index = self.lines.lines_containing(literal)
+            else:
+                index = [n for n, line in enumerate(self.lines, 1) if literal in line]
+            self._line_index[literal] = index
+        return index
+    
+    def near(self, literal: str, i: int, window: str) -> bool:
+        """Whether `literal` occurs within the named context window around line i"""
+        first, last = CONTEXT_WINDOWS[window]
+        index = self.lines_containing(literal)
+        pos = bisect.bisect_left(index, i + first)
+        return pos < len(index) and index[pos] <= i + last
+    
+    def brace_counts(self) -> Tuple[int, int]:
+        """Opening and closing braces on the current line outside strings and comments"""
+        line = self.line
+        if not self.lex_state and '"' not in line and '/' not in line:
+            return line.count('{'), line.count('}')
+        opening = closing = 0
+        for token in self.tokens():
+            if token.kind == 'punctuation':
+                if token.text == '{':
+                    opening += 1
+                elif token.text == '}':
+                    closing += 1
+        return opening, closing
+
+SUPPRESSION_MARKER = 'squote:ignore'
+SUPPRESSION_RE = LazyPattern(r'(?://|/\*)\s*squote:ignore(-next-line)?(?![\w-])([^\n]*)')
+
+def line_suppressions(ctx: ScanContext) -> Dict[int, Optional[frozenset]]:
+    """Lines silenced by suppression comments, with the issue types or categories they name
+    
+    `// squote:ignore` applies to its own line and `// squote:ignore-next-line`
+    to the following one. Names may follow, separated by commas or spaces;
+    without any, every issue on the line is suppressed (None). Text after
+    `--` is a free-form reason. Only markers in comment tokens count, so
+    one inside a string literal suppresses nothing.
+    """
+    suppressed: Dict[int, Optional[frozenset]] = {}
+    for n in ctx.lines_containing(SUPPRESSION_MARKER):
+        tokens = SWIFT_LEXER.lex(ctx.lines[n - 1], ctx.marker_states.get(n, ()))[0]
+        match = next((match for match in (SUPPRESSION_RE.search(token.text)
+                                          for token in tokens if token.kind == 'comment') if match), None)
+        if match is None:
+            continue
+        text = match.group(2).split('--', 1)[0].split('*/', 1)[0]
+        names = frozenset(name for name in re.split(r'[\s,:]+', text) if name)
+        target = n + 1 if match.group(1) else n
+        if not names or (target in suppressed and suppressed[target] is None):
+            suppressed[target] = None
+        else:
+            suppressed[target] = suppressed.get(target, frozenset()) | names
+    return suppressed
+
+def is_suppressed(issue: Issue, suppressed: Dict[int, Optional[frozenset]]) -> bool:
+    """Whether a suppression comment covers an issue's line and names its type or category"""
+    if issue.line not in suppressed:
+        return False
+    names = suppressed[issue.line]
+    return names is None or issue.type in names or issue.category in names
+
+@dataclass
+class LineRule:
+    """A per-line check driven by the fused line scanner
+    
+    `check` names the CodeAnalyzer method that reports the rule's issues and
+    `triggers` lists literals of which at least one must occur in a line for
+    the rule to run on it. Rules without triggers see every line.
+    """
+    check: str
+    triggers: Tuple[str, ...]
+    match: Callable[[ScanContext, int, str], Iterable[Issue]]
+
+# Patterns compile on first use, so runs that skip a rule never pay for it, and are then shared by every scan
+HARDCODED_TEXT_RE = LazyPattern(r'Text\s*\(\s*"([^"]+)"\s*\)')
+FUNCTION_START_RE = LazyPattern(r'\s*func\s+\w+')
+VAR_START_RE = LazyPattern(r'\s*var\s+\w+')
+DOCUMENTABLE_FUNC_RE = LazyPattern(r'\s*(?:public\s+)?func\s+\w+')
+HARDCODED_COLOR_RE = LazyPattern(r'Color\.(red|blue|green|yellow)')
+NON_ESCAPING_CLOSURE_RE = LazyPattern(
+    r'(?:\.(?:forEach|map|compactMap|flatMap|filter|reduce|sorted|sort|contains|first|last|firstIndex|lastIndex'
+    r'|allSatisfy|min|max|removeAll|partition|drop|prefix)|\bwithAnimation)\s*(?:\([^(){}]*\))?\s*\{'
+)
+DEPRECATED_APIS = [
+    ('UIApplication.shared.keyWindow', r'UIApplication\.shared\.keyWindow', 'Use scene-based window access'),
+    ('NSUserDefaults.standard', r'NSUserDefaults\.standard', 'Consider using UserDefaults.standard'),
+]
+
+def rule_force_unwrapping(ctx: ScanContext, i: int, line: str) -> Iterable[Issue]:
+    # Exclude common safe patterns
+    if any(pattern in line for pattern in ['fatalError', 'precondition', '!!', 'Bundle.main']):
+        return
+    
+    # A postfix `!` directly after an expression (`value!`, `try!`, `as!`), as
+    # opposed to a logical not, `!=`, or a `!` inside a string or comment
+    previous = None
+    for token in ctx.tokens():
+        if (token.kind == 'operator' and token.text[0] == '!' and not token.text.startswith('!=')
+                and previous is not None and previous.end == token.start
+                and (previous.kind == 'identifier' or previous.text in (')', ']'))):
+            yield Issue(
+                type="force_unwrapping",
+                severity="high",
+                file=ctx.file,
+                line=i,
+                description="Force unwrapping detected - potential crash risk",
+                suggestion="Use optional binding (if let) or nil coalescing (??)",
+                category="safety"
+            )
+            return
+        previous = token
+
+def rule_retain_cycle(ctx: ScanContext, i: int, line: str) -> Iterable[Issue]:
+    # Look for closures without weak/unowned self
+    if any(keyword in line for keyword in ['{', 'completion', 'handler']):
+        if 'completion' not in line and 'handler' not in line:
+            # Closures run before the call returns never outlive it
+            non_escaping = NON_ESCAPING_CLOSURE_RE.search(line)
+            if non_escaping and non_escaping.end() - 1 == line.find('{'):
+                return
+        if 'weak' not in line and 'unowned' not in line:
+            yield Issue(
+                type="potential_retain_cycle",
+                severity="medium",
+                file=ctx.file,
+                line=i,
+                description="Potential retain cycle in closure",
+                suggestion="Use [weak self] or [unowned self] in closure capture list",
+                category="memory"
+            )
+
+def rule_hardcoded_string(ctx: ScanContext, i: int, line: str) -> Iterable[Issue]:
+    # Look for Text() with hardcoded strings, where `Text` is code rather than
+    # part of a comment or string literal
+    text_match = None
+    code_starts = None
+    for match in HARDCODED_TEXT_RE.finditer(line):
+        prefix = line[:match.start()]
+        if ctx.lex_state or '"' in prefix or '/' in prefix:
+            # Only a lexed line tells whether a comment or string is open here
+            if code_starts is None:
+                code_starts = {token.start for token in ctx.tokens()
+                               if token.kind == 'identifier' and token.text == 'Text'}
+            if match.start() not in code_starts:
+                continue
+        elif prefix[-1:].isalnum() or prefix.endswith('_'):
+            # Part of a longer identifier such as `RichText`
+            continue
+        text_match = match
+        break
+    if text_match:
+        text_content = text_match.group(1)
+        # Skip system strings and single characters
+        if len(text_content) > 3 and not text_content.startswith('system'):
+            yield Issue(
+                type="hardcoded_string",
+                severity="low",
+                file=ctx.file,
+                line=i,
+                description=f"Hardcoded string: '{text_content}'",
+                suggestion="Consider using localized strings for better internationalization",
+                category="localization"
+            )
+
+def rule_long_function(ctx: ScanContext, i: int, line: str) -> Iterable[Issue]:
+    state = ctx.state
+    
+    # Function start, ignoring lines that begin inside a comment or string
+    if not ctx.lex_state and (('func' in line and FUNCTION_START_RE.match(line))
+                              or ('var' in line and '{' in line and VAR_START_RE.match(line)
+                                  and ctx.brace_counts()[0])):
+        state['function_start'] = i
+        state['brace_count'] = 0
+    
+    function_start = state.get('function_start', 0)
+    if function_start:
+        if '{' in line or '}' in line:
+            opening, closing = ctx.brace_counts()
+            state['brace_count'] += opening - closing
+        
+        # Function end
+        if state['brace_count'] == 0:
+            function_length = i - function_start
+            if function_length > 50:  # Arbitrary threshold
+                yield Issue(
+                    type="long_function",
+                    severity="medium",
+                    file=ctx.file,
+                    line=function_start,
+                    description=f"Function is {function_length} lines long",
+                    suggestion="Consider breaking down into smaller functions",
+                    category="maintainability"
+                )
+            state['function_start'] = 0
+
+def rule_missing_documentation(ctx: ScanContext, i: int, line: str) -> Iterable[Issue]:
+    # Check for public functions without documentation
+    if i > 1 and DOCUMENTABLE_FUNC_RE.match(line):
+        # Check if previous line has documentation
+        prev_line = ctx.lines[i-2].strip()
+        if not prev_line.startswith('///') and not prev_line.startswith('/**'):
+            yield Issue(
+                type="missing_documentation",
+                severity="low",
+                file=ctx.file,
+                line=i,
+                description="Public function missing documentation",
+                suggestion="Add /// documentation comments",
+                category="documentation"
+            )
+
+def deprecated_api_rule(pattern: str, suggestion: str) -> Callable[[ScanContext, int, str], Iterable[Issue]]:
+    compiled = LazyPattern(pattern)
+    
+    def rule(ctx: ScanContext, i: int, line: str) -> Iterable[Issue]:
+        if compiled.search(line):
+            yield Issue(
+                type="deprecated_api",
+                severity="medium",
+                file=ctx.file,
+                line=i,
+                description=f"Deprecated API usage: {pattern}",
+                suggestion=suggestion,
+                category="compatibility"
+            )
+    rule.__name__ = 'rule_deprecated_api'
+    return rule
+
+def rule_timer_leak(ctx: ScanContext, i: int, line: str) -> Iterable[Issue]:
+    # Check for Timer without invalidation
+    if not ctx.near('invalidate', i, 'timer_invalidation'):
+        yield Issue(
+            type="potential_memory_leak",
+            severity="medium",
+            file=ctx.file,
+            line=i,
+            description="Timer created without visible invalidation",
+            suggestion="Ensure timer is invalidated in deinit or appropriate lifecycle method",
+            category="memory"
+        )
+
+def rule_main_thread_blocking(ctx: ScanContext, i: int, line: str) -> Iterable[Issue]:
+    # Check for synchronous operations on main thread
+    if not ctx.near('DispatchQueue', i, 'main_thread_dispatch'):
+        yield Issue(
+            type="main_thread_blocking",
+            severity="high",
+            file=ctx.file,
+            line=i,
+            description="Potentially blocking operation on main thread",
+            suggestion="Move to background queue using DispatchQueue",
+            category="performance"
+        )
+
+def rule_string_concat(ctx: ScanContext, i: int, line: str) -> Iterable[Issue]:
+    # Check for inefficient string concatenation
+    if 'String' in line:
+        yield Issue(
+            type="inefficient_string_concat",
+            severity="low",
+            file=ctx.file,
+            line=i,
+            description="Inefficient string concatenation",
+            suggestion="Consider using String interpolation or StringBuilder",
+            category="performance"
+        )
+
+def rule_hardcoded_color(ctx: ScanContext, i: int, line: str) -> Iterable[Issue]:
+    # Check for hardcoded colors
+    if HARDCODED_COLOR_RE.search(line):
+        yield Issue(
+            type="hardcoded_color",
+            severity="low",
+            file=ctx.file,
+            line=i,
+            description="Hardcoded color usage",
+            suggestion="Use semantic colors or asset catalog colors",
+            category="ui"
+        )
+
+def rule_missing_accessibility(ctx: ScanContext, i: int, line: str) -> Iterable[Issue]:
+    # Check for missing accessibility
+    if not ctx.near('accessibilityLabel', i, 'accessibility_label'):
+        yield Issue(
+            type="missing_accessibility",
+            severity="medium",
+            file=ctx.file,
+            line=i,
+            description="Button missing accessibility label",
+            suggestion="Add .accessibilityLabel() modifier",
+            category="accessibility"
+        )
+
+def deprecated_apis_rule() -> Callable[[ScanContext, int, str], Iterable[Issue]]:
+    rules = [deprecated_api_rule(pattern, suggestion) for _, pattern, suggestion in DEPRECATED_APIS]
+    
+    def rule(ctx: ScanContext, i: int, line: str) -> Iterable[Issue]:
+        for match in rules:
+            yield from match(ctx, i, line)
+    rule.__name__ = 'rule_deprecated_api'
+    return rule
+
+# Checks reported by the performance and UI phases, after the project-wide checks
+DEFERRED_FILE_CHECKS = ['check_performance_issues', 'check_ui_issues', 'check_custom_rules']
+
+# Checks reported by analyze_swift_file, in reporting order
+SWIFT_FILE_CHECKS = [
+    'check_force_unwrapping',
+    'check_retain_cycles',
+    'check_hardcoded_strings',
+    'check_long_functions',
+    'check_missing_documentation',
+    'check_deprecated_apis',
+    'check_memory_leaks',
+]
+
+@dataclass
+class RuleSpec:
+    """Registry entry describing a rule without loading it
+    
+    `check` names the CodeAnalyzer phase that reports the rule's issues and
+    `inputs` what the rule reads: 'lines', 'tokens' or 'text' of a Swift
+    file, or project files such as 'pbxproj'. Line rules either carry their
+    `match` function or name a `module` ("path/to/rules.py:function") that
+    is imported only once the rule is enabled. Project-wide rules have
+    neither; their check method does the work.
+    """
+    id: str
+    check: str
+    category: str
+    severity: str
+    inputs: Tuple[str, ...]
+    globs: Tuple[str, ...] = ('*.swift',)
+    triggers: Tuple[str, ...] = ()
+    match: Optional[Callable[[ScanContext, int, str], Iterable[Issue]]] = None
+    module: Optional[str] = None
+    
+    @property
+    def is_line_rule(self) -> bool:
+        return self.match is not None or self.module is not None
+    
+    def applies_to(self, relative_path: str) -> bool:
+        return any(fnmatch.fnmatchcase(relative_path, glob) for glob in self.globs)
+
+RULE_REGISTRY: Dict[str, RuleSpec] = {}
+
+_line_engines: Dict[Tuple[Optional[str], Tuple[str, ...]], "LineRuleEngine"] = {}
+# check (None for all) -> enabled line rules reported by it
+_rule_selections: Dict[Optional[str], List[RuleSpec]] = {}
+
+# Ids of the rules to run; None runs every registered rule
+ENABLED_RULES: Optional[frozenset] = None
+
+def register_rule(spec: RuleSpec):
+    """Add a rule to the registry"""
+    if spec.id in RULE_REGISTRY:
+        raise ValueError(f"duplicate rule id '{spec.id}'")
+    RULE_REGISTRY[spec.id] = spec
+    _line_engines.clear()
+    _rule_selections.clear()
+
+# Within a check, rules run in registration order on each line, so issue
+# order matches the order the checks have always reported in.
+for _spec in [
+    RuleSpec('force_unwrapping', 'check_force_unwrapping', 'safety', 'high', ('lines', 'tokens'),
+             triggers=('!',), match=rule_force_unwrapping),
+    RuleSpec('retain_cycle', 'check_retain_cycles', 'memory', 'medium', ('lines',),
+             triggers=('self.',), match=rule_retain_cycle),
+    RuleSpec('hardcoded_string', 'check_hardcoded_strings', 'localization', 'low', ('lines', 'tokens'),
+             triggers=('Text',), match=rule_hardcoded_string),
+    RuleSpec('long_function', 'check_long_functions', 'maintainability', 'medium', ('lines', 'tokens'),
+             match=rule_long_function),
+    RuleSpec('missing_documentation', 'check_missing_documentation', 'documentation', 'low', ('lines',),
+             triggers=('func',), match=rule_missing_documentation),
+    RuleSpec('deprecated_api', 'check_deprecated_apis', 'compatibility', 'medium', ('lines',),
+             triggers=tuple(literal for literal, _, _ in DEPRECATED_APIS), match=deprecated_apis_rule()),
+    RuleSpec('timer_leak', 'check_memory_leaks', 'memory', 'medium', ('lines',),
+             triggers=('Timer.scheduledTimer',), match=rule_timer_leak),
+    RuleSpec('main_thread_blocking', 'check_performance_issues', 'performance', 'high', ('lines',),
+             triggers=('URLSession.shared.dataTask', 'Data(contentsOf:'), match=rule_main_thread_blocking),
+    RuleSpec('string_concatenation', 'check_performance_issues', 'performance', 'low', ('lines',),
+             triggers=('+=',), match=rule_string_concat),
+    RuleSpec('hardcoded_color', 'check_ui_issues', 'ui', 'low', ('lines',),
+             triggers=('Color.',), match=rule_hardcoded_color),
+    RuleSpec('missing_accessibility', 'check_ui_issues', 'accessibility', 'medium', ('lines',),
+             triggers=('Button(',), match=rule_missing_accessibility),
+    RuleSpec('project_structure', 'check_project_structure', 'project_structure', 'high', ('filesystem',), globs=()),
+    RuleSpec('build_configuration', 'check_build_configuration', 'build_config', 'medium', ('pbxproj',), globs=()),
+    RuleSpec('dependencies', 'check_dependencies', 'dependencies', 'low', ('manifests',), globs=()),
+    RuleSpec('security', 'check_security_issues', 'security', 'low', ('entitlements', 'text'), globs=()),
+    RuleSpec('data_persistence', 'check_data_persistence', 'data_persistence', 'medium', ('text',)),
+]:
+    RULE_REGISTRY[_spec.id] = _spec
+
+def load_rule_manifest(path: str) -> List[RuleSpec]:
+    """Read rules declared in a JSON manifest without importing their modules
+    
+    The manifest holds {"rules": [{"id", "category", "severity", "globs",
+    "inputs", "triggers", "module", "function", "check"}]}, with module paths
+    relative to the manifest. Each function is called as
+    function(line_number, line, lines) and returns dicts with "type",
+    "description", "suggestion" and optionally "severity" and "line".
+    """
+    with open(path, 'r', encoding='utf-8') as f:
+        data = json.load(f)
+    
+    specs = []
+    for entry in data.get('rules', []):
+        try:
+            spec = RuleSpec(
+                id=entry['id'],
+                check=entry.get('check', 'check_custom_rules'),
+                category=entry['category'],
+                severity=entry.get('severity', 'medium'),
+                inputs=tuple(entry.get('inputs', ['lines'])),
+                globs=tuple(entry.get('globs', ['*.swift'])),
+                triggers=tuple(entry.get('triggers', [])),
+                module=f"{Path(path).parent / entry['module']}:{entry['function']}",
+            )
+        except KeyError as e:
+            raise ValueError(f"rule in {path} is missing {e}")
+        if spec.check not in SWIFT_FILE_CHECKS + DEFERRED_FILE_CHECKS:
+            raise ValueError(f"rule '{spec.id}' uses unknown check '{spec.check}'")
+        specs.append(spec)
+    return specs
+
+_rule_modules: Dict[str, Any] = {}
+
+def load_module_rule(spec: RuleSpec) -> Callable[[ScanContext, int, str], Iterable[Issue]]:
+    """Import a manifest rule's module and adapt its function to a line rule"""
+    import importlib.util
+    
+    path, _, function = spec.module.rpartition(':')
+    module = _rule_modules.get(path)
+    if module is None:
+        module_spec = importlib.util.spec_from_file_location(f"analysis_rules_{len(_rule_modules)}", path)
+        if module_spec is None:
+            raise ImportError(f"cannot load rule module {path}")
+        module = importlib.util.module_from_spec(module_spec)
+        module_spec.loader.exec_module(module)
+        _rule_modules[path] = module
+    find = getattr(module, function)
+    
+    def rule(ctx: ScanContext, i: int, line: str) -> Iterable[Issue]:
+        for found in find(i, line, ctx.lines):
+            yield Issue(
+                type=found['type'],
+                severity=found.get('severity', spec.severity),
+                file=ctx.file,
+                line=found.get('line', i),
+                description=found['description'],
+                suggestion=found.get('suggestion', ''),
+                category=spec.category
+            )
+    rule.__name__ = f"rule_{spec.id}"
+    return rule
+
+def select_rules(selectors: Iterable[str]) -> frozenset:
+    """Ids of the rules named by rule ids or categories"""
+    selected = set()
+    for selector in selectors:
+        matched = {spec.id for spec in RULE_REGISTRY.values() if selector in (spec.id, spec.category)}
+        if not matched:
+            raise ValueError(f"unknown rule or category '{selector}'")
+        selected |= matched
+    return frozenset(selected)
+
+def rules_at_least(severity: str) -> frozenset:
+    """Ids of the rules whose severity is `severity` or more severe"""
+    return frozenset(spec.id for spec in RULE_REGISTRY.values() if severity_rank(spec.severity) <= severity_rank(severity))
+
+def configure_rules(enabled: Optional[Iterable[str]], external: Iterable[RuleSpec] = ()):
+    """Register manifest rules and choose which rules run"""
+    global ENABLED_RULES
+    for spec in external:
+        if RULE_REGISTRY.get(spec.id) != spec:
+            register_rule(spec)
+    ENABLED_RULES = frozenset(enabled) if enabled is not None else None
+    _line_engines.clear()
+    _rule_selections.clear()
+
+def enabled_rules() -> List[RuleSpec]:
+    return [spec for spec in RULE_REGISTRY.values() if ENABLED_RULES is None or spec.id in ENABLED_RULES]
+
+def is_phase_enabled(name: str) -> bool:
+    """Whether an analysis phase reports any enabled rule; other phases always run"""
+    checks = SWIFT_FILE_CHECKS if name == 'analyze_swift_files' else [name]
+    if name not in DEFERRED_FILE_CHECKS and not any(spec.check in checks for spec in RULE_REGISTRY.values()):
+        return True
+    return any(spec.check in checks for spec in enabled_rules())
+
+def phase_severity(name: str) -> int:
+    """Severity rank of the most severe enabled rule an analysis phase reports"""
+    checks = SWIFT_FILE_CHECKS if name == 'analyze_swift_files' else [name]
+    return min((severity_rank(spec.severity) for spec in enabled_rules() if spec.check in checks),
+               default=len(SEVERITIES))
+
+def line_rule_specs(check: Optional[str] = None, relative_path: Optional[str] = None) -> List[RuleSpec]:
+    """Enabled line rules, optionally of one check and applicable to one file"""
+    specs = _rule_selections.get(check)
+    if specs is None:
+        specs = _rule_selections[check] = [
+            spec for spec in enabled_rules() if spec.is_line_rule and (check is None or spec.check == check)
+        ]
+    if relative_path is None:
+        return specs
+    
+    # Rules usually share their globs, so each distinct set is matched once
+    matches: Dict[Tuple[str, ...], bool] = {}
+    applicable = []
+    for spec in specs:
+        matched = matches.get(spec.globs)
+        if matched is None:
+            matched = matches[spec.globs] = spec.applies_to(relative_path)
+        if matched:
+            applicable.append(spec)
+    return applicable
+
+_loaded_rules: Dict[str, LineRule] = {}
+
+def load_line_rule(spec: RuleSpec) -> LineRule:
+    """Build a registered line rule on first use"""
+    rule = _loaded_rules.get(spec.id)
+    if rule is None:
+        match = spec.match if spec.match is not None else load_module_rule(spec)
+        rule = _loaded_rules[spec.id] = LineRule(spec.check, spec.triggers, match)
+    return rule
+
+class LineRuleEngine:
+    """Scans each line once, running only the rules whose triggers occur in it
+    
+    All trigger literals are merged into one alternation, so a line that
+    contains none of them costs a single regex search.
+    """
+    
+    def __init__(self, rules: List[LineRule]):
+        self.rules = rules
+        self.checks = list(dict.fromkeys(rule.check for rule in rules))
+        self._always = frozenset(idx for idx, rule in enumerate(rules) if not rule.triggers)
+        
+        literals = sorted({t for rule in rules for t in rule.triggers}, key=len, reverse=True)
+        # A matched literal also implies every literal it contains, which
+        # covers triggers hidden inside a longer match
+        self._implied = {
+            literal: frozenset(idx for idx, rule in enumerate(rules)
+                               if any(t in literal for t in rule.triggers))
+            for literal in literals
+        }
+        self._prefilter = None
+        if literals:
+            alternation = '|'.join(re.escape(literal) for literal in literals)
+            if self._literals_overlap(literals):
+                # Zero-width matches keep overlapping triggers from hiding each other
+                alternation = f'(?=({alternation}))'
+            self._prefilter = re.compile(alternation)
+        self._plans: Dict[frozenset, Tuple[LineRule, ...]] = {}
+    
+    @staticmethod
+    def _literals_overlap(literals: List[str]) -> bool:
+        for a in literals:
+            for b in literals:
+                if a is not b and any(a.endswith(b[:k]) for k in range(1, min(len(a), len(b)))):
+                    return True
+        return False
+    
+    def _plan(self, hits: frozenset) -> Tuple[LineRule, ...]:
+        plan = self._plans.get(hits)
+        if plan is None:
+            selected = set(self._always)
+            for literal in hits:
+                selected |= self._implied[literal]
+            plan = tuple(self.rules[idx] for idx in sorted(selected))
+            self._plans[hits] = plan
+        return plan
+    
+    def scan(self, file: str, lines: Sequence[str]) -> Dict[str, List[Issue]]:
+        """Return the issues found in `lines`, grouped by reporting check"""
+        findings: Dict[str, List[Issue]] = {check: [] for check in self.checks}
+        ctx = ScanContext(file, lines)
+        findall = self._prefilter.findall if self._prefilter else None
+        empty = frozenset()
+        
+        lex = SWIFT_LEXER.lex
+        # Suppression comments are told from strings by lexing from these lines' start states
+        markers = set(ctx.lines_containing(SUPPRESSION_MARKER))
+        
+        for i, line in enumerate(lines, 1):
+            if markers and i in markers:
+                ctx.marker_states[i] = ctx.lex_state
+            hits = frozenset(findall(line)) if findall else empty
+            if hits or self._always:
+                ctx.line = line
+                ctx.line_tokens = None
+                for rule in self._plan(hits):
+                    for issue in rule.match(ctx, i, line):
+                        findings[rule.check].append(issue)
+                if ctx.line_tokens is not None:
+                    ctx.lex_state = ctx.next_lex_state
+                    continue
+            
+            # A line starting in plain code without these also ends in plain code
+            if ctx.lex_state or '/*' in line or '"""' in line:
+                ctx.lex_state = lex(line, ctx.lex_state)[1]
+        
+        suppressed = line_suppressions(ctx)
+        if suppressed:
+            for check, issues in findings.items():
+                findings[check] = [issue for issue in issues if not is_suppressed(issue, suppressed)]
+        return findings
+
+def get_line_engine(check: Optional[str] = None, relative_path: Optional[str] = None) -> LineRuleEngine:
+    """Return the compiled engine for the enabled line rules, or for one check's rules
+    
+    With a path, only rules whose globs match that file are included.
+    """
+    specs = line_rule_specs(check, relative_path)
+    key = (check, tuple(spec.id for spec in specs))
+    engine = _line_engines.get(key)
+    if engine is None:
+        engine = _line_engines[key] = LineRuleEngine([load_line_rule(spec) for spec in specs])
+    return engine
+
+# Field order of issues in every report format
+ISSUE_FIELDS = ('type', 'severity', 'file', 'line', 'description', 'suggestion', 'category')
+
+def issue_to_dict(issue: Issue) -> Dict[str, Any]:
+    """JSON representation of an issue, in report field order"""
+    return {
+        'type': issue.type,
+        'severity': issue.severity,
+        'file': issue.file,
+        'line': issue.line,
+        'description': issue.description,
+        'suggestion': issue.suggestion,
+        'category': issue.category
+    }
+
+class IssueSink(ABC):
+    """Receives issues as checks report them and keeps running totals
+    
+    Iterating a sink replays its issues in the order they were added.
+    """
+    
+    # Streaming sinks do not hold issues in memory, so per-file findings are
+    # emitted and released as soon as a file has been scanned
+    streaming = False
+    
+    def __init__(self):
+        self.total = 0
+        self.by_severity: Dict[str, int] = {}
+        self.by_category: Dict[str, int] = {}
+    
+    def add(self, issue: Issue):
+        self.total += 1
+        self.by_severity[issue.severity] = self.by_severity.get(issue.severity, 0) + 1
+        self.by_category[issue.category] = self.by_category.get(issue.category, 0) + 1
+        self.store(issue)
+    
+    @abstractmethod
+    def store(self, issue: Issue):
+        """Keep or write out one issue"""
+    
+    @abstractmethod
+    def __iter__(self) -> Iterator[Issue]:
+        """Replay the stored issues in the order they were added"""
+    
+    def __len__(self) -> int:
+        return self.total
+    
+    def with_severity(self, severity: str) -> Iterator[Issue]:
+        """Replay only the issues of one severity"""
+        return (issue for issue in self if issue.severity == severity)
+    
+    def close(self):
+        pass
+
+class IssueStore(IssueSink):
+    """Columnar in-memory issue storage
+    
+    Types, severities and categories are enumerated, file paths and texts
+    are stored once in tables, and each issue is a row of integers in typed
+    arrays. Issue objects are rebuilt only while iterating, so a stored
+    issue costs a few dozen bytes instead of an object with its own strings.
+    """
+    
+    def __init__(self, issues: Iterable[Issue] = ()):
+        super().__init__()
+        # Value tables with their reverse lookups: types, severities, categories, files, texts
+        self._values: Tuple[List[str], ...] = ([], [], [], [], [])
+        self._ids: Tuple[Dict[str, int], ...] = ({}, {}, {}, {}, {})
+        self._types = array('H')
+        self._severities = array('H')
+        self._categories = array('H')
+        self._files = array('L')
+        self._lines = array('q')
+        self._descriptions = array('L')
+        self._suggestions = array('L')
+        for issue in issues:
+            self.add(issue)
+    
+    def _intern(self, table: int, value: str) -> int:
+        ids = self._ids[table]
+        id_ = ids.get(value)
+        if id_ is None:
+            values = self._values[table]
+            id_ = ids[value] = len(values)
+            values.append(value)
+        return id_
+    
+    def store(self, issue: Issue):
+        intern = self._intern
+        self._types.append(intern(0, issue.type))
+        self._severities.append(intern(1, issue.severity))
+        self._categories.append(intern(2, issue.category))
+        self._files.append(intern(3, issue.file))
+        self._lines.append(issue.line)
+        self._descriptions.append(intern(4, issue.description))
+        self._suggestions.append(intern(4, issue.suggestion))
+    
+    def _rows(self, indices: Iterable[int]) -> Iterator[Issue]:
+        types, severities, categories, files, texts = self._values
+        type_ids, severity_ids, category_ids = self._types, self._severities, self._categories
+        file_ids, lines, descriptions, suggestions = self._files, self._lines, self._descriptions, self._suggestions
+        for i in indices:
+            yield Issue(
+                types[type_ids[i]], severities[severity_ids[i]], files[file_ids[i]], lines[i],
+                texts[descriptions[i]], texts[suggestions[i]], categories[category_ids[i]]
+            )
+    
+    def __iter__(self) -> Iterator[Issue]:
+        return self._rows(range(len(self._types)))
+    
+    def with_severity(self, severity: str) -> Iterator[Issue]:
+        """Replay one severity by scanning its column, without rebuilding other issues"""
+        id_ = self._ids[1].get(severity)
+        if id_ is None:
+            return iter(())
+        return self._rows(i for i, value in enumerate(self._severities) if value == id_)
+
+class NDJSONIssueSink(IssueSink):
+    """Writes each issue as one JSON line as soon as it is reported"""
+    
+    streaming = True
+    
+    def __init__(self, path: str):
+        super().__init__()
+        self.path = path
+        self._file = open(path, 'w', encoding='utf-8')
+    
+    def store(self, issue: Issue):
+        self._file.write(json.dumps(issue_to_dict(issue)))
+        self._file.write('\n')
+    
+    def __iter__(self) -> Iterator[Issue]:
+        if not self._file.closed:
+            self._file.flush()
+        with open(self.path, 'r', encoding='utf-8') as f:
+            for line in f:
+                yield Issue(**json.loads(line))
+    
+    def close(self):
+        self._file.close()
+
+USERDEFAULTS_APIS = ('UserDefaults', 'NSUserDefaults')
+COREDATA_APIS = ('NSManagedObject', 'NSManagedObjectContext', 'NSPersistentContainer', 'NSFetchRequest')
+TRACKED_APIS = frozenset(USERDEFAULTS_APIS + COREDATA_APIS + (
+    'URLSession', 'Timer', 'NotificationCenter', 'FileManager', 'JSONEncoder', 'JSONDecoder',
+))
+API_INITIALS = ''.join(sorted({api[0] for api in TRACKED_APIS}))
+# Each API name without its first letter, which the symbol pattern has already consumed
+API_TAILS = '|'.join(
+    f'(?<={api[0]}){re.escape(api[1:])}' for api in sorted(TRACKED_APIS, key=len, reverse=True)
+)
+
+# Type declarations and imports, matched at the start of a line
+DECLARATION_PATTERN = r'''
+    (?P<indent>[ \t]*)
+    (?:
+        (?:@[\w.]+(?:\([^)\n]*\))?[ \t]+)*
+        (?:(?:public|private|fileprivate|internal|package|open|final|indirect|nonisolated)[ \t]+)*
+        (?P<kind>class|struct|enum|protocol|actor|extension)[ \t]+
+        (?!(?:func|var|let|subscript|init|deinit|static|override|private|public|fileprivate|internal|open|final)\b)
+        (?P<name>[A-Za-z_][\w.]*)(?P<rest>[^{\n]*)
+      | (?:@testable[ \t]+)?import[ \t]+(?:(?:class|struct|enum|protocol|func|var|let|typealias)[ \t]+)?
+        (?P<module>[\w.]+)
+    )
+'''
+# Declarations are rare, so lines are only tried where one of these occurs
+DECLARATION_KEYWORDS = ('class', 'struct', 'enum', 'protocol', 'actor', 'extension', 'import')
+# Every other symbol match starts with one of a few characters, which lets
+# the regex engine skip ahead without trying each alternative at every
+# position. The alternatives then branch on the character consumed. Comments
+# are matched whole, so commented-out code does not count.
+SYMBOL_PATTERN = r'''
+    [/@''' + API_INITIALS + r''']
+    (?:
+        (?<=/)(?:/[^\n]*|\*.*?\*/)
+      | (?<=@)(?P<wrapper>[A-Z]\w*)
+      | (?<=\b[''' + API_INITIALS + r'''])(?P<api>''' + API_TAILS + r''')\b
+    )
+'''
+SYMBOL_FLAGS = re.DOTALL | re.VERBOSE
+SYMBOL_RE = LazyPattern(SYMBOL_PATTERN, SYMBOL_FLAGS)
+SYMBOL_BYTES_RE = LazyPattern(SYMBOL_PATTERN.encode(), SYMBOL_FLAGS)
+DECLARATION_RE = LazyPattern(DECLARATION_PATTERN, SYMBOL_FLAGS)
+DECLARATION_BYTES_RE = LazyPattern(DECLARATION_PATTERN.encode(), SYMBOL_FLAGS)
+GENERIC_PARAMETERS_RE = LazyPattern(r'^\s*<[^>]*>')
+
+def file_facts(content: Union[str, bytes, mmap.mmap]) -> Dict[str, Any]:
+    """Per-file symbols consumed by project-wide checks, from decoded text or raw bytes
+    
+    Returns the declared types as [name, kind, first line, last line,
+    conformances], the imported modules, and the lines using each property
+    wrapper or tracked API. Everything is plain JSON so the analysis cache
+    can store it.
+    """
+    import heapq
+    
+    is_text = isinstance(content, str)
+    newline = '\n' if is_text else b'\n'
+    
+    def text(value) -> str:
+        return value if is_text else value.decode('utf-8', 'replace')
+    
+    types: List[List[Any]] = []
+    imports: List[str] = []
+    wrappers: Dict[str, List[int]] = {}
+    apis: Dict[str, List[int]] = {}
+    line = 1
+    position = 0
+    
+    symbols = (SYMBOL_RE if is_text else SYMBOL_BYTES_RE).finditer(content)
+    declarations = declaration_matches(content, DECLARATION_RE if is_text else DECLARATION_BYTES_RE, newline)
+    for match in heapq.merge(declarations, symbols, key=lambda match: match.start()):
+        group = match.lastgroup
+        if group is None:
+            # A comment
+            continue
+        line += content[position:match.start()].count(newline)
+        position = match.start()
+        if group == 'rest':
+            rest = GENERIC_PARAMETERS_RE.sub('', text(match.group('rest'))).lstrip()
+            conformances = []
+            if rest.startswith(':'):
+                clause = re.split(r'\bwhere\b', rest[1:], 1)[0]
+                conformances = [name.strip() for name in clause.split(',') if name.strip()]
+            last_line = line + type_body_lines(content, match.end(), match.group('indent'), newline)
+            types.append([text(match.group('name')), text(match.group('kind')), line, last_line, conformances])
+        elif group == 'module':
+            imports.append(text(match.group('module')))
+        elif group == 'wrapper':
+            wrappers.setdefault(text(match.group('wrapper')), []).append(line)
+        elif group == 'api':
+            apis.setdefault(text(match.group()), []).append(line)
+    
+    return {'types': types, 'imports': imports, 'wrappers': wrappers, 'apis': apis}
+
+def declaration_matches(content: Union[str, bytes, mmap.mmap], regex, newline) -> List[Any]:
+    """Declaration and import matches in file order, trying only lines that contain a keyword"""
+    line_starts = set()
+    for keyword in DECLARATION_KEYWORDS:
+        if not isinstance(content, str):
+            keyword = keyword.encode()
+        found = content.find(keyword)
+        while found != -1:
+            line_starts.add(content.rfind(newline, 0, found) + 1)
+            found = content.find(keyword, found + len(keyword))
+    matches = (regex.match(content, start) for start in sorted(line_starts))
+    return [match for match in matches if match]
+
+def type_body_lines(content: Union[str, bytes, mmap.mmap], start: int, indent, newline) -> int:
+    """Lines a type's body spans after the declaration line ending at start
+    
+    The body ends at the first closing brace indented like the declaration,
+    as Xcode formats it, so braces inside the body never have to be matched.
+    """
+    opening, closing = ('{', '}') if isinstance(content, str) else (b'{', b'}')
+    line_end = content.find(newline, start)
+    if line_end == -1:
+        return 0
+    remainder = content[start:line_end]
+    if opening in remainder and remainder.count(opening) <= remainder.count(closing):
+        return 0
+    end = content.find(newline + indent + closing, line_end)
+    if end == -1:
+        end = len(content)
+    return content[line_end:end + 1].count(newline)
+
+# Kinds whose `self` is copied into closures rather than referenced
+VALUE_TYPE_KINDS = ('struct', 'enum')
+
+def uses_persistence(facts: Dict[str, Any]) -> bool:
+    """Whether a file touches the APIs check_data_persistence looks at"""
+    return 'CoreData' in facts['imports'] or any(api in facts['apis'] for api in USERDEFAULTS_APIS + COREDATA_APIS)
+
+class SymbolIndex:
+    """Project-wide index of type declarations, imports, property wrappers and API usage
+    
+    Built in one pass over the per-file facts, which the analysis cache
+    keeps, so unchanged files are indexed without being read again. It
+    serializes as those facts and is rebuilt from them on load.
+    """
+    
+    VERSION = 1
+    
+    def __init__(self, files: Optional[Dict[str, Dict[str, Any]]] = None):
+        self.files: Dict[str, Dict[str, Any]] = {}
+        # type name -> (file, kind, first line, last line, conformances), extensions included
+        self.types: Dict[str, List[Tuple[str, str, int, int, List[str]]]] = {}
+        self.imports: Dict[str, List[str]] = {}
+        self.wrappers: Dict[str, List[Tuple[str, int]]] = {}
+        self.apis: Dict[str, List[Tuple[str, int]]] = {}
+        for relative_path, facts in (files or {}).items():
+            self.add(relative_path, facts)
+    
+    def add(self, relative_path: str, facts: Dict[str, Any]):
+        self.files[relative_path] = facts
+        for name, kind, first, last, conformances in facts['types']:
+            self.types.setdefault(name, []).append((relative_path, kind, first, last, conformances))
+        for module in facts['imports']:
+            self.imports.setdefault(module, []).append(relative_path)
+        for table, entries in ((self.wrappers, facts['wrappers']), (self.apis, facts['apis'])):
+            for name, lines in entries.items():
+                table.setdefault(name, []).extend((relative_path, line) for line in lines)
+    
+    def type_kind(self, name: str) -> Optional[str]:
+        """Kind of a type declared in the project, or None for external types"""
+        # Extensions of nested types name the full path, declarations only the last part
+        for candidate in dict.fromkeys((name, name.rsplit('.', 1)[-1])):
+            for _, kind, _, _, _ in self.types.get(candidate, ()):
+                if kind != 'extension':
+                    return kind
+        return None
+    
+    def types_conforming(self, protocol: str) -> List[str]:
+        """Project types that declare a conformance, e.g. every ObservableObject"""
+        return sorted(name for name in self.types if protocol in self.conformances(name))
+    
+    def conformances(self, name: str) -> Set[str]:
+        """Supertypes and protocols of a type, from its declaration and extensions"""
+        return {conformance for entry in self.types.get(name, ()) for conformance in entry[4]}
+    
+    def uses(self, *apis: str) -> bool:
+        return any(api in self.apis for api in apis)
+    
+    def usages(self, api: str) -> List[Tuple[str, int]]:
+        return self.apis.get(api, [])
+    
+    def files_importing(self, module: str) -> List[str]:
+        return self.imports.get(module, [])
+    
+    @staticmethod
+    def enclosing_type(facts: Dict[str, Any], line: int) -> Optional[Tuple[str, str]]:
+        """Name and kind of the innermost type declared around a line of a file"""
+        best = None
+        for name, kind, first, last, _ in facts['types']:
+            if first <= line <= last and (best is None or first >= best[2]):
+                best = (name, kind, first)
+        return best[:2] if best else None
+    
+    def to_dict(self) -> Dict[str, Any]:
+        return {'version': self.VERSION, 'files': self.files}
+    
+    def save(self, path: str):
+        with open(path, 'w', encoding='utf-8') as f:
+            json.dump(self.to_dict(), f)
+    
+    @classmethod
+    def load(cls, path: str) -> "SymbolIndex":
+        with open(path, 'r', encoding='utf-8') as f:
+            data = json.load(f)
+        if data.get('version') != cls.VERSION:
+            raise ValueError(f"{path} is not a version {cls.VERSION} symbol index")
+        return cls(data['files'])
+
+def in_value_type(facts: Dict[str, Any], line: int, index: Callable[[], SymbolIndex]) -> bool:
+    """Whether a line belongs to a struct or enum, where closures cannot retain self
+    
+    The symbol index, needed only to resolve extensions, is requested lazily.
+    """
+    enclosing = SymbolIndex.enclosing_type(facts, line)
+    if enclosing is None:
+        return False
+    name, kind = enclosing
+    if kind == 'extension':
+        kind = index().type_kind(name)
+    return kind in VALUE_TYPE_KINDS
+
+def reported_findings(check: str, issues: Iterable[Issue], facts: Callable[[], Dict[str, Any]],
+                      index: Callable[[], SymbolIndex]) -> Iterator[Issue]:
+    """The findings of one line check that are reported, shared by analysis runs and the server
+    
+    Retain cycles inside value types are dropped. File facts are computed
+    only once a retain-cycle finding needs them.
+    """
+    if check != 'check_retain_cycles':
+        yield from issues
+        return
+    known = None
+    for issue in issues:
+        if known is None:
+            known = facts()
+        if not in_value_type(known, issue.line, index):
+            yield issue
+
+def scan_source_file(path: Path, relative_path: str):
+    """Read and scan one file; the worker entry point for parallel analysis
+    
+    Returns (error, findings, facts) so the parent never has to re-read the file.
+    """
+    source = SourceFile(path, relative_path)
+    if not source.load():
+        return source.error, None, None
+    findings = get_line_engine(relative_path=relative_path).scan(relative_path, source.lines)
+    facts = source.compute_facts()
+    source.release()
+    return None, findings, facts
+
+class AnalysisCache:
+    """Persistent per-file analysis results keyed by content hash and rule-set version
+    
+    Entries are kept in least-recently-used order; once more than
+    `max_entries` are stored the oldest are evicted on save. Project-wide
+    checks are cached together with the digests of every file they read, so
+    a change to any of their inputs invalidates them.
+    
+    A cache created without a directory lives in memory only. Resident
+    caches (used by --watch) trust the stats they have already recorded and
+    keep hydrated issues, so callers must `forget()` paths that change.
+    """
+    
+    FILE_NAME = "analysis-cache.json"
+    FORMAT = 1
+    
+    def __init__(self, cache_dir: Optional[str], version: str, max_entries: int = 10000):
+        self.path = Path(cache_dir) / self.FILE_NAME if cache_dir else None
+        self.version = version
+        self.max_entries = max_entries
+        self.resident = False
+        self.entries: "OrderedDict[str, Dict[str, Any]]" = OrderedDict()
+        self.checks: Dict[str, Dict[str, Any]] = {}
+        self.hits = 0
+        self.misses = 0
+        # relative path -> [mtime_ns, size, digest], lets unchanged files skip hashing
+        self._stats: Dict[str, List[Any]] = {}
+        self._seen: Dict[str, List[Any]] = {}
+        # relative path -> (key, findings, facts) of the last hydrated entry, resident caches only
+        self._hydrated: Dict[str, Tuple[str, Dict[str, List[Issue]], Dict[str, bool]]] = {}
+        self._load()
+    
+    def _load(self):
+        if self.path is None:
+            return
+        try:
+            with open(self.path, 'r', encoding='utf-8') as f:
+                data = json.load(f)
+        except (OSError, ValueError):
+            return
+        if data.get('format') != self.FORMAT:
+            return
+        self.entries = OrderedDict(data.get('entries', {}))
+        self.checks = data.get('checks', {})
+        self._stats = data.get('stats', {})
+    
+    def save(self):
+        """Evict least recently used entries and write the cache atomically"""
+        while len(self.entries) > self.max_entries:
+            self.entries.popitem(last=False)
+        if self.path is None:
+            return
+        
+        self.path.parent.mkdir(parents=True, exist_ok=True)
+        tmp_path = self.path.with_suffix('.tmp')
+        with open(tmp_path, 'w', encoding='utf-8') as f:
+            json.dump({
+                'format': self.FORMAT,
+                'entries': self.entries,
+                'checks': self.checks,
+                'stats': self._seen,
+            }, f, separators=(',', ':'))
+        os.replace(tmp_path, self.path)
+    
+    def digest(self, path: Path, relative_path: str, read: Optional[Callable[[], bytes]] = None) -> Optional[str]:
+        """Content hash of a file, or None if it cannot be read"""
+        if self.resident and relative_path in self._seen:
+            return self._seen[relative_path][2]
+        try:
+            stat = path.stat()
+            known = self._seen.get(relative_path) or self._stats.get(relative_path)
+            if known and known[0] == stat.st_mtime_ns and known[1] == stat.st_size:
+                digest = known[2]
+            else:
+                if read is None:
+                    read = path.read_bytes
+                import hashlib
+                digest = hashlib.sha256(read()).hexdigest()
+        except OSError:
+            return None
+        self._seen[relative_path] = [stat.st_mtime_ns, stat.st_size, digest]
+        return digest
+    
+    def forget(self, relative_path: str):
+        """Drop everything known about a path, or a directory's contents, so it is examined again"""
+        prefix = relative_path.rstrip('/') + '/' if relative_path else ''
+        for table in (self._seen, self._stats, self._hydrated):
+            for rel in [rel for rel in table if rel == relative_path or rel.startswith(prefix)]:
+                del table[rel]
+    
+    def key(self, digest: str) -> str:
+        return f"{self.version}:{digest}"
+    
+    def get(self, digest: str, relative_path: str):
+        """Return cached (findings, facts) for a file's content, or None"""
+        key = self.key(digest)
+        hydrated = self._hydrated.get(relative_path)
+        if hydrated is not None and hydrated[0] == key:
+            self.hits += 1
+            return hydrated[1], hydrated[2]
+        
+        entry = self.entries.get(key)
+        if entry is None:
+            self.misses += 1
+            return None
+        self.hits += 1
+        self.entries.move_to_end(key)
+        findings = {
+            check: [self._issue(row, relative_path) for row in rows]
+            for check, rows in entry['findings'].items()
+        }
+        if self.resident:
+            self._hydrated[relative_path] = (key, findings, entry['facts'])
+        return findings, entry['facts']
+    
+    def put(self, digest: str, findings: Dict[str, List[Issue]], facts: Dict[str, Any]):
+        self.entries[self.key(digest)] = {
+            'findings': {check: [self._row(issue) for issue in issues] for check, issues in findings.items()},
+            'facts': facts,
+        }
+        self.entries.move_to_end(self.key(digest))
+    
+    def get_check(self, name: str, deps: Dict[str, Optional[str]]) -> Optional[List[Issue]]:
+        """Return cached issues of a project-wide check if none of its inputs changed"""
+        entry = self.checks.get(name)
+        if entry is None or entry['version'] != self.version or entry['deps'] != deps:
+            return None
+        return [Issue(**issue) for issue in entry['issues']]
+    
+    def put_check(self, name: str, deps: Dict[str, Optional[str]], issues: List[Issue]):
+        self.checks[name] = {
+            'version': self.version,
+            'deps': deps,
+            'issues': [asdict(issue) for issue in issues],
+        }
+    
+    # Per-file issues are stored without their path, so identical files share an entry
+    @staticmethod
+    def _row(issue: Issue) -> List[Any]:
+        return [issue.type, issue.severity, issue.line, issue.description, issue.suggestion, issue.category]
+    
+    @staticmethod
+    def _issue(row: List[Any], relative_path: str) -> Issue:
+        type_, severity, line, description, suggestion, category = row
+        return Issue(type_, severity, relative_path, line, description, suggestion, category)
+
+def ruleset_version() -> str:
+    """Identify the rule set by hashing the analyzer source and its settings"""
+    import hashlib
+    
+    try:
+        digest = hashlib.sha256(Path(__file__).read_bytes())
+    except OSError:
+        return "unknown"
+    digest.update(json.dumps(CONTEXT_WINDOWS, sort_keys=True).encode())
+    digest.update(json.dumps(sorted(ENABLED_RULES) if ENABLED_RULES is not None else None).encode())
+    for spec in RULE_REGISTRY.values():
+        if spec.module:
+            digest.update(json.dumps(asdict(spec), sort_keys=True).encode())
+            try:
+                digest.update(Path(spec.module.rpartition(':')[0]).read_bytes())
+            except OSError:
+                pass
+    return digest.hexdigest()[:16]
+
+def configure_context_windows(windows: Dict[str, Tuple[int, int]]):
+    """Apply context window settings"""
+    CONTEXT_WINDOWS.update(windows)
+
+def worker_settings() -> Dict[str, Any]:
+    """Settings worker processes need to analyze exactly like this one"""
+    return {
+        'context_windows': dict(CONTEXT_WINDOWS),
+        'enabled_rules': ENABLED_RULES,
+        'manifest_rules': [spec for spec in RULE_REGISTRY.values() if spec.module],
+    }
+
+def configure_worker(settings: Dict[str, Any]):
+    """Initializer of worker processes"""
+    configure_context_windows(settings['context_windows'])
+    configure_rules(settings['enabled_rules'], settings['manifest_rules'])
+
+# Directories never descended into, as fnmatch patterns matched against a
+# directory's name, or against its path from the project root when the
+# pattern contains a slash
+DEFAULT_EXCLUDES = ('.*', 'DerivedData', 'build', 'Pods', 'node_modules')
+
+# Discovery settings shared by every analyzer in the process
+TRAVERSAL: Dict[str, Any] = {'excludes': list(DEFAULT_EXCLUDES), 'gitignore': True, 'git_files': False}
+_exclude_matchers: Dict[Tuple[str, ...], Tuple[Optional[re.Pattern], Optional[re.Pattern]]] = {}
+
+def configure_traversal(excludes: Iterable[str] = (), gitignore: bool = True, git_files: bool = False):
+    """Apply discovery settings; `excludes` extend the defaults"""
+    TRAVERSAL['excludes'] = list(DEFAULT_EXCLUDES) + [pattern.rstrip('/') for pattern in excludes]
+    TRAVERSAL['gitignore'] = gitignore
+    TRAVERSAL['git_files'] = git_files
+
+def is_excluded_directory(name: str, relative_dir: str) -> bool:
+    """Whether a directory matches the exclude list"""
+    excludes = tuple(TRAVERSAL['excludes'])
+    matchers = _exclude_matchers.get(excludes)
+    if matchers is None:
+        # One combined regex for name patterns and one for path patterns
+        def combine(patterns: List[str]) -> Optional[re.Pattern]:
+            return re.compile('|'.join(fnmatch.translate(p) for p in patterns)) if patterns else None
+        matchers = _exclude_matchers[excludes] = (
+            combine([p for p in excludes if '/' not in p]),
+            combine([p.lstrip('/') for p in excludes if '/' in p]),
+        )
+    by_name, by_path = matchers
+    return bool((by_name and by_name.match(name)) or (by_path and by_path.match(relative_dir)))
+
+class GitIgnore:
+    """Rules of one .gitignore file, matched against paths relative to its directory"""
+    
+    def __init__(self, text: str):
+        # (pattern, negated, directories only), in file order
+        self.rules: List[Tuple[re.Pattern, bool, bool]] = []
+        for line in text.splitlines():
+            if not line or line.startswith('#'):
+                continue
+            line = re.sub(r'(?<!\\)[ \t]+$', '', line)
+            negated = line.startswith('!')
+            if negated or line.startswith('\\'):
+                line = line[1:]
+            directories_only = line.endswith('/')
+            line = line.rstrip('/')
+            if not line:
+                continue
+            # A slash anywhere but the end anchors the pattern to this directory
+            anchored = '/' in line
+            regex = self.translate(line.lstrip('/'))
+            if not anchored:
+                regex = '(?:.*/)?' + regex
+            self.rules.append((re.compile(regex + r'\Z', re.DOTALL), negated, directories_only))
+    
+    @staticmethod
+    def translate(pattern: str) -> str:
+        """Regex for a gitignore glob, where only `**` crosses directory boundaries"""
+        parts = []
+        i = 0
+        while i < len(pattern):
+            if pattern.startswith('**/', i):
+                parts.append('(?:.*/)?')
+                i += 3
+            elif pattern.startswith('**', i):
+                parts.append('.*')
+                i += 2
+            elif pattern[i] == '*':
+                parts.append('[^/]*')
+                i += 1
+            elif pattern[i] == '?':
+                parts.append('[^/]')
+                i += 1
+            elif pattern[i] == '[' and ']' in pattern[i + 2:]:
+                end = pattern.index(']', i + 2)
+                body = pattern[i + 1:end]
+                if body.startswith('!'):
+                    body = '^' + body[1:]
+                parts.append('[' + body.replace('\\', '\\\\') + ']')
+                i = end + 1
+            elif pattern[i] == '\\' and i + 1 < len(pattern):
+                parts.append(re.escape(pattern[i + 1]))
+                i += 2
+            else:
+                parts.append(re.escape(pattern[i]))
+                i += 1
+        return ''.join(parts)
+    
+    def match(self, relative_path: str, is_dir: bool) -> Optional[bool]:
+        """True if ignored, False if re-included by a negation, None if no rule applies"""
+        for regex, negated, directories_only in reversed(self.rules):
+            if directories_only and not is_dir:
+                continue
+            if regex.match(relative_path):
+                return not negated
+        return None
+
+class SourceTree:
+    """Walks a project, pruning excluded and ignored directories before descending
+    
+    Directories matching the exclude list or ignored by .gitignore files are
+    never entered, so build products such as DerivedData cost nothing however
+    large they grow. With `git_files`, `git ls-files` lists the files instead.
+    .gitignore files between the project and its repository root apply too.
+    """
+    
+    def __init__(self, root: Path, gitignore: Optional[bool] = None, git_files: Optional[bool] = None):
+        self.root = root
+        self.gitignore = TRAVERSAL['gitignore'] if gitignore is None else gitignore
+        self.git_files = TRAVERSAL['git_files'] if git_files is None else git_files
+        # (prefix, directory, rules): a path relative to the root is matched
+        # as prefix + its remainder below directory
+        self._inherited: List[Tuple[str, str, GitIgnore]] = []
+        self._ignores: Dict[str, Optional[GitIgnore]] = {}
+        if self.gitignore:
+            self._inherited = self._repository_ignores()
+    
+    def _repository_ignores(self) -> List[Tuple[str, str, GitIgnore]]:
+        """Rules from .git/info/exclude and the .gitignore files of the root's ancestors"""
+        root = self.root.resolve()
+        for top in [root, *root.parents]:
+            if (top / '.git').exists():
+                break
+        else:
+            return []
+        
+        inherited = []
+        exclude = self._read_ignore(top / '.git' / 'info' / 'exclude')
+        if exclude is not None:
+            inherited.append((root.relative_to(top).as_posix() + '/' if top != root else '', '', exclude))
+        # Directories from the repository root down to the project root's parent
+        for directory in reversed(root.parents):
+            if directory != top and top not in directory.parents:
+                continue
+            rules = self._read_ignore(directory / '.gitignore')
+            if rules is not None:
+                inherited.append((root.relative_to(directory).as_posix() + '/', '', rules))
+        return inherited
+    
+    @staticmethod
+    def _read_ignore(path: Path) -> Optional[GitIgnore]:
+        try:
+            return GitIgnore(path.read_text(encoding='utf-8', errors='replace'))
+        except OSError:
+            return None
+    
+    def _rules_for(self, relative_dir: str) -> List[Tuple[str, str, GitIgnore]]:
+        """Every rule set applying to entries of a directory, outermost first"""
+        chains = list(self._inherited)
+        parts = relative_dir.split('/') if relative_dir else []
+        for depth in range(len(parts) + 1):
+            directory = '/'.join(parts[:depth])
+            if directory not in self._ignores:
+                self._ignores[directory] = self._read_ignore(self.root / directory / '.gitignore')
+            rules = self._ignores[directory]
+            if rules is not None:
+                chains.append(('', directory, rules))
+        return chains
+    
+    @staticmethod
+    def _ignored(chains: List[Tuple[str, str, GitIgnore]], relative_path: str, is_dir: bool) -> bool:
+        # Deeper .gitignore files take precedence over shallower ones
+        for prefix, directory, rules in reversed(chains):
+            result = rules.match(prefix + (relative_path[len(directory) + 1:] if directory else relative_path), is_dir)
+            if result is not None:
+                return result
+        return False
+    
+    def is_excluded(self, relative_path: str, is_dir: bool = False) -> bool:
+        """Whether a file, or with `is_dir` a directory, is excluded or ignored itself or lies in such a directory"""
+        parts = relative_path.split('/')
+        directories = len(parts) if is_dir else len(parts) - 1
+        for depth in range(1, directories + 1):
+            if is_excluded_directory(parts[depth - 1], '/'.join(parts[:depth])):
+                return True
+        if not self.gitignore:
+            return False
+        for depth in range(1, len(parts) + 1):
+            parent = '/'.join(parts[:depth - 1])
+            if self._ignored(self._rules_for(parent), '/'.join(parts[:depth]), depth <= directories):
+                return True
+        return False
+    
+    def walk(self, top: str = '') -> Iterator[Tuple[str, List[str], List[str]]]:
+        """Like os.walk, with paths relative to the root and pruning already applied
+        
+        `top` starts the walk at a directory below the root, which the caller
+        has checked is not excluded. Callers may prune the yielded directory
+        list further, as with os.walk.
+        """
+        pending = [top]
+        while pending:
+            relative_dir = pending.pop()
+            try:
+                entries = list(os.scandir(self.root / relative_dir))
+            except OSError:
+                continue
+            chains = self._rules_for(relative_dir) if self.gitignore else []
+            dirnames, filenames = [], []
+            for entry in entries:
+                relative_path = f"{relative_dir}/{entry.name}" if relative_dir else entry.name
+                try:
+                    is_dir = entry.is_dir(follow_symlinks=False)
+                except OSError:
+                    continue
+                if is_dir:
+                    if is_excluded_directory(entry.name, relative_path):
+                        continue
+                    if chains and self._ignored(chains, relative_path, True):
+                        continue
+                    dirnames.append(entry.name)
+                elif not chains or not self._ignored(chains, relative_path, False):
+                    filenames.append(entry.name)
+            dirnames.sort()
+            filenames.sort()
+            yield relative_dir, dirnames, filenames
+            pending.extend(f"{relative_dir}/{name}" if relative_dir else name for name in reversed(dirnames))
+    
+    def files(self, suffix: str) -> List[str]:
+        """Relative paths of the files ending in `suffix`"""
+        if self.git_files:
+            listed = self._git_files(suffix)
+            if listed is not None:
+                return listed
+        return [
+            f"{relative_dir}/{name}" if relative_dir else name
+            for relative_dir, _, filenames in self.walk()
+            for name in filenames if name.endswith(suffix)
+        ]
+    
+    def _git_files(self, suffix: str) -> Optional[List[str]]:
+        """Tracked and untracked, not ignored files from git, or None outside a repository"""
+        import subprocess
+        
+        try:
+            result = subprocess.run(
+                ["git", "ls-files", "-z", "--cached", "--others", "--exclude-standard", "--", f"*{suffix}"],
+                cwd=self.root, capture_output=True, check=True
+            )
+        except (OSError, subprocess.CalledProcessError) as e:
+            print(f"  ⚠️ git ls-files failed, walking the tree instead: {str(getattr(e, 'stderr', b'') or e).strip()}")
+            return None
+        files = []
+        for path in os.fsdecode(result.stdout).split('\0'):
+            if not path.endswith(suffix):
+                continue
+            parts = path.split('/')
+            if any(is_excluded_directory(parts[depth - 1], '/'.join(parts[:depth])) for depth in range(1, len(parts))):
+                continue
+            # Deleted files stay in the index until the deletion is staged
+            if os.path.isfile(self.root / path):
+                files.append(path)
+        return sorted(set(files))
+
+class DiffScope:
+    """Files and line ranges changed relative to a git base ref"""
+    
+    HUNK_RE = LazyPattern(r'^@@ -\d+(?:,\d+)? \+(\d+)(?:,(\d+))? @@')
+    
+    def __init__(self, base: str, changed: Dict[str, List[Tuple[int, int]]], whole_files: Iterable[str] = (),
+                 removed: Iterable[str] = ()):
+        self.base = base
+        # relative path -> inclusive (first, last) line ranges in the new file
+        self.changed = changed
+        # Files treated as changed throughout (untracked or without hunks)
+        self.whole_files = set(whole_files)
+        # Swift lines the change deleted, including those of deleted files
+        self.removed = list(removed)
+    
+    @classmethod
+    def from_git(cls, project_path: Path, base: str) -> "DiffScope":
+        """Diff the working tree against the merge base of `base` and HEAD"""
+        import subprocess
+        
+        def launch(*args: str) -> "subprocess.Popen[str]":
+            return subprocess.Popen(
+                ["git", "-c", "core.quotePath=false", *args],
+                cwd=project_path, stdout=subprocess.PIPE, stderr=subprocess.PIPE, text=True
+            )
+        
+        def output(process: "subprocess.Popen[str]") -> str:
+            stdout, stderr = process.communicate()
+            if process.returncode:
+                raise subprocess.CalledProcessError(process.returncode, process.args, stdout, stderr)
+            return stdout
+        
+        # A pre-commit hook diffs against HEAD itself, which needs no lookup
+        merge_base = base if base == "HEAD" else output(launch("merge-base", base, "HEAD")).strip()
+        # The queries are independent and mostly process startup, so they run side by side
+        processes: List["subprocess.Popen[str]"] = []
+        try:
+            for args in (("diff", "--name-status", "--no-renames", "-z", "--relative", merge_base),
+                         ("diff", "-U0", "--no-color", "--no-renames", "--relative", merge_base),
+                         ("ls-files", "--others", "--exclude-standard", "-z")):
+                processes.append(launch(*args))
+            name_status, hunks, untracked = [output(process) for process in processes]
+        finally:
+            for process in processes:
+                if process.returncode is None:
+                    process.kill()
+                    process.communicate()
+        
+        changed: Dict[str, List[Tuple[int, int]]] = {}
+        fields = name_status.split('\0')
+        for status, path in zip(fields[0::2], fields[1::2]):
+            if status != 'D':
+                changed[path] = []
+        
+        current = None
+        previous = None
+        removed: List[str] = []
+        # File headers run from "diff --git" to the first hunk; a removed
+        # line may itself start with "--- "
+        in_header = False
+        for line in hunks.splitlines():
+            if line.startswith('diff --git '):
+                in_header = True
+            elif in_header and line.startswith('--- '):
+                path = line[4:].rstrip('\t').strip('"')
+                previous = path[2:] if path.startswith('a/') else None
+            elif in_header and line.startswith('+++ '):
+                path = line[4:].rstrip('\t').strip('"')
+                current = path[2:] if path.startswith('b/') else None
+            elif line.startswith('@@'):
+                in_header = False
+                match = cls.HUNK_RE.match(line)
+                if match and current in changed:
+                    start = int(match.group(1))
+                    count = int(match.group(2)) if match.group(2) is not None else 1
+                    if count == 0:
+                        # A pure deletion reports the line before the removed block;
+                        # the lines on both sides of it count as changed
+                        changed[current].append((max(start, 1), max(start + 1, 1)))
+                    else:
+                        changed[current].append((start, start + count - 1))
+            elif line.startswith('-') and not in_header and previous and previous.endswith('.swift'):
+                removed.append(line[1:])
+        
+        # Mode changes, binary files and new untracked files carry no usable hunks
+        whole_files = [path for path, ranges in changed.items() if not ranges]
+        for path in untracked.split('\0'):
+            if path:
+                changed[path] = []
+                whole_files.append(path)
+        
+        return cls(base, changed, whole_files, removed)
+    
+    def includes(self, relative_path: str) -> bool:
+        return relative_path in self.changed
+    
+    def affects(self, paths: Iterable[str]) -> bool:
+        """Whether any changed file is one of `paths` or lies beneath one of them"""
+        for path in paths:
+            prefix = path.rstrip('/') + '/'
+            for changed in self.changed:
+                if changed == path or changed.startswith(prefix):
+                    return True
+        return False
+    
+    def touches(self, issue: Issue) -> bool:
+        """Whether an issue falls on a changed line; file-level issues always do"""
+        if issue.line <= 0 or issue.file in self.whole_files:
+            return True
+        return any(first <= issue.line <= last for first, last in self.changed.get(issue.file, ()))
+
+def issue_line_texts(project_path: Path, issues: Iterable[Issue]) -> Dict[Tuple[str, int], str]:
+    """Whitespace-normalized text of every source line that has an issue, reading each file once"""
+    wanted: Dict[str, Set[int]] = {}
+    for issue in issues:
+        if issue.line > 0:
+            wanted.setdefault(issue.file, set()).add(issue.line)
+    
+    texts: Dict[Tuple[str, int], str] = {}
+    for relative_path, numbers in wanted.items():
+        source = SourceFile(project_path / relative_path, relative_path)
+        if not source.load():
+            continue
+        lines = source.lines
+        for n in numbers:
+            if n <= len(lines):
+                texts[(relative_path, n)] = ' '.join(lines[n - 1].split())
+        source.release()
+    return texts
+
+def issue_fingerprint(issue: Issue, texts: Dict[Tuple[str, int], str]) -> str:
+    """Identity of an issue by rule, file and line content rather than line number
+    
+    File-level issues have no line to read, so their description stands in.
+    """
+    import hashlib
+    
+    content = texts.get((issue.file, issue.line), '') if issue.line > 0 else issue.description
+    key = '\0'.join((issue.type, issue.file, content))
+    return hashlib.sha1(key.encode('utf-8')).hexdigest()[:20]
 
 @dataclass
-class Issue:
-    type: str
-    severity: str  # 'critical', 'high', 'medium', 'low'
-    file: str
-    line: int
-    description: str
-    suggestion: str
-    category: str
+class BaselineComparison:
+    """Outcome of gating a run against a baseline"""
+    path: str
+    new: IssueStore
+    unchanged: int
+    resolved: List[Issue]
+    
+    def to_dict(self) -> Dict[str, Any]:
+        """Baseline section of the JSON report"""
+        return {
+            'path': self.path,
+            'new': self.new.total,
+            'unchanged': self.unchanged,
+            'resolved': len(self.resolved),
+            'resolved_issues': [issue_to_dict(issue) for issue in self.resolved],
+        }
+
+class Baseline:
+    """Fingerprints of accepted issues, indexed for constant-time matching
+    
+    Fingerprints survive edits that only shift an issue's line. Identical
+    fingerprints are counted, so another copy of a baselined line is still
+    reported as new, and baselined issues left unmatched were resolved.
+    """
+    
+    VERSION = 1
+    
+    def __init__(self, entries: List[Dict[str, Any]], path: str = ""):
+        self.path = path
+        self.entries = entries
+        # fingerprint -> positions of its entries
+        self.index: Dict[str, List[int]] = {}
+        for position, entry in enumerate(entries):
+            self.index.setdefault(entry['fingerprint'], []).append(position)
+    
+    @classmethod
+    def load(cls, path: str) -> "Baseline":
+        with open(path, 'r', encoding='utf-8') as f:
+            data = json.load(f)
+        if not isinstance(data, dict) or data.get('version') != cls.VERSION:
+            raise ValueError(f"{path} is not a version {cls.VERSION} baseline")
+        entries = data.get('issues', [])
+        if not all(isinstance(entry, dict) and 'fingerprint' in entry for entry in entries):
+            raise ValueError(f"{path} has issues without fingerprints")
+        return cls(entries, path)
+    
+    @classmethod
+    def write(cls, path: str, project_path: Path, issues: IssueSink):
+        """Record every issue of a run as accepted"""
+        from datetime import datetime
+        
+        texts = issue_line_texts(project_path, issues)
+        with open(path, 'w', encoding='utf-8') as f:
+            f.write(json.dumps({
+                'version': cls.VERSION,
+                'generated_at': datetime.now().isoformat(),
+                'total_issues': issues.total,
+            }, indent=2)[:-2])
+            f.write(',\n  "issues": [')
+            # One issue per line keeps baseline updates readable in diffs
+            separator = '\n'
+            for issue in issues:
+                entry = {'fingerprint': issue_fingerprint(issue, texts), **issue_to_dict(issue)}
+                f.write(separator + '    ' + json.dumps(entry))
+                separator = ',\n'
+            f.write('\n  ]\n}\n' if issues.total else ']\n}\n')
+    
+    def compare(self, project_path: Path, issues: IssueSink) -> BaselineComparison:
+        """Split a run's issues into new ones and those already in the baseline"""
+        texts = issue_line_texts(project_path, issues)
+        remaining = {fingerprint: len(positions) for fingerprint, positions in self.index.items()}
+        new = IssueStore()
+        unchanged = 0
+        for issue in issues:
+            fingerprint = issue_fingerprint(issue, texts)
+            if remaining.get(fingerprint):
+                remaining[fingerprint] -= 1
+                unchanged += 1
+            else:
+                new.add(issue)
+        
+        resolved_positions = sorted(
+            position
+            for fingerprint, count in remaining.items() if count
+            for position in self.index[fingerprint][-count:]
+        )
+        fields = Issue.__dataclass_fields__
+        resolved = [
+            Issue(**{name: self.entries[position].get(name) for name in fields})
+            for position in resolved_positions
+        ]
+        return BaselineComparison(self.path, new, unchanged, resolved)
+
+@dataclass
+class HistoryDelta:
+    """Issues introduced and resolved since the previous recorded run"""
+    run: Dict[str, Any]
+    previous: Optional[Dict[str, Any]]
+    introduced: List[Issue]
+    resolved: List[Issue]
+    
+    def to_dict(self) -> Dict[str, Any]:
+        """History section of the JSON report"""
+        return {
+            'run': self.run,
+            'previous_run': self.previous,
+            'introduced': len(self.introduced),
+            'resolved': len(self.resolved),
+            'introduced_issues': [issue_to_dict(issue) for issue in self.introduced],
+            'resolved_issues': [issue_to_dict(issue) for issue in self.resolved],
+        }
+
+class IssueHistory:
+    """Append-only SQLite store of per-run issue counts and issue changes
+    
+    Every run adds its totals per severity, category, file and rule, and a
+    row for each issue introduced or resolved since the previous run,
+    matched by fingerprint like a baseline. The issues open after the
+    latest run are kept alongside, so recording a run writes only the
+    changes and the delta of a run is read back from them alone.
+    """
+    
+    VERSION = 1
+    # Report dimension -> Issue field
+    DIMENSIONS = {'severity': 'severity', 'category': 'category', 'file': 'file', 'rule': 'type'}
+    SCHEMA = """
+        CREATE TABLE IF NOT EXISTS runs (
+            id INTEGER PRIMARY KEY,
+            recorded_at TEXT NOT NULL,
+            commit_sha TEXT,
+            total INTEGER NOT NULL
+        );
+        CREATE INDEX IF NOT EXISTS runs_by_commit ON runs (commit_sha);
+        CREATE TABLE IF NOT EXISTS counts (
+            dimension TEXT NOT NULL,
+            key TEXT NOT NULL,
+            run_id INTEGER NOT NULL REFERENCES runs (id),
+            count INTEGER NOT NULL,
+            PRIMARY KEY (dimension, key, run_id)
+        ) WITHOUT ROWID;
+        CREATE INDEX IF NOT EXISTS counts_by_run ON counts (run_id, dimension);
+        CREATE TABLE IF NOT EXISTS changes (
+            run_id INTEGER NOT NULL REFERENCES runs (id),
+            fingerprint TEXT NOT NULL,
+            change INTEGER NOT NULL,
+            type TEXT, severity TEXT, file TEXT, line INTEGER,
+            description TEXT, suggestion TEXT, category TEXT
+        );
+        CREATE INDEX IF NOT EXISTS changes_by_run ON changes (run_id);
+        CREATE INDEX IF NOT EXISTS changes_by_fingerprint ON changes (fingerprint);
+        CREATE TABLE IF NOT EXISTS open_issues (
+            fingerprint TEXT PRIMARY KEY,
+            count INTEGER NOT NULL,
+            type TEXT, severity TEXT, file TEXT, line INTEGER,
+            description TEXT, suggestion TEXT, category TEXT
+        );
+    """
+    
+    def __init__(self, path: str):
+        import sqlite3
+        
+        self.path = path
+        try:
+            self.db = sqlite3.connect(path)
+        except sqlite3.Error as e:
+            raise ValueError(f"cannot open {path}: {e}")
+        try:
+            version = self.db.execute("PRAGMA user_version").fetchone()[0]
+            if version not in (0, self.VERSION):
+                raise ValueError(f"{path} is a version {version} history, expected {self.VERSION}")
+            self.db.executescript(self.SCHEMA)
+            self.db.execute(f"PRAGMA user_version = {self.VERSION}")
+        except sqlite3.Error as e:
+            self.db.close()
+            raise ValueError(f"{path} is not an analysis history: {e}")
+        except ValueError:
+            self.db.close()
+            raise
+    
+    def close(self):
+        self.db.close()
+    
+    @staticmethod
+    def _values(issue: Issue) -> Tuple[Any, ...]:
+        return tuple(getattr(issue, name) for name in ISSUE_FIELDS)
+    
+    @staticmethod
+    def _run(row: Optional[tuple]) -> Optional[Dict[str, Any]]:
+        if row is None:
+            return None
+        return dict(zip(('id', 'recorded_at', 'commit', 'total'), row))
+    
+    def record(self, project_path: Path, issues: IssueSink, commit: Optional[str] = None) -> HistoryDelta:
+        """Append a run and return what changed since the previous one"""
+        from datetime import datetime
+        
+        texts = issue_line_texts(project_path, issues)
+        found: Dict[str, List[Issue]] = {}
+        counts: Dict[Tuple[str, str], int] = {}
+        for issue in issues:
+            found.setdefault(issue_fingerprint(issue, texts), []).append(issue)
+            for dimension, field in self.DIMENSIONS.items():
+                key = (dimension, getattr(issue, field))
+                counts[key] = counts.get(key, 0) + 1
+        
+        with self.db:
+            previous = self._run(self.db.execute(
+                "SELECT id, recorded_at, commit_sha, total FROM runs ORDER BY id DESC LIMIT 1"
+            ).fetchone())
+            remaining = dict(self.db.execute("SELECT fingerprint, count FROM open_issues"))
+            recorded_at = datetime.now().isoformat(timespec='seconds')
+            run_id = self.db.execute(
+                "INSERT INTO runs (recorded_at, commit_sha, total) VALUES (?, ?, ?)",
+                (recorded_at, commit, issues.total)
+            ).lastrowid
+            self.db.executemany(
+                "INSERT INTO counts (dimension, key, run_id, count) VALUES (?, ?, ?, ?)",
+                [(dimension, key, run_id, count) for (dimension, key), count in counts.items()]
+            )
+            
+            # Like a baseline, extra copies of a fingerprint are new and missing copies resolved
+            introduced: List[Tuple[str, Issue]] = []
+            gone: Dict[str, int] = {}
+            for fingerprint, occurrences in found.items():
+                extra = len(occurrences) - remaining.pop(fingerprint, 0)
+                if extra > 0:
+                    introduced.extend((fingerprint, issue) for issue in occurrences[-extra:])
+                elif extra < 0:
+                    gone[fingerprint] = -extra
+            gone.update(remaining)
+            
+            columns = ', '.join(ISSUE_FIELDS)
+            resolved: List[Tuple[str, Issue]] = []
+            for fingerprint, count in gone.items():
+                row = self.db.execute(
+                    f"SELECT {columns} FROM open_issues WHERE fingerprint = ?", (fingerprint,)
+                ).fetchone()
+                resolved.extend((fingerprint, Issue(*row)) for _ in range(count))
+                self.db.execute("UPDATE open_issues SET count = count - ? WHERE fingerprint = ?", (count, fingerprint))
+            self.db.execute("DELETE FROM open_issues WHERE count <= 0")
+            
+            for fingerprint, issue in introduced:
+                self.db.execute(
+                    f"INSERT INTO open_issues (fingerprint, count, {columns}) VALUES (?, 1, ?, ?, ?, ?, ?, ?, ?) "
+                    "ON CONFLICT (fingerprint) DO UPDATE SET count = count + 1",
+                    (fingerprint, *self._values(issue))
+                )
+            self.db.executemany(
+                f"INSERT INTO changes (run_id, fingerprint, change, {columns}) VALUES (?, ?, ?, ?, ?, ?, ?, ?, ?, ?)",
+                [(run_id, fingerprint, 1, *self._values(issue)) for fingerprint, issue in introduced]
+                + [(run_id, fingerprint, -1, *self._values(issue)) for fingerprint, issue in resolved]
+            )
+        
+        run = {'id': run_id, 'recorded_at': recorded_at, 'commit': commit, 'total': issues.total}
+        return HistoryDelta(run, previous, [issue for _, issue in introduced], [issue for _, issue in resolved])
+    
+    def trend(self, dimension: str, key: Optional[str] = None,
+              runs: int = 10) -> Tuple[List[Dict[str, Any]], Dict[str, List[int]]]:
+        """Counts of a dimension over the latest runs, oldest first
+        
+        Returns the runs and, for every key seen in them (or only `key`),
+        its count in each run.
+        """
+        if dimension not in self.DIMENSIONS:
+            raise ValueError(f"unknown trend dimension '{dimension}', expected one of {', '.join(self.DIMENSIONS)}")
+        latest = [self._run(row) for row in self.db.execute(
+            "SELECT id, recorded_at, commit_sha, total FROM runs ORDER BY id DESC LIMIT ?", (runs,)
+        )][::-1]
+        if not latest:
+            return [], {}
+        
+        position = {run['id']: i for i, run in enumerate(latest)}
+        query = "SELECT key, run_id, count FROM counts WHERE dimension = ? AND run_id >= ?"
+        params: List[Any] = [dimension, latest[0]['id']]
+        if key is not None:
+            query += " AND key = ?"
+            params.append(key)
+        series: Dict[str, List[int]] = {}
+        for found_key, run_id, count in self.db.execute(query, params):
+            series.setdefault(found_key, [0] * len(latest))[position[run_id]] = count
+        if key is not None and key not in series:
+            series[key] = [0] * len(latest)
+        return latest, series
+
+def head_commit(project_path: Path) -> Optional[str]:
+    """Commit checked out in the project's git repository, or None outside one"""
+    import subprocess
+    
+    try:
+        result = subprocess.run(["git", "rev-parse", "HEAD"], cwd=project_path,
+                                capture_output=True, text=True, check=True)
+    except (OSError, subprocess.CalledProcessError):
+        return None
+    return result.stdout.strip() or None
+
+class AnalysisStopped(Exception):
+    """Raised inside the checks when a fail-fast run has found enough issues"""
+
+class AnalysisBudget:
+    """Limits that end an analysis early with partial results
+    
+    Time and file budgets stop scanning files once they run out; files
+    already scanned are still reported. Fail-fast mode reports only issues
+    of `severity` or worse and stops the analysis at the `max_issues`th.
+    """
+    
+    def __init__(self, seconds: Optional[float] = None, files: Optional[int] = None,
+                 severity: Optional[str] = None, max_issues: int = 1):
+        self.seconds = seconds
+        self.files = files
+        self.severity = severity
+        self.max_issues = max_issues
+        self.deadline: Optional[float] = None
+        self.files_scanned = 0
+        self.issues_found = 0
+        # 'time_budget', 'file_budget' or 'fail_fast' once the analysis was cut short
+        self.stop_reason: Optional[str] = None
+    
+    def start(self):
+        if self.seconds is not None:
+            self.deadline = time.perf_counter() + self.seconds
+    
+    def allows_scan(self) -> bool:
+        """Whether another file may be scanned; counts it if so"""
+        if self.stop_reason is None:
+            if self.files is not None and self.files_scanned >= self.files:
+                self.stop_reason = 'file_budget'
+            elif self.deadline is not None and time.perf_counter() >= self.deadline:
+                self.stop_reason = 'time_budget'
+        if self.stop_reason is not None:
+            return False
+        self.files_scanned += 1
+        return True
+    
+    def reports(self, issue: Issue) -> bool:
+        """Whether an issue is severe enough for a fail-fast run"""
+        return self.severity is None or severity_rank(issue.severity) <= severity_rank(self.severity)
+    
+    def count(self, issue: Issue):
+        """Count a reported issue, stopping a fail-fast run once enough were found"""
+        if self.severity is None:
+            return
+        self.issues_found += 1
+        if self.issues_found >= self.max_issues:
+            self.stop_reason = 'fail_fast'
+            raise AnalysisStopped()
+    
+    def to_dict(self, files_analyzed: int, files_total: int) -> Dict[str, Any]:
+        """Partial section of the reports"""
+        data: Dict[str, Any] = {
+            'reason': self.stop_reason,
+            'files_analyzed': files_analyzed,
+            'files_total': files_total,
+        }
+        if self.stop_reason == 'time_budget':
+            data['time_budget_seconds'] = self.seconds
+        elif self.stop_reason == 'file_budget':
+            data['file_budget'] = self.files
+        else:
+            data['severity'] = self.severity
+            data['max_issues'] = self.max_issues
+        return data
+
+class Profiler:
+    """Timing instrumentation collected by --profile
+    
+    Analysis phases, individual line rules and per-file scans are timed
+    through a separately built engine whose rules are wrapped with counters,
+    so runs without --profile use the plain engine and pay nothing.
+    """
+    
+    def __init__(self, startup_seconds: float = 0.0):
+        # Interpreter start is not visible from here; this covers imports and module setup
+        self.startup_seconds = startup_seconds
+        self.phases: Dict[str, Dict[str, Any]] = {}
+        self.rules: Dict[str, Dict[str, Any]] = {}
+        self.files: Dict[str, Dict[str, Any]] = {}
+        self.rule_evaluations = 0
+        self._engines: Dict[Tuple[str, ...], LineRuleEngine] = {}
+    
+    @contextlib.contextmanager
+    def phase(self, name: str, sink: IssueSink):
+        start = time.perf_counter()
+        issues_before = sink.total
+        try:
+            yield
+        finally:
+            stats = self.phases.setdefault(name, {'seconds': 0.0, 'issues': 0})
+            stats['seconds'] += time.perf_counter() - start
+            stats['issues'] += sink.total - issues_before
+    
+    def wrap_rule(self, rule: LineRule) -> LineRule:
+        """Return a copy of a rule that records its time, evaluations and issues"""
+        name = f"{rule.check}:{rule.match.__name__}"
+        stats = self.rules.setdefault(name, {'check': rule.check, 'seconds': 0.0, 'evaluations': 0, 'issues': 0})
+        match = rule.match
+        clock = time.perf_counter
+        
+        def timed(ctx: ScanContext, i: int, line: str) -> List[Issue]:
+            start = clock()
+            found = list(match(ctx, i, line))
+            stats['seconds'] += clock() - start
+            stats['evaluations'] += 1
+            stats['issues'] += len(found)
+            self.rule_evaluations += 1
+            return found
+        
+        return LineRule(rule.check, rule.triggers, timed)
+    
+    def scan(self, file: str, lines: Sequence[str]) -> Dict[str, List[Issue]]:
+        """Scan a file with the instrumented engine and record per-file totals"""
+        specs = line_rule_specs(relative_path=file)
+        key = tuple(spec.id for spec in specs)
+        engine = self._engines.get(key)
+        if engine is None:
+            engine = self._engines[key] = LineRuleEngine([self.wrap_rule(load_line_rule(spec)) for spec in specs])
+        
+        evaluations_before = self.rule_evaluations
+        start = time.perf_counter()
+        findings = engine.scan(file, lines)
+        self.files[file] = {
+            'seconds': time.perf_counter() - start,
+            'lines': len(lines),
+            # One prefilter search per line plus every rule evaluation
+            'regex_evaluations': len(lines) + self.rule_evaluations - evaluations_before,
+            'issues': sum(len(issues) for issues in findings.values()),
+        }
+        return findings
+    
+    def to_dict(self) -> Dict[str, Any]:
+        """Profile section of the JSON report, slowest entries first"""
+        def rounded(stats: Dict[str, Any]) -> Dict[str, Any]:
+            return {key: round(value, 6) if isinstance(value, float) else value for key, value in stats.items()}
+        
+        def slowest(table: Dict[str, Dict[str, Any]]) -> Dict[str, Any]:
+            ordered = sorted(table.items(), key=lambda item: (-item[1]['seconds'], item[0]))
+            return {name: rounded(stats) for name, stats in ordered}
+        
+        return {
+            'startup_seconds': round(self.startup_seconds, 6),
+            'phases': {name: rounded(stats) for name, stats in self.phases.items()},
+            'rules': slowest(self.rules),
+            'files': slowest(self.files),
+            'lines_scanned': sum(stats['lines'] for stats in self.files.values()),
+        }
+
+class PlistDict(dict):
+    """Dictionary parsed from a property list that remembers the line of each key"""
+    
+    __slots__ = ('lines',)
+    
+    def __init__(self):
+        super().__init__()
+        self.lines: Dict[str, int] = {}
+
+class OpenStepPlistParser:
+    """Parser for the OpenStep property list format used by project.pbxproj
+    
+    Dictionaries become `PlistDict`s, arrays lists and every scalar a string,
+    which is how Xcode itself treats the format.
+    """
+    
+    TOKEN_RE = LazyPattern(r"""
+        (?P<space>\s+)
+      | (?P<comment>/\*.*?\*/|//[^\n]*)
+      | (?P<quoted>"(?:[^"\\]|\\.)*")
+      | (?P<data><[0-9A-Fa-f\s]*>)
+      | (?P<word>(?:[\w$+:.\-]|/(?![/*]))+)
+      | (?P<punctuation>[{}()=;,])
+      | (?P<invalid>.)
+    """, re.VERBOSE | re.DOTALL)
+    ESCAPE_RE = LazyPattern(r'\\(U[0-9A-Fa-f]{4}|[0-7]{1,3}|.)', re.DOTALL)
+    ESCAPES = {'n': '\n', 't': '\t', 'r': '\r', 'a': '\a', 'b': '\b', 'f': '\f', 'v': '\v'}
+    
+    def __init__(self, text: str):
+        self.text = text
+        self.tokens = [
+            (match.lastgroup, match.group(), match.start())
+            for match in self.TOKEN_RE.finditer(text)
+            if match.lastgroup not in ('space', 'comment')
+        ]
+        self._newlines: Optional[List[int]] = None
+    
+    def parse(self) -> Any:
+        value, i = self._value(0)
+        if i != len(self.tokens):
+            self._error(i, "unexpected content after the root object")
+        return value
+    
+    def line_of(self, offset: int) -> int:
+        if self._newlines is None:
+            self._newlines = [match.start() for match in re.finditer('\n', self.text)]
+        return bisect.bisect_left(self._newlines, offset) + 1
+    
+    def _error(self, i: int, message: str):
+        if i < len(self.tokens):
+            raise ValueError(f"line {self.line_of(self.tokens[i][2])}: {message}")
+        raise ValueError(f"unexpected end of file: {message}")
+    
+    def _token(self, i: int) -> Tuple[str, str, int]:
+        if i >= len(self.tokens):
+            self._error(i, "unterminated value")
+        kind, text, offset = self.tokens[i]
+        if kind == 'invalid':
+            self._error(i, f"unexpected character {text!r}")
+        return kind, text, offset
+    
+    def _unquote(self, text: str) -> str:
+        body = text[1:-1]
+        if '\\' not in body:
+            return body
+        
+        def escape(match: re.Match) -> str:
+            code = match.group(1)
+            if code[0] == 'U' and len(code) == 5:
+                return chr(int(code[1:], 16))
+            if code[0] in '01234567':
+                return chr(int(code, 8))
+            return self.ESCAPES.get(code, code)
+        
+        return self.ESCAPE_RE.sub(escape, body)
+    
+    def _value(self, i: int) -> Tuple[Any, int]:
+        kind, text, _ = self._token(i)
+        if text == '{':
+            return self._dict(i + 1)
+        if text == '(':
+            return self._array(i + 1)
+        if kind == 'quoted':
+            return self._unquote(text), i + 1
+        if kind in ('word', 'data'):
+            return text, i + 1
+        self._error(i, f"unexpected '{text}'")
+    
+    def _dict(self, i: int) -> Tuple[PlistDict, int]:
+        result = PlistDict()
+        while True:
+            kind, text, offset = self._token(i)
+            if text == '}':
+                return result, i + 1
+            if kind == 'quoted':
+                key = self._unquote(text)
+            elif kind == 'word':
+                key = text
+            else:
+                self._error(i, "expected a dictionary key")
+            if self._token(i + 1)[1] != '=':
+                self._error(i + 1, "expected '='")
+            value, i = self._value(i + 2)
+            if self._token(i)[1] != ';':
+                self._error(i, "expected ';'")
+            result[key] = value
+            result.lines[key] = self.line_of(offset)
+            i += 1
+    
+    def _array(self, i: int) -> Tuple[List[Any], int]:
+        result = []
+        while True:
+            if self._token(i)[1] == ')':
+                return result, i + 1
+            value, i = self._value(i)
+            result.append(value)
+            separator = self._token(i)[1]
+            if separator == ',':
+                i += 1
+            elif separator != ')':
+                self._error(i, "expected ',' or ')'")
+
+def parse_version(value: str) -> Optional[Tuple[int, ...]]:
+    """Numeric version for comparison, e.g. '15.5' -> (15, 5); None for build variables
+    
+    Trailing zero components are dropped so that 15, 15.0 and 15.0.0 compare equal.
+    """
+    if not re.fullmatch(r'\d+(?:\.\d+)*', value.strip()):
+        return None
+    parts = [int(part) for part in value.strip().split('.')]
+    while len(parts) > 1 and parts[-1] == 0:
+        parts.pop()
+    return tuple(parts)
+
+@dataclass
+class BuildConfiguration:
+    """One build configuration (e.g. Debug) of a target or of the project itself"""
+    id: str
+    name: str
+    owner: str  # target name, or the project name for project-level settings
+    settings: Dict[str, Any]
+    lines: Dict[str, int]  # setting -> line in project.pbxproj
+
+class PBXProject:
+    """Indexed object graph of a project.pbxproj: targets -> build configurations -> settings"""
+    
+    def __init__(self, data: Dict[str, Any], name: str):
+        self.name = name
+        self.objects: Dict[str, Any] = data.get('objects', {})
+        root = self.objects.get(data.get('rootObject'), {})
+        
+        self.project_configurations = self._configurations(root.get('buildConfigurationList'), name)
+        self.targets: Dict[str, List[BuildConfiguration]] = {}
+        for target_id in root.get('targets', []):
+            target = self.objects.get(target_id, {})
+            target_name = target.get('name', target_id)
+            self.targets[target_name] = self._configurations(target.get('buildConfigurationList'), target_name)
+        
+        # setting name -> configurations that set it, project level first
+        self._index: Dict[str, List[BuildConfiguration]] = {}
+        for configuration in self.configurations():
+            for setting in configuration.settings:
+                self._index.setdefault(setting, []).append(configuration)
+    
+    def _configurations(self, list_id: Optional[str], owner: str) -> List[BuildConfiguration]:
+        configurations = []
+        for configuration_id in self.objects.get(list_id, {}).get('buildConfigurations', []):
+            entry = self.objects.get(configuration_id, {})
+            settings = entry.get('buildSettings', PlistDict())
+            configurations.append(BuildConfiguration(
+                configuration_id, entry.get('name', configuration_id), owner,
+                settings, getattr(settings, 'lines', {})
+            ))
+        return configurations
+    
+    def configurations(self) -> List[BuildConfiguration]:
+        """Project-level configurations followed by those of every target"""
+        return self.project_configurations + [
+            configuration for configurations in self.targets.values() for configuration in configurations
+        ]
+    
+    def setting(self, name: str) -> List[Tuple[BuildConfiguration, Any]]:
+        """Every configuration that sets `name`, with its value"""
+        return [(configuration, configuration.settings[name]) for configuration in self._index.get(name, ())]
+    
+    def effective_setting(self, target: str, configuration_name: str, name: str) -> Optional[Any]:
+        """Value a target builds with: its own setting, else the project-level one"""
+        for configuration in self.targets.get(target, []) + self.project_configurations:
+            if configuration.name == configuration_name and name in configuration.settings:
+                return configuration.settings[name]
+        return None
+
+# absolute path -> (mtime_ns, size, sha256, parsed project)
+_pbxproj_cache: Dict[str, Tuple[int, int, str, PBXProject]] = {}
+
+def describe_configurations(configurations: Iterable[BuildConfiguration]) -> str:
+    """Human-readable list such as 'S Quote (Debug, Release), S QuoteTests (Debug)'"""
+    by_owner: Dict[str, List[str]] = {}
+    for configuration in configurations:
+        by_owner.setdefault(configuration.owner, []).append(configuration.name)
+    return ', '.join(f"{owner} ({', '.join(names)})" for owner, names in by_owner.items())
+
+def load_pbxproj(path: Path) -> PBXProject:
+    """Parse a project.pbxproj, reusing the object graph while the file is unchanged
+    
+    An unchanged modification time and size skip reading the file; after a
+    touch or checkout the content hash decides whether to parse again.
+    """
+    stat = path.stat()
+    key = os.path.abspath(path)
+    cached = _pbxproj_cache.get(key)
+    if cached and cached[0] == stat.st_mtime_ns and cached[1] == stat.st_size:
+        return cached[3]
+    
+    import hashlib
+    
+    raw = path.read_bytes()
+    digest = hashlib.sha256(raw).hexdigest()
+    if cached and cached[2] == digest:
+        project = cached[3]
+    else:
+        project = PBXProject(OpenStepPlistParser(raw.decode('utf-8')).parse(), path.parent.stem)
+    _pbxproj_cache[key] = (stat.st_mtime_ns, stat.st_size, digest, project)
+    return project
 
 class CodeAnalyzer:
-    def __init__(self, project_path: str):
+    # Xcode project analyzed when the project root holds none or several
+    DEFAULT_APP_NAME = "S Quote"
+    
+    # Layout paths relative to the project root, where {app} is the Xcode
+    # project name and {module} its product module name
+    PBXPROJ_FILE = "{app}.xcodeproj/project.pbxproj"
+    ENTITLEMENTS_FILE = "{app}/{module}.entitlements"
+    REQUIRED_FILES = [
+        PBXPROJ_FILE,
+        "{app}/{module}App.swift",
+        "{app}/ContentView.swift",
+        "README.md"
+    ]
+    EXPECTED_FOLDERS = ["Models", "Views", "ViewModels", "Services"]
+    RECOMMENDED_DEPLOYMENT_TARGET = "15.5"
+    
+    # Files read by project-wide checks. Used to invalidate cached results and
+    # to decide whether a diff-scoped run needs them.
+    PROJECT_CHECK_INPUTS = {
+        'check_project_structure': REQUIRED_FILES + ["{app}/" + folder for folder in EXPECTED_FOLDERS],
+        'check_build_configuration': [PBXPROJ_FILE],
+        'check_dependencies': ["Package.swift", "Podfile"],
+        'check_security_issues': [ENTITLEMENTS_FILE],
+    }
+    
+    # Project-wide checks whose results are cached together with their input digests
+    CACHED_CHECKS = {'check_build_configuration', 'check_security_issues', 'check_data_persistence'}
+    
+    # Analysis phases in reporting order
+    CHECK_PHASES = (
+        'check_project_structure',
+        'analyze_swift_files',
+        'check_build_configuration',
+        'check_dependencies',
+        'check_security_issues',
+        'check_performance_issues',
+        'check_ui_issues',
+        'check_data_persistence',
+        'check_custom_rules',
+    )
+    
+    def __init__(self, project_path: str, jobs: int = 1, cache: Optional[AnalysisCache] = None,
+                 scope: Optional[DiffScope] = None, sink: Optional[IssueSink] = None,
+                 profiler: Optional["Profiler"] = None, swift_paths: Optional[Iterable[str]] = None,
+                 app_name: Optional[str] = None, budget: Optional[AnalysisBudget] = None):
         self.project_path = Path(project_path)
-        self.issues: List[Issue] = []
+        self.app_name = app_name or self.detect_app_name(self.project_path)
+        self.module_name = re.sub(r'\W', '_', self.app_name)
+        if self.module_name[:1].isdigit():
+            self.module_name = '_' + self.module_name
+        self.project_check_inputs = {
+            name: [self.project_file(path) for path in paths]
+            for name, paths in self.PROJECT_CHECK_INPUTS.items()
+        }
+        # Known Swift sources relative to the project; skips the directory walk when given
+        self.swift_paths = swift_paths
+        self.profiler = profiler
+        self.jobs = jobs
+        self.cache = cache
+        self.scope = scope
+        self.budget = budget
+        self.sink = sink if sink is not None else IssueStore()
+        self._captured: Optional[List[Issue]] = None
+        self._swift_files: Optional[List[SourceFile]] = None
+        self._project_swift_files: Optional[List[SourceFile]] = None
+        self._symbol_index: Optional[SymbolIndex] = None
+        
+    @classmethod
+    def detect_app_name(cls, project_path: Path) -> str:
+        """Name of the Xcode project at the project root"""
+        names = sorted(path.stem for path in project_path.glob("*.xcodeproj"))
+        if len(names) == 1 or (names and cls.DEFAULT_APP_NAME not in names):
+            return names[0]
+        return cls.DEFAULT_APP_NAME
+    
+    def project_file(self, template: str) -> str:
+        """A layout path for this project"""
+        return template.format(app=self.app_name, module=self.module_name)
+    
+    def swift_files(self) -> List[SourceFile]:
+        """Swift sources to analyze: the whole project, or only changed files when diff-scoped"""
+        if self._swift_files is None:
+            if self.scope is None:
+                self._swift_files = self.project_swift_files()
+            else:
+                self._swift_files = [
+                    SourceFile(self.project_path / rel, rel)
+                    for rel in sorted(self.scope.changed)
+                    if rel.endswith(".swift") and self.is_analyzed_path(rel)
+                    and (self.project_path / rel).is_file()
+                ]
+        return self._swift_files
+    
+    def project_swift_files(self) -> List[SourceFile]:
+        """Discover every Swift source once and share the inventory across checks"""
+        if self._project_swift_files is None:
+            # Reuse already loaded diff-scoped files instead of reading them again
+            known = {source.relative_path: source for source in self._swift_files or []}
+            self._project_swift_files = []
+            if self.swift_paths is not None:
+                paths = [rel for rel in self.swift_paths if self.is_analyzed_path(rel)]
+            else:
+                paths = SourceTree(self.project_path).files(".swift")
+            for rel in paths:
+                self._project_swift_files.append(known.get(rel) or SourceFile(self.project_path / rel, rel))
+            # Sorted so reports do not depend on directory listing order
+            self._project_swift_files.sort(key=lambda source: source.relative_path)
+        return self._project_swift_files
+    
+    @staticmethod
+    def is_analyzed_path(relative_path: str) -> bool:
+        """Whether no directory on a relative path is excluded from analysis"""
+        parts = relative_path.replace(os.sep, '/').split('/')
+        return not any(
+            is_excluded_directory(parts[depth - 1], '/'.join(parts[:depth])) for depth in range(1, len(parts))
+        )
+    
+    def scan_files_parallel(self, report: Optional[Callable[[SourceFile], None]] = None):
+        """Scan all Swift files in a process pool
+        
+        Results are applied in inventory order, so the merged issue list is
+        identical to a serial run. With `report`, each file is passed to it as
+        soon as its results arrive.
+        """
+        from concurrent.futures import ProcessPoolExecutor
         
-    def analyze(self) -> List[Issue]:
+        if not any(source.findings is None and not source.error for source in self.swift_files()):
+            return
+        
+        with ProcessPoolExecutor(max_workers=self.jobs, initializer=configure_worker,
+                                 initargs=(worker_settings(),)) as pool:
+            try:
+                self.collect_scans(self.submit_scans(pool), report)
+            finally:
+                # Scans still queued are not needed once a budget stopped collecting
+                pool.shutdown(cancel_futures=True)
+    
+    def submit_scans(self, pool) -> Tuple[List[SourceFile], Iterator[tuple]]:
+        """Queue every file still to be scanned on a process pool
+        
+        The pool may be shared with other analyzers; results are collected
+        later by collect_scans.
+        """
+        pending = [source for source in self.swift_files() if source.findings is None and not source.error]
+        chunksize = max(1, len(pending) // (self.jobs * 4))
+        if self.budget is not None:
+            # Small chunks let a budget stop the pool without waiting on large batches
+            chunksize = min(chunksize, 8)
+        results = pool.map(
+            scan_source_file,
+            [source.path for source in pending],
+            [source.relative_path for source in pending],
+            chunksize=chunksize,
+        )
+        return pending, results
+    
+    def collect_scans(self, submitted: Tuple[List[SourceFile], Iterator[tuple]],
+                      report: Optional[Callable[[SourceFile], None]] = None):
+        """Apply pool results in inventory order, waiting for them as needed"""
+        pending, results = submitted
+        for source, (error, findings, facts) in zip(pending, results):
+            if self.budget is not None and not self.budget.allows_scan():
+                break
+            source.mark_loaded(error)
+            source.findings = findings
+            source.facts = facts
+            self.remember_scan(source)
+            if report is not None:
+                report(source)
+    
+    def analyze(self) -> IssueSink:
         """Run all analysis methods"""
         print("🔍 Analyzing S-Quote codebase...")
         
-        self.check_project_structure()
-        self.analyze_swift_files()
-        self.check_build_configuration()
-        self.check_dependencies()
-        self.check_security_issues()
-        self.check_performance_issues()
-        self.check_ui_issues()
-        self.check_data_persistence()
+        if self.budget is not None:
+            self.budget.start()
+        self.prepare()
+        
+        # Fail-fast runs scan while reporting, so cheaper project checks can stop them first
+        if self.jobs > 1 and not self.fails_fast():
+            self.run_phase('parallel_scan', self.scan_files_parallel)
+        
+        return self.run_checks()
+    
+    def prepare(self):
+        """Discover the Swift sources and serve what the cache can"""
+        self.run_phase('discovery', self.swift_files)
+        
+        if self.cache is not None:
+            self.run_phase('cache_lookup', self.load_cached_results)
+    
+    def run_checks(self) -> IssueSink:
+        """Run every check, reusing files that were already scanned"""
+        if self.scope is not None:
+            print(f"  🔀 Limiting analysis to {len(self.scope.changed)} files changed since {self.scope.base}")
+        
+        phases = self.CHECK_PHASES
+        if self.fails_fast():
+            # Phases with the most severe rules go first so a failing run stops soonest
+            phases = sorted(phases, key=phase_severity)
+        try:
+            for name in phases:
+                self.run_phase(name)
+        except AnalysisStopped:
+            pass
+        
+        if self.cache is not None:
+            self.save_cache()
+        
+        return self.sink
+    
+    def run_phase(self, name: str, run: Optional[Callable[[], Any]] = None):
+        """Run one analysis phase, timing it when profiling is enabled"""
+        if not is_phase_enabled(name) or not self.is_check_needed(name):
+            return
+        if run is None:
+            if name in self.CACHED_CHECKS:
+                run = lambda: self.run_project_check(name)
+            else:
+                run = getattr(self, name)
+        
+        if self.profiler is None:
+            run()
+            return
+        with self.profiler.phase(name, self.sink):
+            run()
+    
+    def is_check_needed(self, name: str) -> bool:
+        """Project-wide checks only run in a diff-scoped analysis when their inputs changed"""
+        if name == 'check_data_persistence' and self.budget is not None and self.budget.stop_reason:
+            # It reads every project file, which the exhausted budget no longer allows
+            return False
+        if self.scope is None:
+            return True
+        if name == 'check_data_persistence':
+            # Only changed files that touch persistence APIs can alter the verdict,
+            # whether they use them now or used them in lines the change removed
+            if self.scope.removed and uses_persistence(file_facts('\n'.join(self.scope.removed))):
+                return True
+            for source in self.swift_files():
+                if source.load() and uses_persistence(self.source_facts(source)):
+                    return True
+            return False
+        if name not in self.project_check_inputs:
+            return True
+        return self.scope.affects(self.project_check_inputs[name])
+    
+    def load_cached_results(self):
+        """Serve unchanged Swift files from the cache"""
+        checks = list(dict.fromkeys(spec.check for spec in line_rule_specs()))
+        for source in self.swift_files():
+            digest = self.cache.digest(source.path, source.relative_path, source.raw_bytes)
+            if digest is None:
+                continue
+            cached = self.cache.get(digest, source.relative_path)
+            if cached is None:
+                source.cache_digest = digest
+                continue
+            findings, facts = cached
+            source.mark_loaded()
+            source.findings = {check: findings.get(check, []) for check in checks}
+            source.facts = facts
+        
+        print(f"  🗄️ Cache: {self.cache.hits} hits, {self.cache.misses} misses")
+    
+    def remember_scan(self, source: SourceFile):
+        """Store a freshly scanned file's results in the cache"""
+        if self.cache is not None and source.cache_digest and source.findings is not None:
+            self.cache.put(source.cache_digest, source.findings, source.facts)
+            source.cache_digest = None
+    
+    def save_cache(self):
+        """Write the cache back to disk"""
+        try:
+            self.cache.save()
+        except OSError as e:
+            print(f"  ⚠️ Could not save analysis cache: {e}")
+    
+    def run_project_check(self, name: str, inputs: Optional[List[str]] = None):
+        """Run a project-wide check, reusing cached issues while its inputs are unchanged"""
+        check = getattr(self, name)
+        if self.cache is None:
+            check()
+            return
+        
+        if inputs is None:
+            if name == 'check_data_persistence':
+                inputs = [source.relative_path for source in self.project_swift_files()]
+            else:
+                inputs = self.project_check_inputs[name]
+        deps = {rel: self.cache.digest(self.project_path / rel, rel) for rel in inputs}
+        cached = self.cache.get_check(name, deps)
+        if cached is not None:
+            for issue in cached:
+                self.add_issue(issue)
+            return
         
-        return self.issues
+        self._captured = []
+        try:
+            check()
+            self.cache.put_check(name, deps, self._captured)
+        finally:
+            self._captured = None
     
     def add_issue(self, issue: Issue):
         """Add an issue to the list"""
-        self.issues.append(issue)
+        if self.scope is not None and not self.scope.touches(issue):
+            return
+        if self.budget is not None and not self.budget.reports(issue):
+            return
+        if self._captured is not None:
+            self._captured.append(issue)
+        self.sink.add(issue)
+        if self.budget is not None:
+            self.budget.count(issue)
+    
+    def emit_findings(self, source: SourceFile, checks: List[str]):
+        """Report a file's findings for the given checks and release them"""
+        findings = self.scan_file(source)
+        for check in checks:
+            for issue in reported_findings(check, findings.pop(check, ()), lambda: source.facts, self.symbol_index):
+                self.add_issue(issue)
     
     def check_project_structure(self):
         """Check for project structure issues"""
         print("  📁 Checking project structure...")
         
-        required_files = [
-            "S Quote.xcodeproj/project.pbxproj",
-            "S Quote/S_QuoteApp.swift",
-            "S Quote/ContentView.swift",
-            "README.md"
-        ]
-        
-        for file_path in required_files:
+        for file_path in map(self.project_file, self.REQUIRED_FILES):
             if not (self.project_path / file_path).exists():
                 self.add_issue(Issue(
                     type="missing_file",
@@ -71,15 +3001,14 @@ class CodeAnalyzer:
                 ))
         
         # Check for proper folder organization
-        expected_folders = ["Models", "Views", "ViewModels", "Services"]
-        source_path = self.project_path / "S Quote"
+        source_path = self.project_path / self.app_name
         
-        for folder in expected_folders:
+        for folder in self.EXPECTED_FOLDERS:
             if not (source_path / folder).exists():
                 self.add_issue(Issue(
                     type="missing_folder",
                     severity="medium",
-                    file=f"S Quote/{folder}",
+                    file=f"{self.app_name}/{folder}",
                     line=0,
                     description=f"Recommended folder missing: {folder}",
                     suggestion=f"Create {folder} folder for better code organization",
@@ -90,226 +3019,182 @@ class CodeAnalyzer:
         """Analyze Swift source files for common issues"""
         print("  🦉 Analyzing Swift files...")
         
-        swift_files = list(self.project_path.rglob("*.swift"))
+        if self.jobs > 1 and self.fails_fast():
+            def report(source: SourceFile):
+                if source.error is None:
+                    self.emit_findings(source, SWIFT_FILE_CHECKS + DEFERRED_FILE_CHECKS)
+            
+            # Report files as their scans arrive so the first severe finding stops
+            # the pool; the loop below adds cached and unreadable files, while
+            # findings already emitted were popped and are not reported twice
+            self.scan_files_parallel(report)
         
-        for file_path in swift_files:
-            if "DerivedData" in str(file_path) or "build" in str(file_path):
-                continue
-                
-            self.analyze_swift_file(file_path)
+        for source in self.reported_files():
+            self.analyze_swift_file(source.path, source)
     
-    def analyze_swift_file(self, file_path: Path):
+    def analyze_swift_file(self, file_path: Path, source: Optional[SourceFile] = None):
         """Analyze individual Swift file"""
-        try:
-            with open(file_path, 'r', encoding='utf-8') as f:
-                content = f.read()
-                lines = content.split('\n')
-        except Exception as e:
+        if source is None:
+            source = SourceFile(file_path, str(file_path.relative_to(self.project_path)))
+        
+        if not source.load():
             self.add_issue(Issue(
                 type="file_read_error",
                 severity="medium",
-                file=str(file_path.relative_to(self.project_path)),
+                file=source.relative_path,
                 line=0,
-                description=f"Could not read file: {e}",
+                description=f"Could not read file: {source.error}",
                 suggestion="Check file encoding and permissions",
                 category="file_system"
             ))
             return
         
-        # Check for common Swift issues
-        self.check_force_unwrapping(file_path, lines)
-        self.check_retain_cycles(file_path, lines)
-        self.check_hardcoded_strings(file_path, lines)
-        self.check_long_functions(file_path, lines)
-        self.check_missing_documentation(file_path, lines)
-        self.check_deprecated_apis(file_path, lines)
-        self.check_memory_leaks(file_path, lines)
+        # Check for common Swift issues. Streaming sinks take the performance
+        # and UI findings now too, so nothing is held per file, as do fail-fast
+        # runs, which should stop at a file's first severe finding.
+        checks = SWIFT_FILE_CHECKS
+        if self.sink.streaming or self.fails_fast():
+            checks = SWIFT_FILE_CHECKS + DEFERRED_FILE_CHECKS
+        self.emit_findings(source, checks)
+    
+    def scan_file(self, source: SourceFile) -> Dict[str, List[Issue]]:
+        """Run every line rule over a file in one pass, caching findings per check"""
+        if source.findings is None:
+            if self.budget is not None and not self.budget.allows_scan():
+                source.release()
+                return {}
+            if self.profiler is None:
+                engine = get_line_engine(relative_path=source.relative_path)
+                source.findings = engine.scan(source.relative_path, source.lines)
+            else:
+                source.findings = self.profiler.scan(source.relative_path, source.lines)
+            if source.facts is None:
+                source.facts = source.compute_facts()
+            source.release()
+            self.remember_scan(source)
+        return source.findings
+    
+    def fails_fast(self) -> bool:
+        return self.budget is not None and self.budget.severity is not None
+    
+    def reported_files(self) -> Iterator[SourceFile]:
+        """Swift files to report on; once a budget has run out, only those already scanned"""
+        for source in self.swift_files():
+            if source.findings is None and self.budget is not None and self.budget.stop_reason:
+                continue
+            yield source
+    
+    def partial(self) -> Optional[Dict[str, Any]]:
+        """How a budget cut the analysis short, or None if it ran to completion"""
+        if self.budget is None or self.budget.stop_reason is None:
+            return None
+        sources = self.swift_files()
+        analyzed = sum(1 for source in sources if source.findings is not None or source.error)
+        return self.budget.to_dict(analyzed, len(sources))
+    
+    def source_facts(self, source: SourceFile) -> Dict[str, Any]:
+        """Symbols of a file used by project-wide checks, without running line rules"""
+        if source.facts is None:
+            source.facts = source.compute_facts()
+        return source.facts
+    
+    def symbol_index(self) -> SymbolIndex:
+        """Index of every project source, built once from scanned, cached or freshly read files"""
+        if self._symbol_index is None:
+            files = {}
+            for source in self.project_swift_files():
+                if source.facts is None:
+                    if not source.load():
+                        continue
+                    source.facts = source.compute_facts()
+                    # Files not scanned yet are read again by the scan, so hold no text until then
+                    if source.findings is None:
+                        source.release()
+                files[source.relative_path] = source.facts
+            self._symbol_index = SymbolIndex(files)
+        return self._symbol_index
+    
+    def run_line_check(self, check: str, file_path: Path, lines: List[str]):
+        """Run only the line rules reported by one check method"""
+        relative_path = str(file_path.relative_to(self.project_path))
+        findings = get_line_engine(check, relative_path).scan(relative_path, lines)
+        for issue in reported_findings(check, findings.get(check, ()), lambda: file_facts('\n'.join(lines)),
+                                       self.symbol_index):
+            self.add_issue(issue)
     
     def check_force_unwrapping(self, file_path: Path, lines: List[str]):
         """Check for force unwrapping (!) which can cause crashes"""
-        for i, line in enumerate(lines, 1):
-            # Look for force unwrapping patterns
-            if re.search(r'!\s*(?![=!])', line) and not line.strip().startswith('//'):
-                # Exclude common safe patterns
-                if not any(pattern in line for pattern in ['fatalError', 'precondition', '!!', 'Bundle.main']):
-                    self.add_issue(Issue(
-                        type="force_unwrapping",
-                        severity="high",
-                        file=str(file_path.relative_to(self.project_path)),
-                        line=i,
-                        description="Force unwrapping detected - potential crash risk",
-                        suggestion="Use optional binding (if let) or nil coalescing (??)",
-                        category="safety"
-                    ))
+        self.run_line_check('check_force_unwrapping', file_path, lines)
     
     def check_retain_cycles(self, file_path: Path, lines: List[str]):
         """Check for potential retain cycles"""
-        for i, line in enumerate(lines, 1):
-            # Look for closures without weak/unowned self
-            if 'self.' in line and any(keyword in line for keyword in ['{', 'completion', 'handler']):
-                if 'weak' not in line and 'unowned' not in line:
-                    self.add_issue(Issue(
-                        type="potential_retain_cycle",
-                        severity="medium",
-                        file=str(file_path.relative_to(self.project_path)),
-                        line=i,
-                        description="Potential retain cycle in closure",
-                        suggestion="Use [weak self] or [unowned self] in closure capture list",
-                        category="memory"
-                    ))
+        self.run_line_check('check_retain_cycles', file_path, lines)
     
     def check_hardcoded_strings(self, file_path: Path, lines: List[str]):
         """Check for hardcoded strings that should be localized"""
-        for i, line in enumerate(lines, 1):
-            # Look for Text() with hardcoded strings
-            text_match = re.search(r'Text\s*\(\s*"([^"]+)"\s*\)', line)
-            if text_match and not line.strip().startswith('//'):
-                text_content = text_match.group(1)
-                # Skip system strings and single characters
-                if len(text_content) > 3 and not text_content.startswith('system'):
-                    self.add_issue(Issue(
-                        type="hardcoded_string",
-                        severity="low",
-                        file=str(file_path.relative_to(self.project_path)),
-                        line=i,
-                        description=f"Hardcoded string: '{text_content}'",
-                        suggestion="Consider using localized strings for better internationalization",
-                        category="localization"
-                    ))
+        self.run_line_check('check_hardcoded_strings', file_path, lines)
     
     def check_long_functions(self, file_path: Path, lines: List[str]):
         """Check for overly long functions"""
-        in_function = False
-        function_start = 0
-        brace_count = 0
-        
-        for i, line in enumerate(lines, 1):
-            stripped = line.strip()
-            
-            # Function start
-            if re.match(r'\s*func\s+\w+', line) or re.match(r'\s*var\s+\w+.*\{', line):
-                in_function = True
-                function_start = i
-                brace_count = 0
-            
-            if in_function:
-                brace_count += line.count('{') - line.count('}')
-                
-                # Function end
-                if brace_count == 0 and function_start > 0:
-                    function_length = i - function_start
-                    if function_length > 50:  # Arbitrary threshold
-                        self.add_issue(Issue(
-                            type="long_function",
-                            severity="medium",
-                            file=str(file_path.relative_to(self.project_path)),
-                            line=function_start,
-                            description=f"Function is {function_length} lines long",
-                            suggestion="Consider breaking down into smaller functions",
-                            category="maintainability"
-                        ))
-                    in_function = False
-                    function_start = 0
+        self.run_line_check('check_long_functions', file_path, lines)
     
     def check_missing_documentation(self, file_path: Path, lines: List[str]):
         """Check for missing documentation"""
-        for i, line in enumerate(lines, 1):
-            # Check for public functions without documentation
-            if re.match(r'\s*public\s+func\s+\w+', line) or re.match(r'\s*func\s+\w+', line):
-                # Check if previous line has documentation
-                if i > 1:
-                    prev_line = lines[i-2].strip()
-                    if not prev_line.startswith('///') and not prev_line.startswith('/**'):
-                        self.add_issue(Issue(
-                            type="missing_documentation",
-                            severity="low",
-                            file=str(file_path.relative_to(self.project_path)),
-                            line=i,
-                            description="Public function missing documentation",
-                            suggestion="Add /// documentation comments",
-                            category="documentation"
-                        ))
+        self.run_line_check('check_missing_documentation', file_path, lines)
     
     def check_deprecated_apis(self, file_path: Path, lines: List[str]):
         """Check for deprecated API usage"""
-        deprecated_patterns = [
-            (r'UIApplication\.shared\.keyWindow', 'Use scene-based window access'),
-            (r'NSUserDefaults\.standard', 'Consider using UserDefaults.standard'),
-        ]
-        
-        for i, line in enumerate(lines, 1):
-            for pattern, suggestion in deprecated_patterns:
-                if re.search(pattern, line):
-                    self.add_issue(Issue(
-                        type="deprecated_api",
-                        severity="medium",
-                        file=str(file_path.relative_to(self.project_path)),
-                        line=i,
-                        description=f"Deprecated API usage: {pattern}",
-                        suggestion=suggestion,
-                        category="compatibility"
-                    ))
+        self.run_line_check('check_deprecated_apis', file_path, lines)
     
     def check_memory_leaks(self, file_path: Path, lines: List[str]):
         """Check for potential memory leaks"""
-        for i, line in enumerate(lines, 1):
-            # Check for Timer without invalidation
-            if 'Timer.scheduledTimer' in line and 'invalidate' not in ''.join(lines[max(0, i-5):i+5]):
-                self.add_issue(Issue(
-                    type="potential_memory_leak",
-                    severity="medium",
-                    file=str(file_path.relative_to(self.project_path)),
-                    line=i,
-                    description="Timer created without visible invalidation",
-                    suggestion="Ensure timer is invalidated in deinit or appropriate lifecycle method",
-                    category="memory"
-                ))
+        self.run_line_check('check_memory_leaks', file_path, lines)
     
     def check_build_configuration(self):
         """Check build configuration issues"""
         print("  ⚙️ Checking build configuration...")
         
-        pbxproj_path = self.project_path / "S Quote.xcodeproj" / "project.pbxproj"
+        pbxproj_file = self.project_file(self.PBXPROJ_FILE)
+        pbxproj_path = self.project_path / pbxproj_file
         if pbxproj_path.exists():
             try:
-                with open(pbxproj_path, 'r') as f:
-                    content = f.read()
+                project = load_pbxproj(pbxproj_path)
                 
                 # Check for hardcoded team IDs
-                if 'DEVELOPMENT_TEAM' in content:
-                    team_matches = re.findall(r'DEVELOPMENT_TEAM = ([^;]+);', content)
-                    if team_matches:
+                teams = [(configuration, team) for configuration, team in project.setting('DEVELOPMENT_TEAM') if team]
+                if teams:
+                    first = teams[0][0]
+                    self.add_issue(Issue(
+                        type="hardcoded_team_id",
+                        severity="low",
+                        file=pbxproj_file,
+                        line=first.lines.get('DEVELOPMENT_TEAM', 0),
+                        description=f"Hardcoded development team ID found in {describe_configurations(c for c, _ in teams)}",
+                        suggestion="Use automatic code signing or environment variables",
+                        category="build_config"
+                    ))
+                
+                # Check deployment target
+                minimum = parse_version(self.RECOMMENDED_DEPLOYMENT_TARGET)
+                for configuration, target in project.setting('MACOSX_DEPLOYMENT_TARGET'):
+                    version = parse_version(target) if isinstance(target, str) else None
+                    if version is not None and version < minimum:
                         self.add_issue(Issue(
-                            type="hardcoded_team_id",
-                            severity="low",
-                            file="S Quote.xcodeproj/project.pbxproj",
-                            line=0,
-                            description="Hardcoded development team ID found",
-                            suggestion="Use automatic code signing or environment variables",
+                            type="old_deployment_target",
+                            severity="medium",
+                            file=pbxproj_file,
+                            line=configuration.lines.get('MACOSX_DEPLOYMENT_TARGET', 0),
+                            description=f"Deployment target {target} of {configuration.owner} ({configuration.name}) "
+                                        f"is below recommended {self.RECOMMENDED_DEPLOYMENT_TARGET}",
+                            suggestion="Update deployment target to support latest features",
                             category="build_config"
                         ))
-                
-                # Check deployment target
-                if 'MACOSX_DEPLOYMENT_TARGET' in content:
-                    target_matches = re.findall(r'MACOSX_DEPLOYMENT_TARGET = ([^;]+);', content)
-                    for target in target_matches:
-                        target_version = target.strip()
-                        if target_version < "15.5":
-                            self.add_issue(Issue(
-                                type="old_deployment_target",
-                                severity="medium",
-                                file="S Quote.xcodeproj/project.pbxproj",
-                                line=0,
-                                description=f"Deployment target {target_version} is below recommended 15.5",
-                                suggestion="Update deployment target to support latest features",
-                                category="build_config"
-                            ))
                             
             except Exception as e:
                 self.add_issue(Issue(
                     type="build_config_error",
                     severity="medium",
-                    file="S Quote.xcodeproj/project.pbxproj",
+                    file=pbxproj_file,
                     line=0,
                     description=f"Could not analyze build configuration: {e}",
                     suggestion="Check project file integrity",
@@ -340,7 +3225,8 @@ class CodeAnalyzer:
         print("  🔒 Checking security issues...")
         
         # Check entitlements file
-        entitlements_path = self.project_path / "S Quote" / "S_Quote.entitlements"
+        entitlements_file = self.project_file(self.ENTITLEMENTS_FILE)
+        entitlements_path = self.project_path / entitlements_file
         if entitlements_path.exists():
             try:
                 with open(entitlements_path, 'r') as f:
@@ -351,7 +3237,7 @@ class CodeAnalyzer:
                     self.add_issue(Issue(
                         type="broad_network_entitlement",
                         severity="low",
-                        file="S Quote/S_Quote.entitlements",
+                        file=entitlements_file,
                         line=0,
                         description="Broad network client entitlement enabled",
                         suggestion="Review if network access is necessary for app functionality",
@@ -362,7 +3248,7 @@ class CodeAnalyzer:
                 self.add_issue(Issue(
                     type="entitlements_error",
                     severity="low",
-                    file="S Quote/S_Quote.entitlements",
+                    file=entitlements_file,
                     line=0,
                     description=f"Could not analyze entitlements: {e}",
                     suggestion="Check entitlements file format",
@@ -373,112 +3259,39 @@ class CodeAnalyzer:
         """Check for performance-related issues"""
         print("  ⚡ Checking performance issues...")
         
-        swift_files = list(self.project_path.rglob("*.swift"))
-        
-        for file_path in swift_files:
-            if "DerivedData" in str(file_path) or "build" in str(file_path):
+        for source in self.reported_files():
+            if not source.load():
                 continue
             
-            try:
-                with open(file_path, 'r', encoding='utf-8') as f:
-                    lines = f.readlines()
-                
-                for i, line in enumerate(lines, 1):
-                    # Check for synchronous operations on main thread
-                    if any(pattern in line for pattern in ['URLSession.shared.dataTask', 'Data(contentsOf:']):
-                        if 'DispatchQueue' not in ''.join(lines[max(0, i-3):i+3]):
-                            self.add_issue(Issue(
-                                type="main_thread_blocking",
-                                severity="high",
-                                file=str(file_path.relative_to(self.project_path)),
-                                line=i,
-                                description="Potentially blocking operation on main thread",
-                                suggestion="Move to background queue using DispatchQueue",
-                                category="performance"
-                            ))
-                    
-                    # Check for inefficient string concatenation
-                    if '+=' in line and 'String' in line:
-                        self.add_issue(Issue(
-                            type="inefficient_string_concat",
-                            severity="low",
-                            file=str(file_path.relative_to(self.project_path)),
-                            line=i,
-                            description="Inefficient string concatenation",
-                            suggestion="Consider using String interpolation or StringBuilder",
-                            category="performance"
-                        ))
-                        
-            except Exception:
-                continue
+            self.emit_findings(source, ['check_performance_issues'])
     
     def check_ui_issues(self):
         """Check for UI-related issues"""
         print("  🎨 Checking UI issues...")
         
-        swift_files = list(self.project_path.rglob("*.swift"))
-        
-        for file_path in swift_files:
-            if "DerivedData" in str(file_path) or "build" in str(file_path):
+        for source in self.reported_files():
+            if not source.load():
                 continue
             
-            try:
-                with open(file_path, 'r', encoding='utf-8') as f:
-                    content = f.read()
-                    lines = content.split('\n')
-                
-                for i, line in enumerate(lines, 1):
-                    # Check for hardcoded colors
-                    if re.search(r'Color\.(red|blue|green|yellow)', line):
-                        self.add_issue(Issue(
-                            type="hardcoded_color",
-                            severity="low",
-                            file=str(file_path.relative_to(self.project_path)),
-                            line=i,
-                            description="Hardcoded color usage",
-                            suggestion="Use semantic colors or asset catalog colors",
-                            category="ui"
-                        ))
-                    
-                    # Check for missing accessibility
-                    if 'Button(' in line and 'accessibilityLabel' not in ''.join(lines[i:i+5]):
-                        self.add_issue(Issue(
-                            type="missing_accessibility",
-                            severity="medium",
-                            file=str(file_path.relative_to(self.project_path)),
-                            line=i,
-                            description="Button missing accessibility label",
-                            suggestion="Add .accessibilityLabel() modifier",
-                            category="accessibility"
-                        ))
-                        
-            except Exception:
-                continue
+            self.emit_findings(source, ['check_ui_issues'])
     
-    def check_data_persistence(self):
-        """Check data persistence implementation"""
-        print("  💾 Checking data persistence...")
-        
-        swift_files = list(self.project_path.rglob("*.swift"))
-        uses_userdefaults = False
-        uses_coredata = False
-        
-        for file_path in swift_files:
-            if "DerivedData" in str(file_path) or "build" in str(file_path):
-                continue
-            
-            try:
-                with open(file_path, 'r', encoding='utf-8') as f:
-                    content = f.read()
-                
-                if 'UserDefaults' in content:
-                    uses_userdefaults = True
-                
-                if 'CoreData' in content or 'NSManagedObject' in content:
-                    uses_coredata = True
-                    
-            except Exception:
+    def check_custom_rules(self):
+        """Report issues of rules loaded from rule manifests"""
+        print("  🧩 Checking custom rules...")
+        
+        for source in self.reported_files():
+            if not source.load():
                 continue
+            
+            self.emit_findings(source, ['check_custom_rules'])
+    
+    def check_data_persistence(self):
+        """Check data persistence implementation"""
+        print("  💾 Checking data persistence...")
+        
+        index = self.symbol_index()
+        uses_userdefaults = index.uses(*USERDEFAULTS_APIS)
+        uses_coredata = bool(index.files_importing('CoreData')) or index.uses(*COREDATA_APIS)
         
         if uses_userdefaults and not uses_coredata:
             self.add_issue(Issue(
@@ -491,65 +3304,7 @@ class CodeAnalyzer:
                 category="data_persistence"
             ))
 
-def generate_report(issues: List[Issue], output_path: str):
-    """Generate comprehensive issue report"""
-    
-    # Group issues by severity and category
-    by_severity = {}
-    by_category = {}
-    
-    for issue in issues:
-        if issue.severity not in by_severity:
-            by_severity[issue.severity] = []
-        by_severity[issue.severity].append(issue)
-        
-        if issue.category not in by_category:
-            by_category[issue.category] = []
-        by_category[issue.category].append(issue)
-    
-    # Generate markdown report
-    report = f"""# S-Quote Code Analysis Report
-
-Generated on: {datetime.now().strftime('%Y-%m-%d %H:%M:%S')}
-
-## Summary
-
-Total Issues Found: **{len(issues)}**
-
-### By Severity
-"""
-    
-    severity_order = ['critical', 'high', 'medium', 'low']
-    for severity in severity_order:
-        count = len(by_severity.get(severity, []))
-        if count > 0:
-            report += f"- **{severity.title()}**: {count} issues\n"
-    
-    report += "\n### By Category\n"
-    for category, category_issues in sorted(by_category.items()):
-        report += f"- **{category.replace('_', ' ').title()}**: {len(category_issues)} issues\n"
-    
-    report += "\n## Detailed Issues\n\n"
-    
-    # Group by severity for detailed listing
-    for severity in severity_order:
-        severity_issues = by_severity.get(severity, [])
-        if not severity_issues:
-            continue
-            
-        report += f"### {severity.title()} Priority Issues\n\n"
-        
-        for issue in severity_issues:
-            report += f"#### {issue.type.replace('_', ' ').title()}\n"
-            report += f"- **File**: `{issue.file}`\n"
-            if issue.line > 0:
-                report += f"- **Line**: {issue.line}\n"
-            report += f"- **Category**: {issue.category.replace('_', ' ').title()}\n"
-            report += f"- **Description**: {issue.description}\n"
-            report += f"- **Suggestion**: {issue.suggestion}\n\n"
-    
-    # Add action items
-    report += """## Recommended Actions
+REPORT_GUIDANCE = """## Recommended Actions
 
 ### Immediate (Critical/High Priority)
 1. Fix all force unwrapping issues to prevent crashes
@@ -606,75 +3361,1671 @@ Total Issues Found: **{len(issues)}**
 
 *This report was generated automatically. Review each issue carefully and test thoroughly after making changes.*
 """
+
+# Formats written when none are requested
+DEFAULT_REPORT_FORMATS = ('markdown', 'json')
+
+def generate_report(issues: Iterable[Issue], output_path: str, profile: Optional[Dict[str, Any]] = None,
+                    baseline: Optional[BaselineComparison] = None,
+                    formats: Iterable[str] = DEFAULT_REPORT_FORMATS,
+                    partial: Optional[Dict[str, Any]] = None,
+                    history: Optional[HistoryDelta] = None) -> List[str]:
+    """Generate comprehensive issue report
+    
+    Only the requested formats are rendered, each written straight to its
+    file from the sink's running totals, replaying issues from the sink
+    instead of holding copies of them. `output_path` names the markdown
+    report; the other formats replace its suffix. With a baseline
+    comparison, `issues` are the new issues and resolved ones are reported
+    separately. `partial` marks results cut short by a budget and `history`
+    adds the changes since the previous recorded run. Returns the paths
+    written.
+    """
+    sink = issues if isinstance(issues, IssueSink) else IssueStore(issues)
+    base = output_path[:-len('.md')] if output_path.endswith('.md') else output_path
+    written = []
+    for name in formats:
+        suffix, binary, write = REPORT_FORMATS[name]
+        path = base + suffix
+        with open(path, 'wb') if binary else open(path, 'w', encoding='utf-8') as f:
+            write(sink, f, profile, baseline, partial, history)
+        written.append(path)
+    return written
+
+def write_markdown_report(sink: IssueSink, f, profile: Optional[Dict[str, Any]] = None,
+                          baseline: Optional[BaselineComparison] = None, partial: Optional[Dict[str, Any]] = None,
+                          history: Optional[HistoryDelta] = None):
+    """Write the human-readable report"""
+    from datetime import datetime
+    
+    severity_order = ['critical', 'high', 'medium', 'low']
+    f.write(f"""# S-Quote Code Analysis Report
+
+Generated on: {datetime.now().strftime('%Y-%m-%d %H:%M:%S')}
+
+## Summary
+
+Total Issues Found: **{sink.total}**
+""")
+    if partial is not None:
+        f.write(f"\n> ⚠️ **Partial results**: {describe_partial(partial)}.\n")
+    f.write("\n### By Severity\n")
+    for severity in severity_order:
+        count = sink.by_severity.get(severity, 0)
+        if count > 0:
+            f.write(f"- **{severity.title()}**: {count} issues\n")
+    
+    f.write("\n### By Category\n")
+    for category, count in sorted(sink.by_category.items()):
+        f.write(f"- **{category.replace('_', ' ').title()}**: {count} issues\n")
     
-    # Write report to file
-    with open(output_path, 'w', encoding='utf-8') as f:
-        f.write(report)
+    if baseline is not None:
+        f.write("\n## Baseline\n\n")
+        f.write(f"Compared with `{baseline.path}`: **{baseline.new.total}** new, "
+                f"**{baseline.unchanged}** unchanged, **{len(baseline.resolved)}** resolved. "
+                f"Only new issues are listed below.\n")
+        if baseline.resolved:
+            f.write("\n### Resolved Issues\n\n")
+            for issue in baseline.resolved:
+                location = f"{issue.file}:{issue.line}" if issue.line > 0 else issue.file
+                f.write(f"- `{location}` {issue.type.replace('_', ' ').title()}: {issue.description}\n")
     
-    # Also generate JSON for programmatic access
-    json_data = {
+    if history is not None:
+        f.write("\n## Changes Since Last Run\n\n")
+        previous = history.previous
+        if previous is None:
+            f.write("This is the first recorded run.\n")
+        else:
+            commit = f"commit `{previous['commit'][:12]}`, " if previous['commit'] else ""
+            f.write(f"Compared with run {previous['id']} ({commit}{previous['recorded_at']}, "
+                    f"{previous['total']} issues): **{len(history.introduced)}** introduced, "
+                    f"**{len(history.resolved)}** resolved.\n")
+            for title, changed in (("Introduced", history.introduced), ("Resolved", history.resolved)):
+                if changed:
+                    f.write(f"\n### {title} Issues\n\n")
+                    for issue in changed:
+                        location = f"{issue.file}:{issue.line}" if issue.line > 0 else issue.file
+                        f.write(f"- `{location}` {issue.type.replace('_', ' ').title()}: {issue.description}\n")
+    
+    f.write("\n## Detailed Issues\n\n")
+    
+    # Group by severity for detailed listing, one replay of the sink per severity
+    for severity in severity_order:
+        if not sink.by_severity.get(severity):
+            continue
+        
+        f.write(f"### {severity.title()} Priority Issues\n\n")
+        
+        for issue in sink.with_severity(severity):
+            f.write(f"#### {issue.type.replace('_', ' ').title()}\n")
+            f.write(f"- **File**: `{issue.file}`\n")
+            if issue.line > 0:
+                f.write(f"- **Line**: {issue.line}\n")
+            f.write(f"- **Category**: {issue.category.replace('_', ' ').title()}\n")
+            f.write(f"- **Description**: {issue.description}\n")
+            f.write(f"- **Suggestion**: {issue.suggestion}\n\n")
+    
+    # Add action items
+    f.write(REPORT_GUIDANCE)
+
+def describe_partial(partial: Dict[str, Any]) -> str:
+    """Why and where a budgeted analysis stopped, for the console and the markdown report"""
+    files = f"{partial['files_analyzed']} of {partial['files_total']} Swift files analyzed"
+    if partial['reason'] == 'time_budget':
+        return f"the time budget of {partial['time_budget_seconds']:g}s ran out with {files}"
+    if partial['reason'] == 'file_budget':
+        return f"the file budget of {partial['file_budget']} ran out with {files}"
+    return (f"stopped at the first {partial['max_issues']} issue(s) of {partial['severity']} "
+            f"severity or worse, with {files}")
+
+def report_header(sink: IssueSink, profile: Optional[Dict[str, Any]] = None,
+                  baseline: Optional[BaselineComparison] = None,
+                  partial: Optional[Dict[str, Any]] = None,
+                  history: Optional[HistoryDelta] = None) -> Dict[str, Any]:
+    """Counts shared by the JSON, summary and binary reports"""
+    from datetime import datetime
+    
+    header_data = {
         'generated_at': datetime.now().isoformat(),
-        'total_issues': len(issues),
-        'by_severity': {k: len(v) for k, v in by_severity.items()},
-        'by_category': {k: len(v) for k, v in by_category.items()},
-        'issues': [
-            {
-                'type': issue.type,
-                'severity': issue.severity,
-                'file': issue.file,
-                'line': issue.line,
-                'description': issue.description,
-                'suggestion': issue.suggestion,
-                'category': issue.category
+        'total_issues': sink.total,
+        'by_severity': sink.by_severity,
+        'by_category': sink.by_category,
+    }
+    if profile is not None:
+        header_data['profile'] = profile
+    if baseline is not None:
+        header_data['baseline'] = baseline.to_dict()
+    if partial is not None:
+        header_data['partial'] = partial
+    if history is not None:
+        header_data['history'] = history.to_dict()
+    return header_data
+
+def write_json_report(sink: IssueSink, f, profile: Optional[Dict[str, Any]] = None,
+                      baseline: Optional[BaselineComparison] = None, partial: Optional[Dict[str, Any]] = None,
+                      history: Optional[HistoryDelta] = None):
+    """Stream the JSON report, byte-for-byte what json.dump(..., indent=2) would produce"""
+    import textwrap
+    
+    header = json.dumps(report_header(sink, profile, baseline, partial, history), indent=2)
+    # Reopen the object to append the issues list
+    f.write(header[:-2])
+    f.write(',\n  "issues": [')
+    
+    first = True
+    for issue in sink:
+        f.write('\n' if first else ',\n')
+        f.write(textwrap.indent(json.dumps(issue_to_dict(issue), indent=2), '    '))
+        first = False
+    
+    f.write(']\n}' if first else '\n  ]\n}')
+
+def write_summary_report(sink: IssueSink, f, profile: Optional[Dict[str, Any]] = None,
+                         baseline: Optional[BaselineComparison] = None, partial: Optional[Dict[str, Any]] = None,
+                         history: Optional[HistoryDelta] = None):
+    """Write only the counts, for pipelines that gate on totals"""
+    header_data = report_header(sink, None, baseline, partial, history)
+    if baseline is not None:
+        del header_data['baseline']['resolved_issues']
+    if history is not None:
+        del header_data['history']['introduced_issues']
+        del header_data['history']['resolved_issues']
+    json.dump(header_data, f, indent=2)
+    f.write('\n')
+
+SARIF_LEVELS = {'critical': 'error', 'high': 'error', 'medium': 'warning', 'low': 'note'}
+
+def write_sarif_report(sink: IssueSink, f, profile: Optional[Dict[str, Any]] = None,
+                       baseline: Optional[BaselineComparison] = None, partial: Optional[Dict[str, Any]] = None,
+                       history: Optional[HistoryDelta] = None):
+    """Stream a SARIF 2.1.0 log for code scanning upload
+    
+    Results are written as they are replayed and the rule table, which
+    SARIF only needs to be somewhere in the run, follows them.
+    """
+    from urllib.parse import quote
+    
+    rules: Dict[str, int] = {}
+    rule_metadata: List[Dict[str, Any]] = []
+    
+    def result(issue: Issue, state: Optional[str]) -> Dict[str, Any]:
+        index = rules.get(issue.type)
+        if index is None:
+            index = rules[issue.type] = len(rule_metadata)
+            rule_metadata.append({
+                'id': issue.type,
+                'name': ''.join(part.title() for part in issue.type.split('_')),
+                'shortDescription': {'text': issue.type.replace('_', ' ').capitalize()},
+                'help': {'text': issue.suggestion},
+                'defaultConfiguration': {'level': SARIF_LEVELS.get(issue.severity, 'warning')},
+                'properties': {'category': issue.category},
+            })
+        location: Dict[str, Any] = {'artifactLocation': {'uri': quote(issue.file), 'uriBaseId': '%SRCROOT%'}}
+        if issue.line > 0:
+            location['region'] = {'startLine': issue.line}
+        data = {
+            'ruleId': issue.type,
+            'ruleIndex': index,
+            'level': SARIF_LEVELS.get(issue.severity, 'warning'),
+            'message': {'text': f"{issue.description}. {issue.suggestion}"},
+            'locations': [{'physicalLocation': location}],
+            'properties': {'severity': issue.severity, 'category': issue.category},
+        }
+        if state is not None:
+            data['baselineState'] = state
+        return data
+    
+    f.write('{\n  "$schema": "https://json.schemastore.org/sarif-2.1.0.json",\n  "version": "2.1.0",\n')
+    f.write('  "runs": [\n    {\n      "results": [')
+    separator = '\n'
+    replays = [(sink, 'new' if baseline is not None else None)]
+    if baseline is not None:
+        replays.append((baseline.resolved, 'absent'))
+    for issues, state in replays:
+        for issue in issues:
+            f.write(separator + '        ' + json.dumps(result(issue, state)))
+            separator = ',\n'
+    f.write('\n      ],\n' if separator != '\n' else '],\n')
+    tool = {'driver': {'name': 'S-Quote Analyzer', 'rules': rule_metadata}}
+    f.write(f'      "tool": {json.dumps(tool)},\n')
+    if partial is not None:
+        invocation = {
+            'executionSuccessful': True,
+            'toolExecutionNotifications': [{'level': 'warning', 'message': {'text': f"Partial results: {describe_partial(partial)}"}}],
+            'properties': {'partial': partial},
+        }
+        f.write(f'      "invocations": [{json.dumps(invocation)}],\n')
+    f.write('      "columnKind": "unicodeCodePoints"\n    }\n  ]\n}\n')
+
+class MsgPackWriter:
+    """Minimal MessagePack encoder for the binary report
+    
+    Covers the types the report uses: nil, booleans, integers, floats,
+    strings, arrays and maps. Containers are opened with their length and
+    filled by later writes, so large arrays are streamed.
+    """
+    
+    def __init__(self, f):
+        self.f = f
+    
+    def header(self, small: int, codes: Tuple[int, int, int], length: int):
+        if length < 16 and small:
+            self.f.write(bytes([small | length]))
+        elif length < 0x10000:
+            self.f.write(bytes([codes[1]]) + length.to_bytes(2, 'big'))
+        else:
+            self.f.write(bytes([codes[2]]) + length.to_bytes(4, 'big'))
+    
+    def array(self, length: int):
+        self.header(0x90, (0, 0xdc, 0xdd), length)
+    
+    def map(self, length: int):
+        self.header(0x80, (0, 0xde, 0xdf), length)
+    
+    def value(self, value: Any):
+        write = self.f.write
+        if value is None:
+            write(b'\xc0')
+        elif value is True or value is False:
+            write(b'\xc3' if value else b'\xc2')
+        elif isinstance(value, int):
+            if 0 <= value < 0x80:
+                write(bytes([value]))
+            elif -32 <= value < 0:
+                write(bytes([value & 0xff]))
+            else:
+                write(b'\xd3' + value.to_bytes(8, 'big', signed=True))
+        elif isinstance(value, float):
+            import struct
+            write(b'\xcb' + struct.pack('>d', value))
+        elif isinstance(value, str):
+            data = value.encode('utf-8')
+            if len(data) < 32:
+                write(bytes([0xa0 | len(data)]))
+            elif len(data) < 0x100:
+                write(b'\xd9' + bytes([len(data)]))
+            elif len(data) < 0x10000:
+                write(b'\xda' + len(data).to_bytes(2, 'big'))
+            else:
+                write(b'\xdb' + len(data).to_bytes(4, 'big'))
+            write(data)
+        elif isinstance(value, (list, tuple)):
+            self.array(len(value))
+            for item in value:
+                self.value(item)
+        elif isinstance(value, dict):
+            self.map(len(value))
+            for key, item in value.items():
+                self.value(key)
+                self.value(item)
+        else:
+            raise TypeError(f"cannot encode {type(value).__name__}")
+
+def write_msgpack_report(sink: IssueSink, f, profile: Optional[Dict[str, Any]] = None,
+                         baseline: Optional[BaselineComparison] = None, partial: Optional[Dict[str, Any]] = None,
+                         history: Optional[HistoryDelta] = None):
+    """Stream the report as MessagePack
+    
+    The document is the JSON report's map with each issue as an array in
+    ISSUE_FIELDS order. Strings other than the line number are interned:
+    a string's first occurrence is written as is and later ones as the
+    integer position of that first occurrence, counted from 0 over all
+    strings introduced so far. read_msgpack_report reverses this.
+    """
+    header_data = report_header(sink, profile, baseline, partial, history)
+    writer = MsgPackWriter(f)
+    writer.map(len(header_data) + 1)
+    for key, value in header_data.items():
+        writer.value(key)
+        writer.value(value)
+    
+    writer.value('issues')
+    writer.array(sink.total)
+    strings: Dict[str, int] = {}
+    for issue in sink:
+        writer.array(len(ISSUE_FIELDS))
+        for name in ISSUE_FIELDS:
+            value = getattr(issue, name)
+            if name != 'line':
+                index = strings.get(value)
+                if index is None:
+                    strings[value] = len(strings)
+                else:
+                    value = index
+            writer.value(value)
+
+def unpack_msgpack(data: bytes, offset: int = 0) -> Tuple[Any, int]:
+    """Decode the MessagePack value at `offset`; returns it and the offset after it"""
+    code = data[offset]
+    offset += 1
+    if code < 0x80:
+        return code, offset
+    if code >= 0xe0:
+        return code - 0x100, offset
+    if 0xa0 <= code < 0xc0 or code in (0xd9, 0xda, 0xdb):
+        if code < 0xc0:
+            length = code & 0x1f
+        else:
+            size = {0xd9: 1, 0xda: 2, 0xdb: 4}[code]
+            length = int.from_bytes(data[offset:offset + size], 'big')
+            offset += size
+        return data[offset:offset + length].decode('utf-8'), offset + length
+    if 0x80 <= code < 0xa0 or code in (0xdc, 0xdd, 0xde, 0xdf):
+        if code < 0xa0:
+            is_map, length = code < 0x90, code & 0x0f
+        else:
+            size = 2 if code in (0xdc, 0xde) else 4
+            is_map, length = code >= 0xde, int.from_bytes(data[offset:offset + size], 'big')
+            offset += size
+        if is_map:
+            result = {}
+            for _ in range(length):
+                key, offset = unpack_msgpack(data, offset)
+                result[key], offset = unpack_msgpack(data, offset)
+            return result, offset
+        items = []
+        for _ in range(length):
+            item, offset = unpack_msgpack(data, offset)
+            items.append(item)
+        return items, offset
+    if code == 0xc0:
+        return None, offset
+    if code in (0xc2, 0xc3):
+        return code == 0xc3, offset
+    if code == 0xd3:
+        return int.from_bytes(data[offset:offset + 8], 'big', signed=True), offset + 8
+    if code == 0xcb:
+        import struct
+        return struct.unpack('>d', data[offset:offset + 8])[0], offset + 8
+    raise ValueError(f"unsupported MessagePack type 0x{code:02x} at offset {offset - 1}")
+
+def read_msgpack_report(path: str) -> Dict[str, Any]:
+    """Load a binary report back into the shape of the JSON report"""
+    report, _ = unpack_msgpack(Path(path).read_bytes())
+    strings: List[str] = []
+    issues = []
+    for row in report['issues']:
+        issue = {}
+        for name, value in zip(ISSUE_FIELDS, row):
+            if name != 'line':
+                if isinstance(value, int):
+                    value = strings[value]
+                else:
+                    strings.append(value)
+            issue[name] = value
+        issues.append(issue)
+    report['issues'] = issues
+    return report
+
+# Report format -> (suffix replacing .md, binary, writer)
+REPORT_FORMATS: Dict[str, Tuple[str, bool, Callable[..., None]]] = {
+    'markdown': ('.md', False, write_markdown_report),
+    'json': ('.json', False, write_json_report),
+    'summary': ('.summary.json', False, write_summary_report),
+    'sarif': ('.sarif', False, write_sarif_report),
+    'msgpack': ('.msgpack', True, write_msgpack_report),
+}
+
+class PollingWatcher:
+    """Detects changes by comparing modification times between periodic scans"""
+    
+    name = "polling"
+    
+    def __init__(self, root: Path, interval: float = 0.5):
+        self.root = root
+        self.interval = interval
+        self._snapshot = self._scan()
+    
+    def _scan(self) -> Dict[str, Tuple[int, int]]:
+        snapshot = {}
+        # A fresh tree per scan picks up edited .gitignore files
+        for relative_dir, _, filenames in SourceTree(self.root).walk():
+            for name in filenames:
+                rel = f"{relative_dir}/{name}" if relative_dir else name
+                try:
+                    stat = os.stat(self.root / rel)
+                except OSError:
+                    continue
+                snapshot[rel] = (stat.st_mtime_ns, stat.st_size)
+        return snapshot
+    
+    def wait(self) -> Optional[Set[str]]:
+        """Block until files change and return their relative paths"""
+        while True:
+            time.sleep(self.interval)
+            current = self._scan()
+            changed = {
+                rel for rel in current.keys() | self._snapshot.keys()
+                if current.get(rel) != self._snapshot.get(rel)
             }
-            for issue in issues
+            self._snapshot = current
+            if changed:
+                return changed
+    
+    def close(self):
+        pass
+
+class InotifyWatcher:
+    """Linux inotify watches on every project directory, through libc via ctypes
+    
+    `wait()` returns None when the kernel queue overflowed and events were
+    lost, in which case the whole project has to be treated as changed.
+    """
+    
+    name = "inotify"
+    
+    IN_MODIFY = 0x2
+    IN_ATTRIB = 0x4
+    IN_CLOSE_WRITE = 0x8
+    IN_MOVED_FROM = 0x40
+    IN_MOVED_TO = 0x80
+    IN_CREATE = 0x100
+    IN_DELETE = 0x200
+    IN_Q_OVERFLOW = 0x4000
+    IN_IGNORED = 0x8000
+    IN_ISDIR = 0x40000000
+    MASK = IN_MODIFY | IN_ATTRIB | IN_CLOSE_WRITE | IN_MOVED_FROM | IN_MOVED_TO | IN_CREATE | IN_DELETE
+    
+    # Editors save through temporary files and renames; wait this long for the burst to end
+    SETTLE_SECONDS = 0.05
+    
+    def __init__(self, root: Path):
+        import ctypes
+        import ctypes.util
+        
+        self.root = root
+        libc = ctypes.CDLL(ctypes.util.find_library('c'), use_errno=True)
+        if not hasattr(libc, 'inotify_init1'):
+            raise OSError("inotify is not available on this platform")
+        self._libc = libc
+        self.fd = libc.inotify_init1(os.O_NONBLOCK | os.O_CLOEXEC)
+        if self.fd < 0:
+            errno = ctypes.get_errno()
+            raise OSError(errno, os.strerror(errno))
+        # watch descriptor -> directory relative to the root ('' for the root itself)
+        self._directories: Dict[int, str] = {}
+        # Excluded and ignored directories get no watches, as discovery never enters them
+        self.tree = SourceTree(root)
+        self.add_tree('')
+    
+    def add_tree(self, relative_dir: str) -> List[str]:
+        """Watch a directory and everything beneath it, returning the files already inside"""
+        files = []
+        for rel_dir, _, filenames in self.tree.walk(relative_dir):
+            wd = self._libc.inotify_add_watch(self.fd, os.fsencode(self.root / rel_dir), self.MASK)
+            if wd >= 0:
+                self._directories[wd] = rel_dir
+            files.extend(f"{rel_dir}/{name}" if rel_dir else name for name in filenames)
+        return files
+    
+    def _read(self, timeout: Optional[float]) -> Tuple[Set[str], bool]:
+        import select
+        import struct
+        
+        changed = set()
+        if not select.select([self.fd], [], [], timeout)[0]:
+            return changed, False
+        try:
+            data = os.read(self.fd, 64 * 1024)
+        except BlockingIOError:
+            return changed, False
+        
+        offset = 0
+        while offset < len(data):
+            wd, mask, _cookie, length = struct.unpack_from('iIII', data, offset)
+            name = os.fsdecode(data[offset + 16:offset + 16 + length].rstrip(b'\0'))
+            offset += 16 + length
+            
+            if mask & self.IN_Q_OVERFLOW:
+                return changed, True
+            if mask & self.IN_IGNORED:
+                self._directories.pop(wd, None)
+                continue
+            directory = self._directories.get(wd)
+            if directory is None:
+                continue
+            rel = f"{directory}/{name}" if directory else name
+            if name == '.gitignore':
+                # Later lookups must see the edited rules
+                self.tree = SourceTree(self.root)
+            elif self.tree.is_excluded(rel, bool(mask & self.IN_ISDIR)):
+                continue
+            if mask & self.IN_ISDIR and mask & (self.IN_CREATE | self.IN_MOVED_TO):
+                # Files may have landed before the new directory was watched
+                changed.update(self.add_tree(rel))
+            changed.add(rel)
+        return changed, False
+    
+    def wait(self) -> Optional[Set[str]]:
+        """Block until files change and return their relative paths, or None after an overflow"""
+        changed = set()
+        timeout = None
+        while True:
+            batch, overflowed = self._read(timeout)
+            if overflowed:
+                return None
+            if batch:
+                changed |= batch
+                timeout = self.SETTLE_SECONDS
+            elif changed:
+                return changed
+    
+    def close(self):
+        os.close(self.fd)
+
+def create_watcher(root: Path, interval: float = 0.5):
+    """Use inotify where the platform has it and fall back to polling"""
+    if sys.platform.startswith('linux'):
+        try:
+            return InotifyWatcher(root)
+        except (OSError, AttributeError):
+            pass
+    return PollingWatcher(root, interval)
+
+class WatchSession:
+    """In-memory project model for --watch
+    
+    After the first full analysis only files reported by the watcher are
+    re-read: everything else is answered by a resident cache, the Swift
+    inventory is updated in place instead of walking the tree, and cached
+    project-wide checks rerun only when one of their inputs changed.
+    """
+    
+    def __init__(self, project_path: str, report_path: str, cache_dir: Optional[str] = None,
+                 max_entries: int = 10000, jobs: int = 1):
+        self.project_path = Path(project_path)
+        self.report_path = report_path
+        self.jobs = jobs
+        self.cache = AnalysisCache(cache_dir, ruleset_version(), max_entries)
+        self.cache.resident = True
+        # Results stay in memory while watching and are written back once on close
+        self.cache_path, self.cache.path = self.cache.path, None
+        self.swift_paths: Optional[Set[str]] = None
+        self.tree = SourceTree(self.project_path)
+        self._watched_inputs = [
+            path for inputs in CodeAnalyzer(project_path).project_check_inputs.values() for path in inputs
         ]
+    
+    def analyze(self, quiet: bool = False) -> IssueSink:
+        """Analyze the project from the in-memory model and rewrite both reports"""
+        jobs = self.jobs if self.swift_paths is None else 1
+        analyzer = CodeAnalyzer(str(self.project_path), jobs=jobs, cache=self.cache, swift_paths=self.swift_paths)
+        with contextlib.ExitStack() as stack:
+            if quiet:
+                stack.enter_context(contextlib.redirect_stdout(stack.enter_context(open(os.devnull, 'w'))))
+            issues = analyzer.analyze()
+        if self.swift_paths is None:
+            self.swift_paths = {source.relative_path for source in analyzer.project_swift_files()}
+        generate_report(issues, self.report_path)
+        return issues
+    
+    def apply(self, changed: Optional[Iterable[str]]) -> bool:
+        """Update the model for changed paths; returns whether the analysis is affected
+        
+        `None` means changes were lost and the project is rediscovered.
+        """
+        if changed is None:
+            self.cache.forget('')
+            self.swift_paths = None
+            return True
+        
+        affected = False
+        for rel in changed:
+            path = self.project_path / rel
+            self.cache.forget(rel)
+            if rel.endswith('.swift') and not self.tree.is_excluded(rel):
+                affected = True
+                if path.is_file():
+                    self.swift_paths.add(rel)
+                else:
+                    self.swift_paths.discard(rel)
+            elif not path.exists():
+                # A removed directory takes its sources with it
+                prefix = rel.rstrip('/') + '/'
+                removed = {known for known in self.swift_paths if known.startswith(prefix)}
+                if removed:
+                    self.swift_paths -= removed
+                    affected = True
+            if any(rel == watched or rel.startswith(watched + '/') or watched.startswith(rel + '/')
+                   for watched in self._watched_inputs):
+                affected = True
+        return affected
+    
+    def close(self):
+        """Write the resident cache back to disk when --cache was given"""
+        if self.cache_path is None:
+            return
+        self.cache.path = self.cache_path
+        try:
+            self.cache.save()
+        except OSError as e:
+            print(f"⚠️ Could not save analysis cache: {e}")
+
+def watch_project(project_path: str, report_path: str, cache_dir: Optional[str] = None,
+                  max_entries: int = 10000, jobs: int = 1, interval: float = 0.5):
+    """Analyze once, then re-analyze changed files and rewrite the reports until interrupted"""
+    session = WatchSession(project_path, report_path, cache_dir, max_entries, jobs)
+    # Start watching before the first pass so edits made during it are not missed
+    watcher = create_watcher(Path(project_path), interval)
+    try:
+        issues = session.analyze()
+        print(f"\n📊 Found {issues.total} potential issues; reports saved to {report_path}")
+        print(f"👀 Watching {project_path} for changes ({watcher.name}), press Ctrl+C to stop")
+        
+        while True:
+            changed = watcher.wait()
+            if not session.apply(changed):
+                continue
+            start = time.perf_counter()
+            issues = session.analyze(quiet=True)
+            elapsed = (time.perf_counter() - start) * 1000
+            what = "Project rescanned" if changed is None else f"{len(changed)} path(s) changed"
+            from datetime import datetime
+            print(f"🔄 {datetime.now().strftime('%H:%M:%S')} {what}: {issues.total} issues ({elapsed:.0f} ms)")
+    except KeyboardInterrupt:
+        print("\n👋 Stopped watching")
+    finally:
+        watcher.close()
+        session.close()
+
+# Per-process state of server workers: an in-memory cache for each analyzed project
+_SERVER_CACHES: Dict[str, AnalysisCache] = {}
+
+def issues_result(sink: IssueSink) -> Dict[str, Any]:
+    """Issues and their totals in the shape of ANALYSIS_REPORT.json"""
+    return {
+        'total_issues': sink.total,
+        'by_severity': sink.by_severity,
+        'by_category': sink.by_category,
+        'issues': [issue_to_dict(issue) for issue in sink],
     }
+
+def serve_analyze_buffers(files: List[Dict[str, str]]) -> Dict[str, Any]:
+    """Run the per-file rules over in-memory buffers, reported in full-run order
     
-    json_path = output_path.replace('.md', '.json')
-    with open(json_path, 'w', encoding='utf-8') as f:
-        json.dump(json_data, f, indent=2)
+    Findings are filtered like an analysis run's, with extensions resolved
+    against the types declared in the buffers sent.
+    """
+    contents = [SourceFile.normalize_newlines(buffer['content']) for buffer in files]
+    scanned = [
+        get_line_engine(relative_path=buffer['path']).scan(buffer['path'], content.split('\n'))
+        for buffer, content in zip(files, contents)
+    ]
+    facts: Dict[str, Dict[str, Any]] = {}
+    index: List[SymbolIndex] = []
     
-    return report
+    def buffer_facts(buffer: Dict[str, str], content: str) -> Dict[str, Any]:
+        if buffer['path'] not in facts:
+            facts[buffer['path']] = file_facts(content)
+        return facts[buffer['path']]
+    
+    def symbol_index() -> SymbolIndex:
+        if not index:
+            index.append(SymbolIndex({buffer['path']: buffer_facts(buffer, content)
+                                      for buffer, content in zip(files, contents)}))
+        return index[0]
+    
+    def report(check: str, buffer: Dict[str, str], content: str, findings: Dict[str, List[Issue]]):
+        for issue in reported_findings(check, findings.get(check, ()), lambda: buffer_facts(buffer, content),
+                                       symbol_index):
+            sink.add(issue)
+    
+    sink = IssueStore()
+    for buffer, content, findings in zip(files, contents, scanned):
+        for check in SWIFT_FILE_CHECKS:
+            report(check, buffer, content, findings)
+    for check in DEFERRED_FILE_CHECKS:
+        for buffer, content, findings in zip(files, contents, scanned):
+            report(check, buffer, content, findings)
+    return issues_result(sink)
+
+def serve_analyze_path(project_path: str, diff_base: Optional[str] = None) -> Dict[str, Any]:
+    """Analyze a project on disk, reusing this worker's cache from earlier requests"""
+    key = os.path.realpath(project_path)
+    cache = _SERVER_CACHES.get(key)
+    if cache is None:
+        cache = _SERVER_CACHES[key] = AnalysisCache(None, ruleset_version())
+    scope = DiffScope.from_git(Path(project_path), diff_base) if diff_base else None
+    with open(os.devnull, 'w') as devnull, contextlib.redirect_stdout(devnull):
+        issues = CodeAnalyzer(project_path, cache=cache, scope=scope).analyze()
+    return issues_result(issues)
+
+class AnalysisServer:
+    """JSON-RPC 2.0 analysis service for editors, hooks and CI agents
+    
+    Messages are single-line JSON objects over stdio or a Unix socket.
+    Requests run in a pool of long-lived worker processes, so concurrent
+    calls proceed in parallel and each worker keeps its caches warm.
+    Responses may arrive out of order and carry the request id. No report
+    files are written.
+    
+    Methods:
+        analyzeBuffers {"files": [{"path": ..., "content": ...}]}
+        analyzePath    {"path": ..., "diffBase": optional ref}
+        shutdown
+    """
+    
+    PARSE_ERROR = -32700
+    INVALID_REQUEST = -32600
+    METHOD_NOT_FOUND = -32601
+    INVALID_PARAMS = -32602
+    INTERNAL_ERROR = -32603
+    
+    def __init__(self, jobs: int = 1):
+        from concurrent.futures import ProcessPoolExecutor
+        
+        self.pool = ProcessPoolExecutor(max_workers=jobs, initializer=configure_worker,
+                                        initargs=(worker_settings(),))
+        self._unix_server = None
+    
+    @staticmethod
+    def parse_params(method: str, params: Any) -> Tuple[Callable[..., Dict[str, Any]], tuple]:
+        """Validate a request's params and return the worker function with its arguments"""
+        if not isinstance(params, dict):
+            raise ValueError("params must be an object")
+        
+        if method == 'analyzeBuffers':
+            files = params.get('files')
+            if not isinstance(files, list) or not all(
+                isinstance(buffer, dict) and isinstance(buffer.get('path'), str)
+                and isinstance(buffer.get('content'), str) for buffer in files
+            ):
+                raise ValueError("files must be a list of {path, content} objects")
+            return serve_analyze_buffers, ([{'path': b['path'], 'content': b['content']} for b in files],)
+        
+        path = params.get('path')
+        diff_base = params.get('diffBase')
+        if not isinstance(path, str) or not os.path.isdir(path):
+            raise ValueError("path must be an existing project directory")
+        if diff_base is not None and not isinstance(diff_base, str):
+            raise ValueError("diffBase must be a string")
+        return serve_analyze_path, (path, diff_base)
+    
+    def handle(self, request: Any, send: Callable[[Dict[str, Any]], None]) -> bool:
+        """Dispatch one request; returns False once the client asked to shut down"""
+        if (not isinstance(request, dict) or request.get('jsonrpc') != '2.0'
+                or not isinstance(request.get('method'), str)):
+            send({'jsonrpc': '2.0', 'id': None,
+                  'error': {'code': self.INVALID_REQUEST, 'message': "Invalid request"}})
+            return True
+        
+        method = request['method']
+        
+        def reply(result: Any = None, code: Optional[int] = None, message: str = ""):
+            # Requests without an id are notifications and get no response
+            if 'id' not in request:
+                return
+            response = {'jsonrpc': '2.0', 'id': request['id']}
+            if code is None:
+                response['result'] = result
+            else:
+                response['error'] = {'code': code, 'message': message}
+            send(response)
+        
+        if method == 'shutdown':
+            reply()
+            return False
+        if method not in ('analyzeBuffers', 'analyzePath'):
+            reply(code=self.METHOD_NOT_FOUND, message=f"Method not found: {method}")
+            return True
+        try:
+            run, args = self.parse_params(method, request.get('params', {}))
+        except ValueError as e:
+            reply(code=self.INVALID_PARAMS, message=str(e))
+            return True
+        
+        def done(future):
+            try:
+                reply(future.result())
+            except Exception as e:
+                detail = getattr(e, 'stderr', None) or e
+                reply(code=self.INTERNAL_ERROR, message=str(detail).strip())
+        
+        self.pool.submit(run, *args).add_done_callback(done)
+        return True
+    
+    def serve_stream(self, rfile, wfile) -> bool:
+        """Answer requests from one binary stream; returns False if shutdown was requested"""
+        import threading
+        
+        lock = threading.Lock()
+        
+        def send(message: Dict[str, Any]):
+            data = (json.dumps(message) + '\n').encode('utf-8')
+            with lock:
+                try:
+                    wfile.write(data)
+                    wfile.flush()
+                except (OSError, ValueError):
+                    pass  # The client went away
+        
+        for raw in rfile:
+            if not raw.strip():
+                continue
+            try:
+                request = json.loads(raw)
+            except ValueError:
+                send({'jsonrpc': '2.0', 'id': None, 'error': {'code': self.PARSE_ERROR, 'message': "Parse error"}})
+                continue
+            if not self.handle(request, send):
+                return False
+        return True
+    
+    def serve_unix(self, socket_path: str):
+        """Accept any number of concurrent clients on a Unix socket until shutdown"""
+        import socketserver
+        import stat
+        import threading
+        
+        server = self
+        
+        class Handler(socketserver.StreamRequestHandler):
+            def handle(self):
+                if not server.serve_stream(self.rfile, self.wfile):
+                    # shutdown() waits for serve_forever, which runs in another thread
+                    threading.Thread(target=server._unix_server.shutdown).start()
+        
+        # Replace a socket left behind by a previous run, but never a regular file
+        if os.path.exists(socket_path) and stat.S_ISSOCK(os.stat(socket_path).st_mode):
+            os.unlink(socket_path)
+        
+        with socketserver.ThreadingUnixStreamServer(socket_path, Handler) as unix_server:
+            self._unix_server = unix_server
+            print(f"🛰️ Serving JSON-RPC on {socket_path}", file=sys.stderr)
+            try:
+                unix_server.serve_forever()
+            finally:
+                os.unlink(socket_path)
+    
+    def close(self):
+        """Wait for outstanding requests and stop the workers"""
+        self.pool.shutdown(wait=True)
+
+def serve(address: str, jobs: int = 1):
+    """Run the analysis server on stdio ('-') or on a Unix socket path"""
+    server = AnalysisServer(jobs)
+    try:
+        if address == '-':
+            server.serve_stream(sys.stdin.buffer, sys.stdout.buffer)
+        else:
+            server.serve_unix(address)
+    except KeyboardInterrupt:
+        pass
+    finally:
+        server.close()
+
+@dataclass
+class BatchProject:
+    """An Xcode project found by --batch"""
+    # Path of the .xcodeproj relative to the batch root
+    name: str
+    # Directory holding the .xcodeproj, the project root for its analysis
+    root: Path
+    app_name: str
+    swift_paths: List[str]
+    # Bytes of Swift source, used to schedule large projects first
+    size: int = 0
+    
+    @property
+    def slug(self) -> str:
+        """Directory name for the project's reports and cache"""
+        return re.sub(r'[^\w.-]+', '_', self.name[:-len('.xcodeproj')]).strip('_') or 'project'
+
+def find_xcode_projects(root: Path) -> List[BatchProject]:
+    """Every Xcode project under root with the Swift files it owns, largest first
+    
+    The tree is walked once. A Swift file belongs to the projects in its
+    nearest enclosing directory that has any, so the sources of a nested
+    project are not analyzed again as part of its parent.
+    """
+    projects: Dict[str, List[BatchProject]] = {}
+    swift_files: List[Tuple[str, int]] = []
+    for relative_dir, dirnames, filenames in SourceTree(root).walk():
+        for name in dirnames:
+            if name.endswith('.xcodeproj'):
+                projects.setdefault(relative_dir, []).append(BatchProject(
+                    os.path.join(relative_dir, name), root / relative_dir, name[:-len('.xcodeproj')], []
+                ))
+        dirnames[:] = [name for name in dirnames if not name.endswith('.xcodeproj')]
+        for name in filenames:
+            if name.endswith('.swift'):
+                try:
+                    size = os.stat(root / relative_dir / name).st_size
+                except OSError:
+                    size = 0
+                swift_files.append((os.path.join(relative_dir, name), size))
+    
+    for path, size in swift_files:
+        directory = os.path.dirname(path)
+        while directory and directory not in projects:
+            directory = os.path.dirname(directory)
+        relative_path = os.path.relpath(path, directory) if directory else path
+        for project in projects.get(directory, ()):
+            project.swift_paths.append(relative_path)
+            project.size += size
+    
+    return sorted((project for owned in projects.values() for project in owned),
+                  key=lambda project: (-project.size, project.name))
+
+def analyze_batch(root: str, output_dir: str, jobs: int = 1, cache_dir: Optional[str] = None,
+                  max_entries: int = 10000, formats: Iterable[str] = DEFAULT_REPORT_FORMATS) -> Dict[str, Any]:
+    """Analyze every Xcode project under root into per-project reports and a combined summary
+    
+    The file scans of all projects are queued on one shared process pool,
+    largest project first, so workers keep scanning while the parent runs
+    the project-wide checks and writes the reports of projects already done.
+    """
+    from concurrent.futures import ProcessPoolExecutor
+    
+    start = time.perf_counter()
+    output = Path(output_dir)
+    projects = find_xcode_projects(Path(root))
+    version = ruleset_version() if cache_dir else None
+    analyzers = [
+        CodeAnalyzer(
+            str(project.root), jobs=jobs, swift_paths=project.swift_paths, app_name=project.app_name,
+            cache=AnalysisCache(os.path.join(cache_dir, project.slug), version, max_entries) if cache_dir else None,
+        )
+        for project in projects
+    ]
+    
+    summaries = []
+    with contextlib.ExitStack() as stack:
+        pool = None
+        if jobs > 1 and projects:
+            pool = stack.enter_context(ProcessPoolExecutor(
+                max_workers=jobs, initializer=configure_worker, initargs=(worker_settings(),)
+            ))
+        devnull = stack.enter_context(open(os.devnull, 'w'))
+        
+        submitted = []
+        for analyzer in analyzers:
+            with contextlib.redirect_stdout(devnull):
+                analyzer.prepare()
+            submitted.append(analyzer.submit_scans(pool) if pool is not None else None)
+        
+        for project, analyzer, scans in zip(projects, analyzers, submitted):
+            report_dir = output / project.slug
+            report_dir.mkdir(parents=True, exist_ok=True)
+            report_path = report_dir / "ANALYSIS_REPORT.md"
+            with contextlib.redirect_stdout(devnull):
+                if scans is not None:
+                    analyzer.collect_scans(scans)
+                issues = analyzer.run_checks()
+                reports = generate_report(issues, str(report_path), formats=formats)
+            print(f"  📦 {project.name}: {issues.total} issues in {len(project.swift_paths)} Swift files")
+            summaries.append({
+                'name': project.name,
+                'app': project.app_name,
+                'swift_files': len(project.swift_paths),
+                'source_bytes': project.size,
+                'total_issues': issues.total,
+                'by_severity': issues.by_severity,
+                'by_category': issues.by_category,
+                'reports': reports,
+            })
+    
+    summaries.sort(key=lambda summary: summary['name'])
+    by_severity: Dict[str, int] = {}
+    by_category: Dict[str, int] = {}
+    for summary in summaries:
+        for totals, counts in ((by_severity, summary['by_severity']), (by_category, summary['by_category'])):
+            for key, count in counts.items():
+                totals[key] = totals.get(key, 0) + count
+    from datetime import datetime
+    summary = {
+        'generated_at': datetime.now().isoformat(),
+        'root': str(root),
+        'seconds': round(time.perf_counter() - start, 3),
+        'total_projects': len(summaries),
+        'total_issues': sum(summary['total_issues'] for summary in summaries),
+        'by_severity': by_severity,
+        'by_category': by_category,
+        'projects': summaries,
+    }
+    write_batch_summary(summary, output)
+    return summary
+
+def write_batch_summary(summary: Dict[str, Any], output: Path):
+    """Write the combined summary of a batch run as SUMMARY.md and SUMMARY.json"""
+    from datetime import datetime
+    from urllib.parse import quote
+    
+    output.mkdir(parents=True, exist_ok=True)
+    severity_order = ['critical', 'high', 'medium', 'low']
+    with open(output / "SUMMARY.md", 'w', encoding='utf-8') as f:
+        f.write(f"""# S-Quote Batch Analysis Summary
+
+Generated on: {datetime.now().strftime('%Y-%m-%d %H:%M:%S')}
+
+Analyzed **{summary['total_projects']}** Xcode projects under `{summary['root']}`: **{summary['total_issues']}** issues in total.
+
+### By Severity
+""")
+        for severity in severity_order:
+            count = summary['by_severity'].get(severity, 0)
+            if count > 0:
+                f.write(f"- **{severity.title()}**: {count} issues\n")
+        
+        f.write("\n## Projects\n\n")
+        f.write("| Project | Swift Files | Issues | " + " | ".join(s.title() for s in severity_order) + " | Report |\n")
+        f.write("|---|---:|---:|" + "---:|" * len(severity_order) + "---|\n")
+        for project in summary['projects']:
+            counts = " | ".join(str(project['by_severity'].get(severity, 0)) for severity in severity_order)
+            reports = [os.path.relpath(report, output) for report in project['reports']]
+            links = ", ".join(f"[{report}]({quote(report)})" for report in reports)
+            f.write(f"| `{project['name']}` | {project['swift_files']} | {project['total_issues']} | {counts} | {links} |\n")
+    
+    with open(output / "SUMMARY.json", 'w', encoding='utf-8') as f:
+        json.dump(summary, f, indent=2)
+
+# xcodebuild echoes whole compiler invocations, which outgrow asyncio's default 64 KiB line limit
+EXTERNAL_LINE_LIMIT = 16 * 1024 * 1024
+
+@dataclass
+class ExternalTool:
+    """An external analyzer that --external runs next to the built-in checks
+    
+    Tools report Xcode-style diagnostics (`path:line:column: warning: text`)
+    on stdout or stderr, which are parsed into issues while the tool runs.
+    """
+    name: str
+    # Looked up on PATH unless --external gives an executable
+    executable: str
+    # Arguments after the executable, where {app} is the Xcode project name
+    arguments: List[str]
+    # Diagnostic kind -> issue severity; other kinds such as notes are dropped
+    severities: Dict[str, str]
+    category: str
+    suggestion: str
+    # Exit codes of a run that completed, with or without findings
+    exit_codes: Tuple[int, ...] = (0,)
+    # Option that selects the scheme given by --xcode-scheme
+    scheme_option: Optional[str] = None
+    
+    DIAGNOSTIC_RE = LazyPattern(
+        r'^(?P<path>[^:\n]+?):(?P<line>\d+)(?::\d+)?: (?P<kind>error|warning|note): (?P<message>.*?)\s*$'
+    )
+    # Rule identifier at the end of a message, e.g. "(force_cast)" or "[-Wunused-variable]"
+    RULE_RE = LazyPattern(r'\s*[(\[]-?W?([\w.-]+)[)\]]$')
+    
+    def command(self, executable: str, analyzer: "CodeAnalyzer", scheme: Optional[str] = None) -> List[str]:
+        arguments = [argument.format(app=analyzer.app_name) for argument in self.arguments]
+        if scheme and self.scheme_option:
+            arguments += [self.scheme_option, scheme]
+        return [executable, *arguments]
+    
+    def parse(self, line: str, root: str) -> Optional[Issue]:
+        """The issue reported by one output line, if it is a diagnostic within the project"""
+        match = self.DIAGNOSTIC_RE.match(line)
+        if not match or match.group('kind') not in self.severities:
+            return None
+        path = os.path.realpath(os.path.join(root, match.group('path')))
+        if not path.startswith(root + os.sep):
+            # SDK headers and derived sources are not part of the project
+            return None
+        message = match.group('message')
+        rule = self.RULE_RE.search(message)
+        if rule:
+            message = message[:rule.start()]
+        return Issue(
+            type=f"{self.name}_{(rule.group(1) if rule else match.group('kind')).replace('-', '_').lower()}",
+            severity=self.severities[match.group('kind')],
+            file=os.path.relpath(path, root).replace(os.sep, '/'),
+            line=int(match.group('line')),
+            description=message,
+            suggestion=self.suggestion,
+            category=self.category,
+        )
+
+EXTERNAL_TOOLS: Dict[str, ExternalTool] = {tool.name: tool for tool in (
+    ExternalTool(
+        name='swiftlint',
+        executable='swiftlint',
+        arguments=['lint', '--quiet', '--reporter', 'xcode'],
+        severities={'error': 'medium', 'warning': 'low'},
+        category='style',
+        suggestion="Follow the SwiftLint rule or adjust it in .swiftlint.yml",
+        # SwiftLint exits with 2 when it finds error-level violations
+        exit_codes=(0, 2),
+    ),
+    ExternalTool(
+        name='xcodebuild',
+        executable='xcodebuild',
+        arguments=['analyze', '-project', '{app}.xcodeproj', '-configuration', 'Debug'],
+        severities={'error': 'high', 'warning': 'medium'},
+        category='static_analysis',
+        suggestion="Review the Xcode static analyzer finding",
+        scheme_option='-scheme',
+    ),
+)}
+
+@dataclass
+class ExternalRun:
+    """Outcome of one external tool run"""
+    tool: str
+    issues: List[Issue]
+    seconds: float
+    # Why the run did not complete, or None when it did
+    error: Optional[str] = None
+
+def resolve_external_tools(selectors: Iterable[str]) -> Tuple[List[Tuple[ExternalTool, str]], List[str]]:
+    """Split --external selectors into runnable tools and the names of tools not installed
+    
+    A selector is a tool name, optionally with the executable to run, so
+    `swiftlint=./stubs/swiftlint` runs a stub in place of the real tool.
+    """
+    import shutil
+    
+    tools: List[Tuple[ExternalTool, str]] = []
+    missing: List[str] = []
+    for selector in selectors:
+        name, _, executable = selector.partition('=')
+        tool = EXTERNAL_TOOLS[name]
+        found = shutil.which(executable or tool.executable)
+        if found:
+            tools.append((tool, found))
+        else:
+            missing.append(name)
+    return tools, missing
+
+async def run_external_tool(tool: ExternalTool, command: List[str], root: str) -> ExternalRun:
+    """Run one external tool, parsing its output into issues line by line as it streams"""
+    import asyncio
+    from collections import deque
+    
+    start = time.perf_counter()
+    issues: List[Issue] = []
+    seen: Set[Tuple[str, int, str, str]] = set()
+    # Recent unparsed output explains a failed run
+    tail: deque = deque(maxlen=5)
+    try:
+        process = await asyncio.create_subprocess_exec(
+            *command, cwd=root, stdin=asyncio.subprocess.DEVNULL, stdout=asyncio.subprocess.PIPE,
+            stderr=asyncio.subprocess.STDOUT, limit=EXTERNAL_LINE_LIMIT
+        )
+    except OSError as e:
+        return ExternalRun(tool.name, issues, time.perf_counter() - start, str(e))
+    
+    try:
+        async for raw in process.stdout:
+            line = decode_line(raw).rstrip('\r\n')
+            issue = tool.parse(line, root)
+            if issue is None:
+                if line.strip():
+                    tail.append(line.strip())
+                continue
+            # xcodebuild repeats diagnostics in its summary, once per architecture
+            key = (issue.file, issue.line, issue.type, issue.description)
+            if key not in seen:
+                seen.add(key)
+                issues.append(issue)
+        returncode = await process.wait()
+    finally:
+        if process.returncode is None:
+            process.kill()
+            await process.wait()
+    
+    error = None
+    if returncode not in tool.exit_codes:
+        error = f"exited with status {returncode}" + (f": {' / '.join(tail)}" if tail else "")
+    return ExternalRun(tool.name, issues, time.perf_counter() - start, error)
+
+async def analyze_with_external_tools(analyzer: "CodeAnalyzer", tools: List[Tuple[ExternalTool, str]],
+                                      scheme: Optional[str] = None) -> Tuple[IssueSink, List[ExternalRun]]:
+    """Run the built-in checks and external tools concurrently and merge their issues
+    
+    The built-in analysis runs in a worker thread while the tools run as
+    subprocesses on the event loop, so the whole run takes about as long as
+    the slowest of them. Tool issues are added after the built-in ones, in
+    the order the tools were given, so reports do not depend on timing.
+    """
+    import asyncio
+    
+    root = os.path.realpath(analyzer.project_path)
+    runs = [run_external_tool(tool, tool.command(executable, analyzer, scheme), root) for tool, executable in tools]
+    issues, *results = await asyncio.gather(asyncio.to_thread(analyzer.analyze), *runs)
+    for result in results:
+        for issue in result.issues:
+            analyzer.add_issue(issue)
+    return issues, results
+
+# Keys listed by --trend, those with the most issues in the latest run first
+TREND_ROWS = 20
+
+def print_trend(path: str, selector: str, runs: int):
+    """Print the counts of one history dimension over the latest recorded runs"""
+    dimension, _, key = selector.partition('=')
+    store = IssueHistory(path)
+    try:
+        latest, series = store.trend(dimension, key or None, runs)
+    finally:
+        store.close()
+    if not latest:
+        print(f"No runs recorded in {path}")
+        return
+    
+    print(f"📈 Issues per {dimension} over the last {len(latest)} runs, oldest first")
+    rows = sorted(series.items(), key=lambda item: (-item[1][-1], item[0]))[:TREND_ROWS]
+    name_width = min(max([len(name) for name, _ in rows] + [len(dimension)]), 48) + 2
+    print(f"{'Run':<{name_width}}" + "".join(f"{'#' + str(run['id']):>9}" for run in latest))
+    print(f"{'Commit':<{name_width}}" + "".join(f"{(run['commit'] or '-')[:7]:>9}" for run in latest))
+    print("-" * (name_width + 9 * len(latest)))
+    for name, counts in rows:
+        print(f"{name[:name_width - 2]:<{name_width}}" + "".join(f"{count:>9}" for count in counts))
+    print(f"{'Total':<{name_width}}" + "".join(f"{run['total']:>9}" for run in latest))
+    if len(series) > len(rows):
+        print(f"... {len(series) - len(rows)} more")
+
+def parse_args(argv: Optional[List[str]] = None) -> argparse.Namespace:
+    """Parse command line options"""
+    parser = argparse.ArgumentParser(description="S-Quote automated issue analysis")
+    parser.add_argument(
+        "-j", "--jobs", type=int, default=1,
+        help="Analyze Swift files in N worker processes (0 = one per CPU)"
+    )
+    parser.add_argument(
+        "--cache", nargs="?", const=".analysis-cache", default=None, metavar="DIR",
+        help="Reuse results for unchanged files from DIR (default: .analysis-cache)"
+    )
+    parser.add_argument(
+        "--project", default=".", metavar="DIR",
+        help="Project root to analyze (default: current directory)"
+    )
+    parser.add_argument(
+        "--diff-base", metavar="REF",
+        help="Only analyze files changed since REF and report issues on changed lines"
+    )
+    parser.add_argument(
+        "--ndjson", metavar="PATH",
+        help="Stream issues to PATH as newline-delimited JSON instead of keeping them in memory"
+    )
+    parser.add_argument(
+        "--profile", action="store_true",
+        help="Record per-phase, per-rule and per-file timings in ANALYSIS_REPORT.json"
+    )
+    parser.add_argument(
+        "--profile-output", metavar="PATH",
+        help="With --profile, also write a cProfile/pstats dump to PATH"
+    )
+    parser.add_argument(
+        "--context-window", action="append", default=[], metavar="NAME=FIRST:LAST",
+        help="Lines searched around a match, as offsets from it "
+             f"(windows: {', '.join(CONTEXT_WINDOWS)}; e.g. accessibility_label=1:8)"
+    )
+    parser.add_argument(
+        "--cache-size", type=int, default=10000, metavar="N",
+        help="Maximum number of file results kept in the cache"
+    )
+    parser.add_argument(
+        "--watch", action="store_true",
+        help="Keep running, re-analyzing changed files and rewriting the reports on every save"
+    )
+    parser.add_argument(
+        "--watch-interval", type=float, default=0.5, metavar="SECONDS",
+        help="Polling interval for --watch where inotify is unavailable (default: 0.5)"
+    )
+    parser.add_argument(
+        "--rules", metavar="LIST",
+        help="Only run these rules, given as comma-separated rule ids or categories (e.g. safety,memory)"
+    )
+    parser.add_argument(
+        "--rule-manifest", action="append", default=[], metavar="PATH",
+        help="Register additional rules declared in a JSON manifest; their modules load only when enabled"
+    )
+    parser.add_argument(
+        "--list-rules", action="store_true",
+        help="List the available rules and exit"
+    )
+    parser.add_argument(
+        "--serve", nargs="?", const="-", metavar="SOCKET",
+        help="Answer JSON-RPC analysis requests on stdio, or on a Unix socket at SOCKET, instead of writing reports"
+    )
+    parser.add_argument(
+        "--baseline", metavar="PATH",
+        help="Only report issues missing from the baseline at PATH, plus baselined issues that were resolved"
+    )
+    parser.add_argument(
+        "--write-baseline", metavar="PATH",
+        help="Record every issue found as accepted in a baseline at PATH"
+    )
+    parser.add_argument(
+        "--symbol-index", metavar="PATH",
+        help="Also write the project's symbol index (types, imports, property wrappers, API usage) as JSON to PATH"
+    )
+    parser.add_argument(
+        "--exclude", action="append", default=[], metavar="PATTERN",
+        help="Skip directories matching PATTERN, by name or by path from the project root "
+             f"(always skipped: {', '.join(DEFAULT_EXCLUDES)})"
+    )
+    parser.add_argument(
+        "--no-gitignore", action="store_true",
+        help="Also analyze files ignored by .gitignore"
+    )
+    parser.add_argument(
+        "--git-files", action="store_true",
+        help="List Swift files with git ls-files instead of walking the directory tree"
+    )
+    parser.add_argument(
+        "--format", default=",".join(DEFAULT_REPORT_FORMATS), metavar="LIST",
+        help=f"Comma-separated report formats to write (available: {', '.join(REPORT_FORMATS)}; "
+             f"default: {','.join(DEFAULT_REPORT_FORMATS)})"
+    )
+    parser.add_argument(
+        "--fail-fast", choices=SEVERITIES, metavar="SEVERITY",
+        help="Only run rules of SEVERITY or worse, stop after --max-issues issues and exit 1 if any were found "
+             f"(severities: {', '.join(SEVERITIES)})"
+    )
+    parser.add_argument(
+        "--max-issues", type=int, default=1, metavar="N",
+        help="Issues a --fail-fast run stops at (default: 1)"
+    )
+    parser.add_argument(
+        "--time-budget", type=float, metavar="SECONDS",
+        help="Stop scanning files after SECONDS and report the partial results"
+    )
+    parser.add_argument(
+        "--file-budget", type=int, metavar="N",
+        help="Stop after scanning N files and report the partial results"
+    )
+    parser.add_argument(
+        "--history", metavar="PATH",
+        help="Record this run in the SQLite history at PATH and report the changes since the previous run"
+    )
+    parser.add_argument(
+        "--trend", metavar="DIMENSION[=KEY]",
+        help="Print issue counts per run from --history instead of analyzing "
+             f"(dimensions: {', '.join(IssueHistory.DIMENSIONS)}; e.g. category=safety)"
+    )
+    parser.add_argument(
+        "--trend-runs", type=int, default=10, metavar="N",
+        help="Runs shown by --trend (default: 10)"
+    )
+    parser.add_argument(
+        "--external", metavar="LIST",
+        help="Also run these external analyzers concurrently and merge their findings: "
+             f"{', '.join(EXTERNAL_TOOLS)}, each optionally as NAME=EXECUTABLE. "
+             "Tools not installed are skipped; exits with status 1 if a tool fails"
+    )
+    parser.add_argument(
+        "--xcode-scheme", metavar="NAME",
+        help="Scheme for --external xcodebuild (default: the project's first target)"
+    )
+    parser.add_argument(
+        "--batch", metavar="ROOT",
+        help="Analyze every *.xcodeproj under ROOT, writing per-project reports and a combined summary"
+    )
+    parser.add_argument(
+        "--batch-output", default="analysis-reports", metavar="DIR",
+        help="Directory for the reports of --batch (default: analysis-reports)"
+    )
+    args = parser.parse_args(argv)
+    
+    if args.serve and (args.watch or args.diff_base or args.ndjson or args.profile):
+        parser.error("--serve cannot be combined with --watch, --diff-base, --ndjson or --profile")
+    if args.watch and (args.diff_base or args.ndjson or args.profile):
+        parser.error("--watch cannot be combined with --diff-base, --ndjson or --profile")
+    if (args.baseline or args.write_baseline) and (args.diff_base or args.watch or args.serve):
+        parser.error("--baseline and --write-baseline cannot be combined with --diff-base, --watch or --serve")
+    if args.batch and (args.serve or args.watch or args.diff_base or args.ndjson or args.profile
+                       or args.baseline or args.write_baseline):
+        parser.error("--batch cannot be combined with --serve, --watch, --diff-base, --ndjson, --profile or baselines")
+    if args.symbol_index and (args.serve or args.watch or args.batch):
+        parser.error("--symbol-index cannot be combined with --serve, --watch or --batch")
+    if (args.fail_fast or args.time_budget is not None or args.file_budget is not None) and (
+            args.serve or args.watch or args.batch or args.baseline or args.write_baseline or args.symbol_index):
+        parser.error("--fail-fast and budgets cannot be combined with --serve, --watch, --batch, baselines "
+                     "or --symbol-index")
+    if args.max_issues < 1:
+        parser.error("--max-issues must be at least 1")
+    if args.history and (args.serve or args.watch or args.batch or args.diff_base or args.fail_fast
+                         or args.time_budget is not None or args.file_budget is not None):
+        parser.error("--history only records complete runs, so it cannot be combined with --serve, --watch, "
+                     "--batch, --diff-base, --fail-fast or budgets")
+    if args.trend:
+        if not args.history:
+            parser.error("--trend needs --history")
+        if args.trend.partition('=')[0] not in IssueHistory.DIMENSIONS:
+            parser.error(f"unknown trend dimension in '{args.trend}', "
+                         f"expected one of {', '.join(IssueHistory.DIMENSIONS)}")
+    if args.trend_runs < 1:
+        parser.error("--trend-runs must be at least 1")
+    if args.external:
+        args.external = [selector.strip() for selector in args.external.split(',') if selector.strip()]
+        unknown = [selector for selector in args.external if selector.partition('=')[0] not in EXTERNAL_TOOLS]
+        if unknown:
+            parser.error(f"unknown external tools: {', '.join(unknown)} (available: {', '.join(EXTERNAL_TOOLS)})")
+        if (args.serve or args.watch or args.batch or args.fail_fast or args.time_budget is not None
+                or args.file_budget is not None or args.profile_output):
+            parser.error("--external cannot be combined with --serve, --watch, --batch, --fail-fast, budgets "
+                         "or --profile-output")
+    
+    args.format = [name.strip() for name in args.format.split(',') if name.strip()]
+    unknown = [name for name in args.format if name not in REPORT_FORMATS]
+    if unknown or not args.format:
+        parser.error(f"unknown report format '{unknown[0]}'" if unknown else "--format needs at least one format")
+    
+    windows = {}
+    for setting in args.context_window:
+        name, _, offsets = setting.partition('=')
+        first, _, last = offsets.partition(':')
+        if name not in CONTEXT_WINDOWS:
+            parser.error(f"unknown context window '{name}'")
+        try:
+            windows[name] = (int(first), int(last))
+        except ValueError:
+            parser.error(f"invalid context window '{setting}', expected NAME=FIRST:LAST")
+    args.context_window = windows
+    return args
 
-def main():
+def main(argv: Optional[List[str]] = None):
     """Main execution function"""
-    project_path = "."
+    startup_seconds = time.perf_counter() - LOAD_STARTED
+    args = parse_args(argv)
+    configure_context_windows(args.context_window)
+    configure_traversal(args.exclude, not args.no_gitignore, args.git_files)
+    try:
+        manifest_rules = [spec for path in args.rule_manifest for spec in load_rule_manifest(path)]
+        for spec in manifest_rules:
+            register_rule(spec)
+        enabled = select_rules(args.rules.split(',')) if args.rules else None
+        if args.fail_fast:
+            # Less severe rules cannot fail the run, so they are not run at all
+            severe = rules_at_least(args.fail_fast)
+            enabled = severe if enabled is None else enabled & severe
+            if not enabled:
+                # Otherwise nothing would run and the gate would always pass
+                raise ValueError(f"no enabled rules have severity {args.fail_fast} or worse")
+    except (OSError, ValueError) as e:
+        print(f"❌ Invalid rule configuration: {e}")
+        sys.exit(2)
+    configure_rules(enabled)
+    
+    if args.list_rules:
+        print(f"{'Rule':<24}{'Category':<20}{'Severity':<10}{'Inputs':<22}Files")
+        for spec in RULE_REGISTRY.values():
+            files = ', '.join(spec.globs) or 'project'
+            print(f"{spec.id:<24}{spec.category:<20}{spec.severity:<10}{', '.join(spec.inputs):<22}{files}")
+        return
+    
+    if args.trend:
+        try:
+            print_trend(args.history, args.trend, args.trend_runs)
+        except ValueError as e:
+            print(f"❌ Could not read history: {e}")
+            sys.exit(2)
+        return
+    
+    project_path = args.project
+    jobs = args.jobs if args.jobs > 0 else (os.cpu_count() or 1)
+    
+    if args.serve:
+        # stdout carries the protocol in stdio mode, so nothing else is printed
+        serve(args.serve, jobs)
+        return
     
     print("🚀 S-Quote Automated Issue Analysis")
     print("=" * 50)
     
-    analyzer = CodeAnalyzer(project_path)
-    issues = analyzer.analyze()
+    if args.watch:
+        watch_project(project_path, "ANALYSIS_REPORT.md", args.cache, args.cache_size, jobs, args.watch_interval)
+        return
+    
+    if args.batch:
+        print(f"🗂️ Analyzing every Xcode project under {args.batch}...")
+        summary = analyze_batch(args.batch, args.batch_output, jobs, args.cache, args.cache_size, args.format)
+        print(f"\n📊 Batch Complete! {summary['total_issues']} issues in {summary['total_projects']} projects "
+              f"({summary['seconds']:.1f}s)")
+        print(f"📄 Summary saved to: {Path(args.batch_output) / 'SUMMARY.md'}")
+        return
+    
+    baseline = None
+    if args.baseline:
+        try:
+            baseline = Baseline.load(args.baseline)
+        except (OSError, ValueError) as e:
+            print(f"❌ Could not load baseline: {e}")
+            sys.exit(2)
+    
+    history_store = None
+    if args.history:
+        try:
+            history_store = IssueHistory(args.history)
+        except ValueError as e:
+            print(f"❌ Could not open history: {e}")
+            sys.exit(2)
+    
+    cache = AnalysisCache(args.cache, ruleset_version(), args.cache_size) if args.cache else None
+    
+    scope = None
+    if args.diff_base:
+        import subprocess
+        try:
+            scope = DiffScope.from_git(Path(project_path), args.diff_base)
+        except (OSError, subprocess.CalledProcessError) as e:
+            detail = getattr(e, 'stderr', None) or e
+            print(f"❌ Could not compute changes since {args.diff_base}: {str(detail).strip()}")
+            sys.exit(2)
+    
+    sink = NDJSONIssueSink(args.ndjson) if args.ndjson else IssueStore()
     
+    profiler = None
+    if args.profile:
+        profiler = Profiler(startup_seconds)
+        if jobs > 1:
+            print("⏱️ Profiling runs serially so rule and file timings are collected in one process")
+            jobs = 1
+    
+    budget = None
+    if args.fail_fast or args.time_budget is not None or args.file_budget is not None:
+        budget = AnalysisBudget(args.time_budget, args.file_budget, args.fail_fast, args.max_issues)
+    
+    external_tools: List[Tuple[ExternalTool, str]] = []
+    if args.external:
+        external_tools, missing = resolve_external_tools(args.external)
+        for name in missing:
+            print(f"⚠️ {name} is not installed, skipping it")
+        if external_tools:
+            print(f"🔌 Running {', '.join(tool.name for tool, _ in external_tools)} alongside the built-in checks")
+    
+    analyzer = CodeAnalyzer(project_path, jobs=jobs, cache=cache, scope=scope, sink=sink, profiler=profiler,
+                            budget=budget)
+    external_runs: List[ExternalRun] = []
+    if external_tools:
+        import asyncio
+        
+        issues, external_runs = asyncio.run(analyze_with_external_tools(analyzer, external_tools, args.xcode_scheme))
+    elif args.profile and args.profile_output:
+        import cProfile
+        
+        stats_profile = cProfile.Profile()
+        issues = stats_profile.runcall(analyzer.analyze)
+        stats_profile.dump_stats(args.profile_output)
+    else:
+        issues = analyzer.analyze()
+    
+    for run in external_runs:
+        if run.error is None:
+            print(f"🔌 {run.tool}: {len(run.issues)} issues in {run.seconds:.1f}s")
+        else:
+            print(f"❌ {run.tool} failed after {run.seconds:.1f}s: {run.error}")
+        if profiler:
+            profiler.phases[f"external_{run.tool}"] = {'seconds': run.seconds, 'issues': len(run.issues)}
+    
+    partial = analyzer.partial()
     print(f"\n📊 Analysis Complete!")
     print(f"Found {len(issues)} potential issues")
+    if partial is not None:
+        print(f"⚠️ Partial results: {describe_partial(partial)}")
+    
+    if args.write_baseline:
+        Baseline.write(args.write_baseline, Path(project_path), issues)
+        print(f"📌 Baseline of {issues.total} issues saved to: {args.write_baseline}")
+    
+    if args.symbol_index:
+        index = analyzer.symbol_index()
+        index.save(args.symbol_index)
+        print(f"🗂️ Symbol index of {len(index.files)} files saved to: {args.symbol_index}")
+    
+    history = None
+    if history_store is not None:
+        # Recorded before baseline gating so trends count every issue
+        history = history_store.record(Path(project_path), issues, head_commit(Path(project_path)))
+        history_store.close()
+        if history.previous is None:
+            print(f"🗃️ History: first run recorded in {args.history}")
+        else:
+            print(f"🗃️ History: {len(history.introduced)} introduced, {len(history.resolved)} resolved "
+                  f"since run {history.previous['id']}")
+    
+    comparison = None
+    if baseline is not None:
+        comparison = baseline.compare(Path(project_path), issues)
+        print(f"📌 Baseline: {comparison.new.total} new, {comparison.unchanged} unchanged, "
+              f"{len(comparison.resolved)} resolved")
+        issues.close()
+        issues = comparison.new
     
     # Generate report
     report_path = "ANALYSIS_REPORT.md"
-    generate_report(issues, report_path)
+    reports = generate_report(issues, report_path, profiler.to_dict() if profiler else None, comparison, args.format,
+                              partial, history)
+    issues.close()
     
-    print(f"📄 Detailed report saved to: {report_path}")
-    print(f"📄 JSON data saved to: ANALYSIS_REPORT.json")
+    for path in reports:
+        print(f"📄 Report saved to: {path}")
+    if args.ndjson:
+        print(f"📄 Issue stream saved to: {args.ndjson}")
     
     # Print summary
-    by_severity = {}
-    for issue in issues:
-        if issue.severity not in by_severity:
-            by_severity[issue.severity] = 0
-        by_severity[issue.severity] += 1
-    
     print("\n📈 Issue Summary:")
     for severity in ['critical', 'high', 'medium', 'low']:
-        count = by_severity.get(severity, 0)
+        count = issues.by_severity.get(severity, 0)
         if count > 0:
             print(f"  {severity.title()}: {count}")
     
+    if profiler:
+        print(f"\n⏱️ Startup (imports and module setup): {profiler.startup_seconds * 1000:.1f} ms")
+        print("⏱️ Slowest phases:")
+        for name, stats in sorted(profiler.phases.items(), key=lambda item: -item[1]['seconds'])[:5]:
+            print(f"  {name}: {stats['seconds'] * 1000:.1f} ms")
+        if args.profile_output:
+            print(f"📄 cProfile stats saved to: {args.profile_output}")
+    
     print("\n🎯 Next Steps:")
     print("1. Review ANALYSIS_REPORT.md for detailed findings")
     print("2. Address critical and high-priority issues first")
     print("3. Run this analysis regularly during development")
     print("4. Consider integrating into CI/CD pipeline")
+    
+    if args.fail_fast and issues.total:
+        print(f"\n❌ Found issues of {args.fail_fast} severity or worse")
+        sys.exit(1)
+    
+    failed = [run.tool for run in external_runs if run.error is not None]
+    if failed:
+        print(f"\n❌ External analysis failed: {', '.join(failed)}")
+        sys.exit(1)
 
 if __name__ == "__main__":
     main()
\ No newline at end of file
@@ -0,0 +1,287 @@
+#!/usr/bin/env python3
+"""
+S-Quote Analyzer Benchmark
+Generates synthetic Swift projects and measures how analyze-issues.py scales
+
+Usage:
+    python3 benchmark-analyzer.py --files 200 --lines 300
+    python3 benchmark-analyzer.py --save-baseline BENCHMARK_BASELINE.json
+    python3 benchmark-analyzer.py --compare BENCHMARK_BASELINE.json
+"""
+
+import os
+import sys
+import json
+import time
+import random
+import argparse
+import platform
+import tempfile
+import tracemalloc
+import contextlib
+import importlib.util
+from pathlib import Path
+from typing import List, Dict, Any, Callable, Optional
+from datetime import datetime
+
+# Per-file checks take (file_path, lines); project checks take no arguments
+FILE_CHECKS = [
+    "check_force_unwrapping",
+    "check_retain_cycles",
+    "check_hardcoded_strings",
+    "check_long_functions",
+    "check_missing_documentation",
+    "check_deprecated_apis",
+    "check_memory_leaks",
+]
+PROJECT_CHECKS = [
+    "check_project_structure",
+    "check_build_configuration",
+    "check_dependencies",
+    "check_security_issues",
+    "check_performance_issues",
+    "check_ui_issues",
+    "check_data_persistence",
+]
+
+def load_analyzer():
+    """Import analyze-issues.py, whose file name is not a valid module name"""
+    path = Path(__file__).with_name("analyze-issues.py")
+    spec = importlib.util.spec_from_file_location("analyze_issues", path)
+    module = importlib.util.module_from_spec(spec)
+    sys.modules[spec.name] = module
+    spec.loader.exec_module(module)
+    return module
+
+def generate_corpus(root: Path, files: int, lines_per_file: int, button_density: float,
+                    text_density: float, unwrap_density: float, closure_density: float,
+                    seed: int = 0) -> int:
+    """Write a synthetic SwiftUI project under root and return its total line count
+
+    Densities are the fraction of body lines that contain a `Button(`, a
+    hardcoded `Text("...")`, a force unwrap or an escaping closure capturing
+    self. The generated types are classes, so those closures are reported as
+    potential retain cycles instead of being dropped as value-type captures.
+    """
+    rng = random.Random(seed)
+    views_dir = root / "S Quote" / "Views"
+    views_dir.mkdir(parents=True, exist_ok=True)
+
+    templates = [
+        (button_density, lambda n: f'Button("Action {n}") {{ self.counter += {n} }}'),
+        (text_density, lambda n: f'Text("Generated label {n}")'),
+        (unwrap_density, lambda n: f'let value{n} = optionalValues[{n}]!'),
+        (closure_density, lambda n: f'DispatchQueue.main.async {{ self.process({n}) }}'),
+    ]
+    fillers = [
+        lambda n: f'let total{n} = items.count * {n}',
+        lambda n: f'// Step {n}: keep layout in sync',
+        lambda n: f'.padding({n % 16})',
+        lambda n: f'if counter > {n} {{ counter = 0 }}',
+    ]
+
+    total_lines = 0
+    for index in range(files):
+        lines = [
+            "//",
+            f"//  GeneratedView{index}.swift",
+            "//  S Quote",
+            "//",
+            "",
+            "import SwiftUI",
+            "",
+            f"final class GeneratedView{index}: ObservableObject {{",
+            "    @Published var counter = 0",
+            "    let items: [Int] = []",
+            "    let optionalValues: [Int?] = []",
+            "",
+        ]
+
+        # Split the body into functions of up to 40 lines so brace tracking sees real nesting
+        remaining = max(lines_per_file - len(lines) - 1, 0)
+        function_index = 0
+        while remaining > 2:
+            body_lines = min(remaining - 2, 40)
+            lines.append(f"    func section{function_index}() {{")
+            for n in range(body_lines):
+                roll = rng.random()
+                line = None
+                for density, template in templates:
+                    if roll < density:
+                        line = template(n)
+                        break
+                    roll -= density
+                if line is None:
+                    line = rng.choice(fillers)(n)
+                lines.append("        " + line)
+            lines.append("    }")
+            remaining -= body_lines + 2
+            function_index += 1
+        lines.append("}")
+
+        (views_dir / f"GeneratedView{index}.swift").write_text("\n".join(lines) + "\n", encoding="utf-8")
+        total_lines += len(lines)
+
+    return total_lines
+
+def best_time(run: Callable[[], Any], repeat: int) -> float:
+    """Best wall time of several runs, which is the least noisy estimate"""
+    best = float("inf")
+    for _ in range(repeat):
+        start = time.perf_counter()
+        run()
+        best = min(best, time.perf_counter() - start)
+    return best
+
+def run_benchmark(analyzer_module, project: Path, total_lines: int, repeat: int) -> Dict[str, Any]:
+    """Time discovery, every check_* method and a full run, plus peak memory"""
+    CodeAnalyzer = analyzer_module.CodeAnalyzer
+    results: Dict[str, Dict[str, float]] = {}
+
+    def record(name: str, seconds: float):
+        results[name] = {
+            "seconds": round(seconds, 6),
+            "lines_per_second": round(total_lines / seconds) if seconds > 0 else 0,
+        }
+
+    with open(os.devnull, "w") as devnull, contextlib.redirect_stdout(devnull):
+        record("discovery", best_time(lambda: CodeAnalyzer(str(project)).swift_files(), repeat))
+
+        # Per-file checks run over lines that were read beforehand, so only rule cost is timed
+        sources = CodeAnalyzer(str(project)).swift_files()
+        inputs = [(source.path, source.lines) for source in sources]
+        for name in FILE_CHECKS:
+            def run_check(name=name):
+                analyzer = CodeAnalyzer(str(project))
+                check = getattr(analyzer, name)
+                for file_path, lines in inputs:
+                    check(file_path, lines)
+            record(name, best_time(run_check, repeat))
+
+        # Project checks include their own file access on a cold analyzer
+        for name in PROJECT_CHECKS:
+            record(name, best_time(lambda name=name: getattr(CodeAnalyzer(str(project)), name)(), repeat))
+
+        record("analyze", best_time(lambda: CodeAnalyzer(str(project)).analyze(), repeat))
+
+        tracemalloc.start()
+        issues = CodeAnalyzer(str(project)).analyze()
+        _, peak = tracemalloc.get_traced_memory()
+        tracemalloc.stop()
+
+    return {
+        "results": results,
+        "peak_memory_bytes": peak,
+        "total_issues": len(issues),
+    }
+
+def compare(current: Dict[str, Any], baseline: Dict[str, Any], threshold: float) -> List[str]:
+    """Return descriptions of timings that got slower than the baseline by more than threshold"""
+    regressions = []
+    for name, result in current["results"].items():
+        previous = baseline.get("results", {}).get(name)
+        if not previous or previous["seconds"] <= 0:
+            continue
+        ratio = result["seconds"] / previous["seconds"]
+        if ratio > 1 + threshold:
+            regressions.append(
+                f"{name}: {previous['seconds'] * 1000:.1f} ms -> {result['seconds'] * 1000:.1f} ms ({ratio:.2f}x)"
+            )
+
+    previous_peak = baseline.get("peak_memory_bytes")
+    if previous_peak and current["peak_memory_bytes"] > previous_peak * (1 + threshold):
+        regressions.append(
+            f"peak memory: {previous_peak / 1e6:.1f} MB -> {current['peak_memory_bytes'] / 1e6:.1f} MB"
+        )
+    return regressions
+
+def print_results(report: Dict[str, Any]):
+    corpus = report["corpus"]
+    print(f"\n📦 Corpus: {corpus['files']} files, {corpus['total_lines']} lines")
+    print(f"{'Measurement':<32}{'Time (ms)':>12}{'Lines/s':>14}")
+    print("-" * 58)
+    for name, result in report["results"].items():
+        print(f"{name:<32}{result['seconds'] * 1000:>12.1f}{result['lines_per_second']:>14,}")
+    print("-" * 58)
+    print(f"Peak traced memory: {report['peak_memory_bytes'] / 1e6:.1f} MB")
+    print(f"Issues found: {report['total_issues']}")
+
+def parse_args(argv: Optional[List[str]] = None) -> argparse.Namespace:
+    """Parse command line options"""
+    parser = argparse.ArgumentParser(description="Benchmark analyze-issues.py on a synthetic Swift project")
+    parser.add_argument("--files", type=int, default=100, help="Number of Swift files to generate")
+    parser.add_argument("--lines", type=int, default=300, help="Lines per generated file")
+    parser.add_argument("--button-density", type=float, default=0.05, help="Fraction of lines with Button(")
+    parser.add_argument("--text-density", type=float, default=0.10, help='Fraction of lines with Text("...")')
+    parser.add_argument("--unwrap-density", type=float, default=0.03, help="Fraction of lines with a force unwrap")
+    parser.add_argument("--closure-density", type=float, default=0.05, help="Fraction of lines with an escaping closure using self")
+    parser.add_argument("--seed", type=int, default=0, help="Random seed for the corpus")
+    parser.add_argument("--repeat", type=int, default=3, help="Runs per measurement; the best is reported")
+    parser.add_argument("--corpus-dir", metavar="DIR", help="Generate the corpus here instead of a temporary directory")
+    parser.add_argument("--save-baseline", metavar="PATH", help="Write results to PATH for later comparison")
+    parser.add_argument("--compare", metavar="PATH", help="Compare results against a saved baseline")
+    parser.add_argument(
+        "--threshold", type=float, default=0.20,
+        help="Relative slowdown that counts as a regression (default: 0.20)"
+    )
+    return parser.parse_args(argv)
+
+def main(argv: Optional[List[str]] = None):
+    """Main execution function"""
+    args = parse_args(argv)
+
+    print("⏱️ S-Quote Analyzer Benchmark")
+    print("=" * 50)
+
+    analyzer_module = load_analyzer()
+
+    with contextlib.ExitStack() as stack:
+        if args.corpus_dir:
+            project = Path(args.corpus_dir)
+        else:
+            project = Path(stack.enter_context(tempfile.TemporaryDirectory(prefix="squote-bench-")))
+
+        total_lines = generate_corpus(
+            project, args.files, args.lines, args.button_density, args.text_density,
+            args.unwrap_density, args.closure_density, args.seed
+        )
+        report = run_benchmark(analyzer_module, project, total_lines, args.repeat)
+
+    report = {
+        "generated_at": datetime.now().isoformat(),
+        "python": platform.python_version(),
+        "machine": platform.machine(),
+        "corpus": {
+            "files": args.files,
+            "lines_per_file": args.lines,
+            "total_lines": total_lines,
+            "button_density": args.button_density,
+            "text_density": args.text_density,
+            "unwrap_density": args.unwrap_density,
+            "closure_density": args.closure_density,
+            "seed": args.seed,
+        },
+        **report,
+    }
+    print_results(report)
+
+    if args.save_baseline:
+        with open(args.save_baseline, "w", encoding="utf-8") as f:
+            json.dump(report, f, indent=2)
+        print(f"\n📄 Baseline saved to: {args.save_baseline}")
+
+    if args.compare:
+        with open(args.compare, "r", encoding="utf-8") as f:
+            baseline = json.load(f)
+        if baseline.get("corpus") != report["corpus"]:
+            print("\n⚠️ Baseline was recorded with different corpus settings; timings may not be comparable")
+        regressions = compare(report, baseline, args.threshold)
+        if regressions:
+            print(f"\n❌ {len(regressions)} regression(s) beyond {args.threshold:.0%}:")
+            for regression in regressions:
+                print(f"  {regression}")
+            sys.exit(1)
+        print(f"\n✅ No regressions beyond {args.threshold:.0%} against {args.compare}")
+
+if __name__ == "__main__":
+    main()
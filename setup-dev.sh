@@ -212,6 +212,11 @@ if command -v swiftlint &> /dev/null; then
     swiftlint
 fi
 
+# Report analyzer findings in the files being committed; the launcher starts from cached bytecode
+if [[ -f "analyze-issues-fast.py" ]]; then
+    python3 analyze-issues-fast.py --diff-base HEAD --format summary || true
+fi
+
 # Run quick build test
 if ! xcodebuild build -project "S Quote.xcodeproj" -scheme "S-Quote" -configuration Debug -quiet; then
     echo "Build failed, commit aborted"
@@ -0,0 +1,140 @@
+"""
+Tests for analyze-issues.py
+
+Run with:
+    python3 -m pytest tests
+"""
+
+import io
+import sys
+import shutil
+import tempfile
+import unittest
+import contextlib
+import subprocess
+import importlib.util
+from pathlib import Path
+
+ROOT = Path(__file__).resolve().parent.parent
+
+def load_analyzer():
+    """Import analyze-issues.py, whose file name is not a valid module name"""
+    if "analyze_issues" in sys.modules:
+        return sys.modules["analyze_issues"]
+    spec = importlib.util.spec_from_file_location("analyze_issues", ROOT / "analyze-issues.py")
+    module = importlib.util.module_from_spec(spec)
+    sys.modules[spec.name] = module
+    spec.loader.exec_module(module)
+    return module
+
+analyzer = load_analyzer()
+
+class ProjectTestCase(unittest.TestCase):
+    """A temporary project directory, optionally under git"""
+
+    def setUp(self):
+        self.project = Path(tempfile.mkdtemp(prefix="squote-test-"))
+        self.addCleanup(shutil.rmtree, self.project, ignore_errors=True)
+
+    def write(self, relative_path: str, content: str):
+        path = self.project / relative_path
+        path.parent.mkdir(parents=True, exist_ok=True)
+        path.write_text(content, encoding="utf-8")
+
+    def git(self, *args: str):
+        subprocess.run(["git", *args], cwd=self.project, check=True, capture_output=True)
+
+    def commit_all(self):
+        if shutil.which("git") is None:
+            self.skipTest("git is not installed")
+        self.git("init", "-q")
+        self.git("add", "-A")
+        self.git("-c", "user.name=test", "-c", "user.email=test@example.com", "commit", "-q", "-m", "initial")
+
+    def analyze(self, scope=None):
+        with contextlib.redirect_stdout(io.StringIO()):
+            return list(analyzer.CodeAnalyzer(str(self.project), scope=scope).analyze())
+
+class DiffScopeTests(ProjectTestCase):
+    VIEW = (
+        "import SwiftUI\n"
+        "\n"
+        "struct V: View {\n"
+        "    var body: some View {\n"
+        "        Button(\"Save\") { save() }\n"
+        "            .accessibilityLabel(\"Save quote\")\n"
+        "    }\n"
+        "}\n"
+    )
+
+    def test_deletion_only_hunk_touches_lines_around_it(self):
+        self.write("S Quote/V.swift", self.VIEW)
+        self.commit_all()
+        self.write("S Quote/V.swift", self.VIEW.replace("            .accessibilityLabel(\"Save quote\")\n", ""))
+
+        scope = analyzer.DiffScope.from_git(self.project, "HEAD")
+        self.assertEqual(scope.changed["S Quote/V.swift"], [(5, 6)])
+
+        issues = [(issue.type, issue.file, issue.line) for issue in self.analyze(scope)]
+        self.assertIn(("missing_accessibility", "S Quote/V.swift", 5), issues)
+
+class WatcherTests(ProjectTestCase):
+    def setUp(self):
+        super().setUp()
+        self.write(".gitignore", "vendor/\n")
+        self.write("S Quote/A.swift", "let a = 1\n")
+        self.write("S Quote/Generated/B.swift", "let b = 1\n")
+        self.write("vendor/Package/C.swift", "let c = 1\n")
+        analyzer.configure_traversal(["S Quote/Generated"])
+        self.addCleanup(analyzer.configure_traversal)
+
+    def test_polling_watcher_skips_ignored_and_excluded_directories(self):
+        watcher = analyzer.PollingWatcher(self.project)
+        self.assertIn("S Quote/A.swift", watcher._snapshot)
+        self.assertNotIn("S Quote/Generated/B.swift", watcher._snapshot)
+        self.assertNotIn("vendor/Package/C.swift", watcher._snapshot)
+
+    @unittest.skipUnless(sys.platform.startswith("linux"), "inotify is Linux only")
+    def test_inotify_watcher_skips_ignored_and_excluded_directories(self):
+        watcher = analyzer.InotifyWatcher(self.project)
+        self.addCleanup(watcher.close)
+        watched = set(watcher._directories.values())
+        self.assertIn("S Quote", watched)
+        self.assertNotIn("vendor", watched)
+        self.assertNotIn("vendor/Package", watched)
+        self.assertNotIn("S Quote/Generated", watched)
+
+        self.write("vendor/New/D.swift", "let d = 1\n")
+        self.write("vendor/Package/C.swift", "let c = 2\n")
+        self.write("S Quote/A.swift", "let a = 2\n")
+        self.assertEqual(watcher.wait(), {"S Quote/A.swift"})
+
+class SuppressionTests(unittest.TestCase):
+    def scan(self, source: str):
+        findings = analyzer.get_line_engine().scan("S Quote/V.swift", source.split("\n"))
+        return sorted((issue.type, issue.line) for issues in findings.values() for issue in issues)
+
+    def test_comment_marker_suppresses(self):
+        source = (
+            "let a = value!  // squote:ignore force_unwrapping\n"
+            "// squote:ignore-next-line\n"
+            "let b = other!\n"
+        )
+        self.assertNotIn("force_unwrapping", [issue_type for issue_type, _ in self.scan(source)])
+
+    def test_marker_inside_string_literal_is_ignored(self):
+        source = (
+            "let a = value!; Text(\"// squote:ignore force_unwrapping -- not a comment\")\n"
+            "Text(\"// squote:ignore-next-line force_unwrapping -- not a comment\")\n"
+            "let b = other!\n"
+            "let c = \"\"\"\n"
+            "    // squote:ignore-next-line\n"
+            "    \"\"\"\n"
+            "let d = more!\n"
+        )
+        issues = self.scan(source)
+        for line in (1, 3, 7):
+            self.assertIn(("force_unwrapping", line), issues)
+
+if __name__ == "__main__":
+    unittest.main()